@@ -0,0 +1,94 @@
+# utils/paging.py
+"""
+Keyset pagination for interactive listings.
+
+Instead of fetchall() on the whole table, callers supply small fetch
+functions that read one page after / before a key using an indexed
+`WHERE key > ? ORDER BY key LIMIT n`. Only the current page is held in
+memory, so browsing cost does not grow with table size.
+"""
+
+PAGE_SIZE = 20
+
+
+def ask_page_size(default=PAGE_SIZE):
+    raw = input(f"Rows per page (Enter for {default}): ").strip()
+    try:
+        size = int(raw)
+        return size if size > 0 else default
+    except ValueError:
+        return default
+
+
+def browse_pages(fetch_after, fetch_before, show, key_of, jump=None, page_size=PAGE_SIZE,
+                 jump_prompt="Jump to", label_of=None):
+    """
+    Interactive next / prev / jump navigation.
+
+      fetch_after(key, limit)  -> rows with key > `key` in ascending order (key None = first page)
+      fetch_before(key, limit) -> rows with key < `key` in ascending order
+      jump(text, limit)        -> rows from the position the user typed, ascending
+      show(rows)               -> render one page
+      key_of(row)              -> keyset key of a row
+      label_of(row)            -> how a row's position is printed (defaults to key_of)
+    """
+    label_of = label_of or key_of
+    rows = fetch_after(None, page_size + 1)
+    if not rows:
+        print("⚠️  No records found.")
+        return
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    at_start = True
+    redraw = True
+
+    while True:
+        if redraw:
+            show(rows)
+        redraw = True
+        options = []
+        if has_more:
+            options.append("[N]ext")
+        if not at_start:
+            options.append("[P]rev")
+        if jump:
+            options.append("[J]ump")
+        options.append("[Q]uit")
+        print(f"Showing {label_of(rows[0])} → {label_of(rows[-1])}   " + "  ".join(options))
+        ch = input("> ").strip().lower()
+
+        if ch == 'n' and has_more:
+            nxt = fetch_after(key_of(rows[-1]), page_size + 1)
+            if nxt:
+                has_more = len(nxt) > page_size
+                rows = nxt[:page_size]
+                at_start = False
+        elif ch == 'p' and not at_start:
+            prev = fetch_before(key_of(rows[0]), page_size + 1)
+            if len(prev) > page_size:
+                rows = prev[-page_size:]
+            else:
+                # reached the beginning: show a full first page
+                rows = fetch_after(None, page_size + 1)[:page_size]
+                at_start = True
+            has_more = True
+        elif ch == 'j' and jump:
+            target = input(f"{jump_prompt}: ").strip()
+            try:
+                found = jump(target, page_size + 1)
+            except ValueError:
+                print("⚠️ Invalid position.")
+                redraw = False
+                continue
+            if not found:
+                print("⚠️ Nothing at or after that position.")
+                redraw = False
+                continue
+            has_more = len(found) > page_size
+            rows = found[:page_size]
+            at_start = False
+        elif ch == 'q':
+            break
+        else:
+            print("⚠️ Invalid choice.")
+            redraw = False
@@ -25,44 +25,43 @@ def format_datetime(dt):
     except Exception:
         return str(dt)
 
-def save_receipt_text(filename, text):
-    """Save receipt text to disk inside receipts/ folder."""
-    os.makedirs("receipts", exist_ok=True)
-    path = os.path.join("receipts", filename)
+def save_receipt_text(filename, text, folder="receipts"):
+    """Save receipt text to disk inside receipts/ folder (or `folder`)."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, filename)
     with open(path, "w", encoding="utf-8") as f:
         f.write(text)
     return path
 
-def build_receipt_text(patient, doctor, appointment, bill_amount=None):
+def build_receipt_text(r):
     """
-    Build a multi-line receipt string. Expects tuples from DB queries:
-      patient: (P_ID, Name, Age, Gender, Phone, Email, Address, Date_Registered)
-      doctor: (D_ID, Name, Specialization, Experience, Fees, Phone, Email, Availability, Gender, Address)
-      appointment: (A_ID, P_ID, D_ID, Appointment_Date, Time_Slot, Reason, Status, Date_Created)
+    Build a multi-line receipt string from a receipt dict
+    (see receipt_assembler.RECEIPT_FIELDS): patient, doctor and appointment
+    fields plus Amount of the latest bill (None if unpaid).
     """
     lines = []
     lines.append("🏥  HOSPITAL APPOINTMENT RECEIPT")
     lines.append("=" * 50)
     lines.append(f"Receipt Generated : {datetime.now().strftime('%d-%b-%Y %I:%M %p')}")
     lines.append("-" * 50)
-    lines.append(f"Patient ID    : {patient[0]}")
-    lines.append(f"Patient Name  : {patient[1]}")
-    lines.append(f"Age / Gender  : {patient[2]} / {patient[3]}")
-    lines.append(f"Phone         : {patient[4]}")
-    lines.append(f"Email         : {patient[5]}")
-    lines.append(f"Address       : {patient[6]}")
+    lines.append(f"Patient ID    : {r['P_ID']}")
+    lines.append(f"Patient Name  : {r['Patient_Name']}")
+    lines.append(f"Age / Gender  : {r['Age']} / {r['Gender']}")
+    lines.append(f"Phone         : {r['Phone_No']}")
+    lines.append(f"Email         : {r['Email']}")
+    lines.append(f"Address       : {r['Address']}")
     lines.append("-" * 50)
-    lines.append(f"Doctor        : Dr. {doctor[1]} ({doctor[2]})")
-    lines.append(f"Experience    : {doctor[3]} years")
-    lines.append(f"Consultation  : ₹{doctor[4]:.2f}")
+    lines.append(f"Doctor        : Dr. {r['Doctor_Name']} ({r['Specialization']})")
+    lines.append(f"Experience    : {r['Experience']} years")
+    lines.append(f"Consultation  : ₹{r['Fees']:.2f}")
     lines.append("-" * 50)
-    lines.append(f"Appointment ID: {appointment[0]}")
-    lines.append(f"Appointment   : {appointment[3]} | {appointment[4]}")
-    lines.append(f"Reason        : {appointment[5]}")
-    lines.append(f"Status        : {appointment[6]}")
-    if bill_amount is not None:
+    lines.append(f"Appointment ID: {r['A_ID']}")
+    lines.append(f"Appointment   : {r['Appointment_Date']} | {r['Time_Slot']}")
+    lines.append(f"Reason        : {r['Reason']}")
+    lines.append(f"Status        : {r['Status']}")
+    if r.get('Amount') is not None:
         lines.append("-" * 50)
-        lines.append(f"Amount Paid   : ₹{bill_amount:.2f}")
+        lines.append(f"Amount Paid   : ₹{r['Amount']:.2f}")
     lines.append("=" * 50)
     lines.append("Thank you for choosing our hospital ❤️")
     return "\n".join(lines)
@@ -1,4 +1,5 @@
 # utils/validation.py
+import re
 from datetime import datetime
 
 def validate_date(date_str):
@@ -11,3 +12,27 @@ def validate_timeslot_format(slot_str):
         # still allow flexible format — just return slot string
         return slot_str
     return slot_str
+
+_SLOT_START = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*([AaPp])?\.?[Mm]?")
+
+# Sort key for slots whose start time cannot be parsed: after every real slot
+UNKNOWN_SLOT_START = 24 * 60
+
+def slot_start_minutes(slot_str):
+    """
+    Minutes after midnight at which a Time_Slot starts, e.g.
+    '10:00-11:00' -> 600, '2 PM - 4 PM' -> 840, '9.30am-10' -> 570.
+    Returns UNKNOWN_SLOT_START when no start time can be read.
+    """
+    m = _SLOT_START.match(slot_str or "")
+    if not m:
+        return UNKNOWN_SLOT_START
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = (m.group(3) or "").lower()
+    if meridiem == 'p' and hour < 12:
+        hour += 12
+    elif meridiem == 'a' and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return UNKNOWN_SLOT_START
+    return hour * 60 + minute
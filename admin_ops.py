@@ -1,5 +1,11 @@
 # admin_ops.py
-from db_setup import get_connection
+from db_setup import db_cursor, pool_stats, get_connection, backend
+from migrations import migration_status, verify_migrations
+from doctor_cache import doctor_cache_stats
+from patient_cache import patient_cache_stats
+from query_stats import (
+    QUERY_STATS_CONFIG, SORT_KEYS, bucket_labels, query_summary, reset_query_stats, top_queries
+)
 from patient_ops import (
     search_patient_by_id,
     search_patient_by_name,
@@ -15,13 +21,19 @@ from doctor_ops import (
 from appointment_ops import (
     view_all_appointments,
     view_appointments_datewise,
+    view_todays_scheduled,
     delete_appointment,
     edit_appointment,
     record_payment
 )
+from services import patients_page
 from Utils.utils import display_table
+from Utils.paging import ask_page_size, browse_pages
 from admissions_ops import admission_menu
 from cert_ops import certificate_menu
+from billing_ops import revenue_menu
+from dashboard import dashboard_menu
+from patient_import import import_patients_menu
 import getpass
 from tabulate import tabulate
 
@@ -62,7 +74,12 @@ def admin_menu():
         print("8. Admission System 🏥")
         print("9. Certificates (Birth/Death)")
         print("10. Manage Admins")
-        print("11. Logout")
+        print("11. System Diagnostics")
+        print("12. Revenue reports")
+        print("13. Analytics (utilization, revenue, length of stay)")
+        print("14. Live dashboard")
+        print("15. Import patients from CSV")
+        print("16. Logout")
         choice = input("Choose: ").strip()
 
         if choice == '1':
@@ -86,6 +103,17 @@ def admin_menu():
         elif choice == '10':
             manage_admin_menu()
         elif choice == '11':
+            diagnostics_menu()
+        elif choice == '12':
+            revenue_menu()
+        elif choice == '13':
+            from analytics import analytics_menu  # needs numpy; only loaded when used
+            analytics_menu()
+        elif choice == '14':
+            dashboard_menu()
+        elif choice == '15':
+            import_patients_menu()
+        elif choice == '16':
             print("🔒 Logging out admin.")
             break
         else:
@@ -93,23 +121,23 @@ def admin_menu():
 
 
 # ---------- PATIENT MANAGEMENT ----------
+PATIENT_HEADERS = ["P_ID", "Name", "Age", "Gender", "Phone", "Email", "Address", "Date_Registered"]
+
+
 def view_all_patients():
-    """Displays all registered patients"""
-    conn = get_connection(); cur = conn.cursor()
+    """Browse registered patients one page at a time (keyset pagination on P_ID)"""
     try:
-        cur.execute("USE hospital")
-        cur.execute("SELECT * FROM patients")
-        rows = cur.fetchall()
-        if not rows:
-            print("⚠️ No patients registered yet.")
-            return
-        display_table(rows, [
-            "P_ID", "Name", "Age", "Gender", "Phone", "Email", "Address", "Date_Registered"
-        ])
+        browse_pages(
+            lambda pid, n: patients_page(after=pid, limit=n),
+            lambda pid, n: patients_page(before=pid, limit=n),
+            show=lambda rows: display_table([list(r.values()) for r in rows], PATIENT_HEADERS),
+            key_of=lambda row: row["P_ID"],
+            jump=lambda text, n: patients_page(after=int(text) - 1, limit=n),
+            page_size=ask_page_size(),
+            jump_prompt="Jump to Patient ID"
+        )
     except Exception as e:
         print("❌ Error:", e)
-    finally:
-        cur.close(); conn.close()
 
 
 # ---------- DOCTOR MANAGEMENT ----------
@@ -146,11 +174,12 @@ def manage_appointments_menu():
     """Submenu for viewing and editing appointments"""
     while True:
         print("\n--- Manage Appointments ---")
-        print("1. View all appointments")
+        print("1. View all appointments (filter by doctor/status/date)")
         print("2. View appointments by date")
-        print("3. Edit appointment")
-        print("4. Delete appointment")
-        print("5. Back")
+        print("3. Today's scheduled appointments")
+        print("4. Edit appointment")
+        print("5. Delete appointment")
+        print("6. Back")
         ch = input("Choose: ").strip()
 
         if ch == '1':
@@ -158,10 +187,12 @@ def manage_appointments_menu():
         elif ch == '2':
             view_appointments_datewise()
         elif ch == '3':
-            edit_appointment()
+            view_todays_scheduled()
         elif ch == '4':
-            delete_appointment()
+            edit_appointment()
         elif ch == '5':
+            delete_appointment()
+        elif ch == '6':
             break
         else:
             print("⚠️ Invalid choice.")
@@ -194,31 +225,28 @@ def manage_admin_menu():
 
 
 def add_admin():
-    conn = get_connection(); cur = conn.cursor()
     username = input("Enter new admin username: ").strip()
     password = input("Enter password: ").strip()
     fullname = input("Enter full name: ").strip()
     role = input("Enter role (SuperAdmin/Admin): ").strip().capitalize()
-    cur.execute("INSERT INTO admins (Username, Password, Full_Name, Role) VALUES (%s, %s, %s, %s)",
-                (username, password, fullname, role))
-    conn.commit()
+    with db_cursor() as (conn, cur):
+        cur.execute("INSERT INTO admins (Username, Password, Full_Name, Role) VALUES (%s, %s, %s, %s)",
+                    (username, password, fullname, role))
+        conn.commit()
     print("✅ Admin added successfully.")
-    cur.close(); conn.close()
 
 
 def view_admins():
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM admins")
-    rows = cur.fetchall()
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute("SELECT * FROM admins")
+        rows = cur.fetchall()
     if not rows:
         print("⚠️ No admins found.")
     else:
         print(tabulate(rows, headers="keys", tablefmt="grid"))
-    cur.close(); conn.close()
 
 
 def edit_admin():
-    conn = get_connection(); cur = conn.cursor()
     admin_id = input("Enter Admin ID to edit: ").strip()
     print("Which field to update?\n1. Username\n2. Password\n3. Full Name\n4. Role")
     ch = input("Choose: ")
@@ -227,32 +255,172 @@ def edit_admin():
         print("⚠️ Invalid choice.")
         return
     new_val = input(f"Enter new {fields[ch]}: ").strip()
-    cur.execute(f"UPDATE admins SET {fields[ch]}=%s WHERE Admin_ID=%s", (new_val, admin_id))
-    conn.commit()
+    with db_cursor() as (conn, cur):
+        cur.execute(f"UPDATE admins SET {fields[ch]}=%s WHERE Admin_ID=%s", (new_val, admin_id))
+        conn.commit()
     print("✅ Admin updated successfully.")
-    cur.close(); conn.close()
 
 
 def delete_admin():
-    conn = get_connection(); cur = conn.cursor()
     admin_id = input("Enter Admin ID to delete: ").strip()
-    cur.execute("DELETE FROM admins WHERE Admin_ID=%s", (admin_id,))
-    conn.commit()
+    with db_cursor() as (conn, cur):
+        cur.execute("DELETE FROM admins WHERE Admin_ID=%s", (admin_id,))
+        conn.commit()
     print("✅ Admin deleted successfully.")
-    cur.close(); conn.close()
+
+
+# ---------- SYSTEM DIAGNOSTICS ----------
+def diagnostics_menu():
+    """Submenu for runtime statistics used to tune the system"""
+    while True:
+        print("\n--- System Diagnostics ---")
+        print("1. Connection pool stats")
+        print("2. Schema migrations")
+        print("3. Doctor directory cache stats")
+        print("4. Patient resolver cache stats")
+        print("5. Query statistics (top offenders)")
+        print("6. Reset query statistics")
+        print("7. Back")
+        ch = input("Choose: ").strip()
+
+        if ch == '1':
+            view_pool_stats()
+        elif ch == '2':
+            view_schema_migrations()
+        elif ch == '3':
+            view_doctor_cache_stats()
+        elif ch == '4':
+            view_patient_cache_stats()
+        elif ch == '5':
+            view_query_stats()
+        elif ch == '6':
+            reset_query_stats()
+            print("✅ Query statistics reset.")
+        elif ch == '7':
+            break
+        else:
+            print("⚠️ Invalid choice.")
+
+
+def view_pool_stats():
+    """Shows connection pool counters for sizing POOL_CONFIG"""
+    stats = pool_stats()
+    rows = [
+        ["Pool size", stats["size"]],
+        ["Open connections", stats["open"]],
+        ["In use / idle", f"{stats['in_use']} / {stats['idle']}"],
+        ["Peak in use", stats["peak_in_use"]],
+        ["Checkouts", stats["checkouts"]],
+        ["Checkouts that waited", stats["waits"]],
+        ["Avg wait (ms)", f"{stats['avg_wait_ms']:.2f}"],
+        ["Checkout timeouts", stats["timeouts"]],
+        ["Connections created", stats["created"]],
+        ["Reconnects (failed health check)", stats["reconnects"]],
+        ["Retired (max lifetime)", stats["expired"]],
+    ]
+    print(tabulate(rows, headers=["Metric", "Value"], tablefmt="grid"))
+
+
+def view_doctor_cache_stats():
+    """Shows hit/miss counters of the booking doctor directory cache"""
+    stats = doctor_cache_stats()
+    rows = [
+        ["Cached doctors", stats["cached_doctors"]],
+        ["Hits", stats["hits"]],
+        ["Misses (reloads)", stats["misses"]],
+        ["Hit ratio", f"{stats['hit_ratio'] * 100:.1f}%"],
+        ["Invalidations", stats["invalidations"]],
+    ]
+    print(tabulate(rows, headers=["Metric", "Value"], tablefmt="grid"))
+
+
+def view_patient_cache_stats():
+    """Shows hit/miss counters of the phone / patient ID resolver cache"""
+    stats = patient_cache_stats()
+    rows = [
+        ["Cached IDs / phones", f"{stats['cached_ids']} / {stats['cached_phones']}"],
+        ["Hits", stats["hits"]],
+        ["Negative hits (unknown phone/ID)", stats["negative_hits"]],
+        ["Misses (DB lookups)", stats["misses"]],
+        ["Hit ratio", f"{stats['hit_ratio'] * 100:.1f}%"],
+        ["LRU evictions", stats["evictions"]],
+        ["Invalidations", stats["invalidations"]],
+    ]
+    print(tabulate(rows, headers=["Metric", "Value"], tablefmt="grid"))
+
+
+def view_schema_migrations():
+    """Shows which migrations are applied and whether they still verify"""
+    try:
+        with get_connection() as conn:
+            status = migration_status(conn)
+            checks = {v: ok for v, _, ok in verify_migrations(conn, backend())}
+    except Exception as e:
+        print("❌ Error:", e)
+        return
+    rows = []
+    for version, description, applied in status:
+        if not applied:
+            state = "⏳ pending"
+        else:
+            state = "✅ applied" if checks.get(version) else "❌ verify failed"
+        rows.append([version, description, state])
+    print(tabulate(rows, headers=["Version", "Migration", "State"], tablefmt="grid"))
+
+
+def view_query_stats():
+    """Shows the statements costing the most, grouped by fingerprint, with a latency histogram on request"""
+    if not QUERY_STATS_CONFIG["enabled"]:
+        print("⚠️ Query instrumentation is off (HMS_QUERY_STATS=0).")
+        return
+    n = input("Show top N statements [10]: ").strip()
+    n = int(n) if n.isdigit() and int(n) > 0 else 10
+    by = input(f"Sort by ({' / '.join(SORT_KEYS)}) [total]: ").strip().lower() or "total"
+    if by not in SORT_KEYS:
+        print("⚠️ Unknown sort key, using total.")
+        by = "total"
+
+    summary = query_summary()
+    print(f"\n📊 {summary['calls']} statements, {summary['fingerprints']} distinct, "
+          f"{summary['total_ms'] / 1000:.2f}s in the database since {summary['since']:%Y-%m-%d %H:%M:%S}; "
+          f"{summary['slow']} slow (≥ {QUERY_STATS_CONFIG['slow_ms']:g} ms, logged to "
+          f"{QUERY_STATS_CONFIG['log_path']}), {summary['errors']} failed")
+    top = top_queries(n, by)
+    if not top:
+        print("No statements recorded yet.")
+        return
+    rows = []
+    for i, q in enumerate(top, start=1):
+        caller, _ = q["callers"].most_common(1)[0]
+        statement = q["fingerprint"] if len(q["fingerprint"]) <= 70 else q["fingerprint"][:67] + "..."
+        rows.append([i, q["calls"], f"{q['total_ms']:.1f}", f"{q['mean_ms']:.2f}", f"{q['p95_ms']:.2f}",
+                     f"{q['max_ms']:.2f}", f"{q['rows_per_call']:.1f}", q["slow"], caller, statement])
+    print(tabulate(rows, headers=["#", "Calls", "Total ms", "Mean ms", "p95 ms", "Max ms",
+                                  "Rows/call", "Slow", "Top caller", "Statement"], tablefmt="grid"))
+
+    pick = input("Show histogram for # (Enter to skip): ").strip()
+    if not pick:
+        return
+    if not pick.isdigit() or not 1 <= int(pick) <= len(top):
+        print("⚠️ Invalid choice.")
+        return
+    q = top[int(pick) - 1]
+    print(f"\n{q['fingerprint']}")
+    peak = max(q["histogram"])
+    rows = [[label, count, "#" * round(count / peak * 40)]
+            for label, count in zip(bucket_labels(), q["histogram"]) if count]
+    print(tabulate(rows, headers=["Latency", "Calls", ""], tablefmt="grid"))
+    print(tabulate(q["callers"].most_common(), headers=["Caller", "Calls"], tablefmt="grid"))
 
 
 # ---------- PASSWORD RESET ----------
 def forgot_credentials():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
     print("\n--- FORGOT CREDENTIALS ---")
     username = input("Enter your username: ").strip()
 
-    cur.execute("SELECT Security_Question, Security_Answer FROM admin WHERE Username=%s", (username,))
-    row = cur.fetchone()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT Security_Question, Security_Answer FROM admin WHERE Username=%s", (username,))
+        row = cur.fetchone()
 
     if not row:
         print("⚠️ No admin found with that username.")
@@ -273,9 +441,7 @@ def forgot_credentials():
         print("⚠️ Passwords do not match.")
         return
 
-    cur.execute("UPDATE admin SET Password=%s WHERE Username=%s", (new_pass, username))
-    conn.commit()
+    with db_cursor() as (conn, cur):
+        cur.execute("UPDATE admin SET Password=%s WHERE Username=%s", (new_pass, username))
+        conn.commit()
     print("✅ Password updated successfully!")
-
-    cur.close()
-    conn.close()
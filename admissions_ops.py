@@ -1,96 +1,88 @@
-from db_setup import get_connection
-from datetime import datetime
+from db_setup import db_cursor
+from bed_allocator import allocator
+from ward_census import CENSUS_COLUMNS, read_census, rebuild_census
+from services import ServiceError, active_admission, bed_counts, list_admissions
+from services import admit_patient as admit_patient_record, discharge_patient as discharge_patient_record
 from tabulate import tabulate
 
 def view_beds(show_all=False):
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-    if show_all:
-        cur.execute("SELECT Bed_ID, Department, Bed_No, Is_Occupied, Current_P_ID FROM beds ORDER BY Department, Bed_No")
-    else:
-        cur.execute("SELECT Bed_ID, Department, Bed_No, Is_Occupied FROM beds WHERE Is_Occupied=0 ORDER BY Department, Bed_No")
-    rows = cur.fetchall()
+    with db_cursor(dictionary=True) as (conn, cur):
+        if show_all:
+            cur.execute("SELECT Bed_ID, Department, Bed_No, Is_Occupied, Current_P_ID FROM beds ORDER BY Department, Bed_No")
+        else:
+            cur.execute("SELECT Bed_ID, Department, Bed_No, Is_Occupied FROM beds WHERE Is_Occupied=0 ORDER BY Department, Bed_No")
+        rows = cur.fetchall()
     if not rows:
         print("No beds found.")
     else:
         print(tabulate(rows, headers="keys", tablefmt="grid"))
-    cur.close(); conn.close()
-
-def find_available_bed(dept):
-    conn = get_connection(); cur = conn.cursor()
-    cur.execute("USE hospital")
-    cur.execute("SELECT Bed_ID FROM beds WHERE Department=%s AND Is_Occupied=0 LIMIT 1", (dept,))
-    r = cur.fetchone()
-    cur.close(); conn.close()
-    return r[0] if r else None
+    if not show_all:
+        summary = [[dept, free, total] for dept, (free, total) in sorted(allocator.counts().items())]
+        print(tabulate(summary, headers=["Department", "Free", "Total"], tablefmt="grid"))
 
 def admit_patient():
-    conn = get_connection(); cur = conn.cursor()
-    cur.execute("USE hospital")
     pid = input("Patient ID to admit: ").strip()
-    print("Departments: OPD, IPD, ICU, Emergency, Radiology, Surgery")
-    dept = input("Choose Department: ").strip()
-    bed_id = find_available_bed(dept)
-    if not bed_id:
-        print(f"❌ No free beds available in {dept}.")
+    counts = bed_counts()
+    print("Departments: " + ", ".join(f"{d} ({c['Free']} free)" for d, c in counts.items()))
+    dept = allocator.department(input("Choose Department: "))
+    if not dept:
+        print("❌ Unknown department.")
         return
+    if not counts[dept]["Free"]:
+        print(f"⚠️ {dept} looks full; checking for a bed freed elsewhere...")
     notes = input("Notes (optional): ").strip()
-    cur.execute("UPDATE beds SET Is_Occupied=1, Current_P_ID=%s WHERE Bed_ID=%s", (pid, bed_id))
-    cur.execute("INSERT INTO admissions (P_ID, Bed_ID, Department, Notes) VALUES (%s,%s,%s,%s)", (pid, bed_id, dept, notes))
-    conn.commit()
-    print(f"✅ Patient {pid} admitted to Bed ID {bed_id} in {dept}.")
-    cur.close(); conn.close()
+    try:
+        adm = admit_patient_record(pid, dept, notes)
+    except ServiceError as e:
+        print("❌", e)
+        return
+    except Exception as e:
+        print("❌ Error admitting patient:", e)
+        return
+    print(f"✅ Patient {adm['P_ID']} admitted to Bed ID {adm['Bed_ID']} in {dept} "
+          f"(Admission ID {adm['Admission_ID']}).")
 
 def discharge_patient():
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
     admission_id = input("Admission ID to discharge: ").strip()
-    cur.execute("SELECT * FROM admissions WHERE Admission_ID=%s AND Status='Admitted'", (admission_id,))
-    adm = cur.fetchone()
-    if not adm:
-        print("❌ No active admission found.")
+    try:
+        adm = active_admission(admission_id)
+        discharge_notes = input("Discharge notes (optional): ").strip()
+        adm = discharge_patient_record(admission_id, discharge_notes, adm)
+    except ServiceError as e:
+        print("❌", e)
         return
-    discharge_notes = input("Discharge notes (optional): ").strip()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cur.execute("""
-        UPDATE admissions 
-        SET Status='Discharged', Discharge_Date=%s, 
-            Notes=CONCAT(IFNULL(Notes,''),' | Discharge: ',%s)
-        WHERE Admission_ID=%s
-    """, (now, discharge_notes, admission_id))
-    cur.execute("UPDATE beds SET Is_Occupied=0, Current_P_ID=NULL WHERE Bed_ID=%s", (adm['Bed_ID'],))
-    conn.commit()
     print(f"✅ Admission {admission_id} discharged and bed {adm['Bed_ID']} freed.")
-    cur.close(); conn.close()
 
 def view_admissions(active_only=True):
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
+    rows = list_admissions(active_only)
     if active_only:
-        cur.execute("""
-            SELECT a.Admission_ID, a.P_ID, p.Name AS Patient, a.Department, 
-                   b.Bed_No, a.Admit_Date, a.Status
-            FROM admissions a
-            JOIN patients p ON a.P_ID = p.P_ID
-            JOIN beds b ON a.Bed_ID = b.Bed_ID
-            WHERE a.Status='Admitted'
-            ORDER BY a.Admit_Date
-        """)
-    else:
-        cur.execute("""
-            SELECT a.Admission_ID, a.P_ID, p.Name AS Patient, a.Department, 
-                   b.Bed_No, a.Admit_Date, a.Discharge_Date, a.Status
-            FROM admissions a
-            JOIN patients p ON a.P_ID = p.P_ID
-            JOIN beds b ON a.Bed_ID = b.Bed_ID
-            ORDER BY a.Admit_Date DESC
-        """)
-    rows = cur.fetchall()
+        rows = [{k: v for k, v in r.items() if k != "Discharge_Date"} for r in rows]
     if not rows:
         print("No admissions found.")
     else:
         print(tabulate(rows, headers="keys", tablefmt="grid"))
-    cur.close(); conn.close()
+
+
+def view_ward_census():
+    """Bed board: per-department census from ward_census (no beds/admissions scan)."""
+    try:
+        rows = read_census()
+    except Exception as e:
+        print("❌ Error:", e)
+        return
+    if not rows:
+        print("No census data. Use 'Recount ward census' to build it.")
+        return
+    table = [list(r) + [f"{(r[2] / r[1] * 100) if r[1] else 0:.0f}%"] for r in rows]
+    totals = [sum(r[i] for r in rows) for i in range(1, 6)]
+    table.append(["ALL"] + totals + [f"{(totals[1] / totals[0] * 100) if totals[0] else 0:.0f}%"])
+    print(tabulate(table, headers=CENSUS_COLUMNS + ["Occupancy"], tablefmt="grid"))
+
+def recount_ward_census():
+    with db_cursor() as (conn, cur):
+        n = rebuild_census(cur)
+        conn.commit()
+    print(f"✅ Ward census recounted for {n} departments.")
 
 
 # ✅ This is the missing function that Admin Panel was expecting
@@ -104,7 +96,9 @@ def admission_menu():
         print("4. Discharge patient")
         print("5. View active admissions")
         print("6. View all admissions (history)")
-        print("7. Back")
+        print("7. View ward census (bed board)")
+        print("8. Recount ward census")
+        print("9. Back")
         choice = input("Choose: ").strip()
 
         if choice == '1':
@@ -120,6 +114,10 @@ def admission_menu():
         elif choice == '6':
             view_admissions(False)
         elif choice == '7':
+            view_ward_census()
+        elif choice == '8':
+            recount_ward_census()
+        elif choice == '9':
             break
         else:
             print("⚠️ Invalid choice.")
@@ -0,0 +1,397 @@
+# analytics.py
+"""
+Utilization and revenue analytics.
+
+Appointments, billing, receipts and admissions are streamed with
+fetchmany() in CHUNK_ROWS batches into columnar NumPy arrays: dates as
+datetime64, amounts as float64 and text columns (status, payment mode,
+department) as small integer codes. Every report is then a vectorized
+group-by (np.bincount over the codes), so one core gets through millions
+of rows in seconds and the database only does range scans.
+
+Reports: doctor utilization, cancellation rates, revenue per
+specialization, average length of stay and payment-mode mix. Date ranges
+are half-open (from <= day < to + 1 day).
+
+    python analytics.py --from 2025-01-01 --to 2025-03-31 [--report revenue] [--csv reports/]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+from tabulate import tabulate
+
+from db_setup import db_cursor, ensure_database
+from doctor_cache import all_doctors
+from revenue_rollup import day_bounds
+from slot_inventory import DEFAULT_SLOT_CAPACITY
+from Utils.validation import validate_date
+
+CHUNK_ROWS = 50000
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+NO_DOCTOR = "(no appointment)"
+
+
+# ---------- COLUMNAR LOADING ----------
+class Frame:
+    """Named NumPy columns of equal length; text columns hold codes into labels[name]."""
+
+    def __init__(self, cols, labels):
+        self.cols = cols
+        self.labels = labels
+
+    def __getitem__(self, name):
+        return self.cols[name]
+
+    def __len__(self):
+        return len(next(iter(self.cols.values()))) if self.cols else 0
+
+
+_DTYPES = {"int": np.int64, "float": np.float64, "date": "datetime64[D]", "datetime": "datetime64[s]"}
+_EPOCH = date(1970, 1, 1).toordinal()
+_NAT = np.iinfo(np.int64).min
+
+
+# date / datetime objects -> integer days / seconds since the epoch; several
+# times faster than letting np.array() convert Python datetimes one by one
+def _days(v):
+    if v is None:
+        return _NAT
+    if isinstance(v, str):
+        return int(np.datetime64(v[:10], "D").astype(np.int64))
+    return v.toordinal() - _EPOCH
+
+
+def _seconds(v):
+    if v is None:
+        return _NAT
+    if isinstance(v, str):
+        return int(np.datetime64(v, "s").astype(np.int64))
+    return ((v.toordinal() - _EPOCH) * 86400
+            + getattr(v, "hour", 0) * 3600 + getattr(v, "minute", 0) * 60 + getattr(v, "second", 0))
+
+
+_TO_INT = {"date": _days, "datetime": _seconds}
+
+
+def load_frame(cur, sql, params, schema, chunk_rows=CHUNK_ROWS):
+    """
+    Run `sql` and load its rows into a Frame. `schema` is [(name, kind)]
+    in select order, kind being int / float / date / datetime / cat.
+    NULL ints and floats must be COALESCEd in the query.
+    """
+    cur.execute(sql, params)
+    parts = {name: [] for name, _ in schema}
+    lookups = {name: {} for name, kind in schema if kind == "cat"}
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        for i, (name, kind) in enumerate(schema):
+            col = [r[i] for r in rows]
+            if kind == "cat":
+                lut = lookups[name]
+                parts[name].append(np.fromiter((lut.setdefault(v, len(lut)) for v in col),
+                                               dtype=np.int32, count=len(col)))
+            elif kind in _TO_INT:
+                ints = np.fromiter(map(_TO_INT[kind], col), dtype=np.int64, count=len(col))
+                parts[name].append(ints.view(_DTYPES[kind]))
+            else:
+                parts[name].append(np.array(col, dtype=_DTYPES[kind]))
+    cols = {}
+    for name, kind in schema:
+        dtype = np.int32 if kind == "cat" else _DTYPES[kind]
+        cols[name] = np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+    labels = {name: list(lut) for name, lut in lookups.items()}
+    return Frame(cols, labels)
+
+
+def _range_clause(column, start, end):
+    """Half-open WHERE on a DATETIME column for start <= day < end (dates)."""
+    if not start:
+        return "", ()
+    return f" WHERE {column} >= %s AND {column} < %s", day_bounds(start, end)
+
+
+def load_data(start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """Bulk-load the four fact tables for start <= day < end (everything if no range)."""
+    data = {}
+    with db_cursor() as (conn, cur):
+        where, params = ("", ()) if not start else \
+            (" WHERE Appointment_Date >= %s AND Appointment_Date < %s", (start, end))
+        data["appointments"] = load_frame(cur, f"""
+            SELECT COALESCE(D_ID, 0), Appointment_Date, Status FROM appointments{where}
+        """, params, [("D_ID", "int"), ("Date", "date"), ("Status", "cat")], chunk_rows)
+        for table in ("billing", "receipts"):
+            where, params = _range_clause("x.Date_Paid", start, end)
+            data[table] = load_frame(cur, f"""
+                SELECT COALESCE(a.D_ID, 0), COALESCE(x.Amount, 0), x.Payment_Mode, x.Date_Paid
+                FROM {table} x LEFT JOIN appointments a ON x.A_ID = a.A_ID{where}
+            """, params, [("D_ID", "int"), ("Amount", "float"), ("Mode", "cat"), ("Paid", "datetime")],
+                chunk_rows)
+        # stays that overlap the range: admitted before its end, not discharged before its start
+        where, params = "", ()
+        if start:
+            where = " WHERE Admit_Date < %s AND (Discharge_Date IS NULL OR Discharge_Date >= %s)"
+            params = (datetime.combine(end, dtime.min), datetime.combine(start, dtime.min))
+        data["admissions"] = load_frame(cur, f"""
+            SELECT Department, Admit_Date, Discharge_Date FROM admissions{where}
+        """, params, [("Department", "cat"), ("Admit", "datetime"), ("Discharge", "datetime")], chunk_rows)
+    return data
+
+
+# ---------- VECTORIZED GROUP-BYS ----------
+def _codes(values):
+    """(labels, codes) for an int column (np.unique + inverse)."""
+    labels, codes = np.unique(values, return_inverse=True)
+    return labels, codes.reshape(-1)
+
+
+def _pct(part, whole):
+    return np.divide(part * 100.0, whole, out=np.zeros(len(part)), where=whole > 0)
+
+
+def _doctor_lookup(doctors, dids):
+    """Doctor name and specialization for each D_ID in `dids`."""
+    names = [doctors[d]["Name"] if d in doctors else NO_DOCTOR if d == 0 else f"#{d} (deleted)" for d in dids]
+    specs = [(doctors[d]["Specialization"] or "General") if d in doctors else NO_DOCTOR if d == 0
+             else "(deleted doctor)" for d in dids]
+    return names, specs
+
+
+def weekday_counts(start, end):
+    """How many Mondays..Sundays fall in start <= day < end."""
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D"))
+    # 1970-01-01 was a Thursday (weekday 3)
+    return np.bincount((days.astype(np.int64) + 3) % 7, minlength=7)
+
+
+def doctor_utilization(data, doctors, start, end):
+    """Booked (non-cancelled) appointments vs. slots offered by each doctor's weekly availability."""
+    appts = data["appointments"]
+    status = appts.labels["Status"]
+    live = appts["Status"] != status.index("Cancelled") if "Cancelled" in status else np.ones(len(appts), bool)
+    dids = np.union1d(np.unique(appts["D_ID"]), np.array(sorted(doctors), dtype=np.int64))
+    dids = dids[dids != 0]
+    booked = np.bincount(np.searchsorted(dids, appts["D_ID"][live & (appts["D_ID"] != 0)]),
+                         minlength=len(dids))
+    per_day = weekday_counts(start, end)
+    offered = np.array([
+        sum(len(slots) * per_day[WEEKDAYS.index(day)]
+            for day, slots in (doctors.get(d, {}).get("Availability") or {}).items() if day in WEEKDAYS)
+        for d in dids
+    ], dtype=np.int64) * DEFAULT_SLOT_CAPACITY
+    names, specs = _doctor_lookup(doctors, dids)
+    util = _pct(booked, offered)
+    order = np.lexsort((dids, -util))
+    rows = [[int(dids[i]), names[i], specs[i], int(booked[i]), int(offered[i]), round(float(util[i]), 1)]
+            for i in order]
+    return ["D_ID", "Doctor", "Specialization", "Booked", "Slots Offered", "Utilization %"], rows
+
+
+def cancellation_rates(data, doctors, start=None, end=None):
+    """Appointments by status per doctor, with the cancellation rate."""
+    appts = data["appointments"]
+    status = appts.labels["Status"]
+    dids, codes = _codes(appts["D_ID"])
+    # doctors x statuses count matrix in one bincount
+    grid = np.bincount(codes * len(status) + appts["Status"],
+                       minlength=len(dids) * len(status)).reshape(len(dids), len(status)) \
+        if len(status) else np.zeros((len(dids), 0), np.int64)
+    total = grid.sum(axis=1)
+
+    def col(name):
+        return grid[:, status.index(name)] if name in status else np.zeros(len(dids), np.int64)
+
+    cancelled = col("Cancelled")
+    rate = _pct(cancelled, total)
+    names, _ = _doctor_lookup(doctors, dids)
+    order = np.lexsort((dids, -rate))
+    rows = [[int(dids[i]), names[i], int(total[i]), int(col("Completed")[i]), int(col("Scheduled")[i]),
+             int(cancelled[i]), round(float(rate[i]), 1)] for i in order]
+    if len(dids):
+        rows.append(["ALL", "", int(total.sum()), int(col("Completed").sum()), int(col("Scheduled").sum()),
+                     int(cancelled.sum()), round(float(_pct(np.array([cancelled.sum()]),
+                                                            np.array([total.sum()]))[0]), 1)])
+    return ["D_ID", "Doctor", "Appointments", "Completed", "Scheduled", "Cancelled", "Cancellation %"], rows
+
+
+def _payments(data):
+    """billing + receipts as one set of columns (D_ID, Amount, mode label per row)."""
+    d_id = np.concatenate([data[t]["D_ID"] for t in ("billing", "receipts")])
+    amount = np.concatenate([data[t]["Amount"] for t in ("billing", "receipts")])
+    # re-code both tables' modes into one label space
+    labels = sorted({m for t in ("billing", "receipts") for m in data[t].labels["Mode"]}, key=str)
+    mode = np.concatenate([
+        np.array([labels.index(m) for m in data[t].labels["Mode"]], dtype=np.int32)[data[t]["Mode"]]
+        if len(data[t]) else np.empty(0, np.int32)
+        for t in ("billing", "receipts")
+    ])
+    return d_id, amount, mode, labels
+
+
+def revenue_by_specialization(data, doctors, start=None, end=None):
+    d_id, amount, _, _ = _payments(data)
+    dids, codes = _codes(d_id)
+    _, specs = _doctor_lookup(doctors, dids)
+    spec_labels = sorted(set(specs))
+    spec_of_doctor = np.array([spec_labels.index(s) for s in specs], dtype=np.int64)
+    spec_codes = spec_of_doctor[codes] if len(codes) else np.empty(0, np.int64)
+    count = np.bincount(spec_codes, minlength=len(spec_labels))
+    total = np.bincount(spec_codes, weights=amount, minlength=len(spec_labels))
+    share = _pct(total, np.full(len(total), total.sum()))
+    order = np.argsort(-total, kind="stable")
+    rows = [[spec_labels[i], int(count[i]), round(float(total[i]), 2),
+             round(float(total[i] / count[i]), 2) if count[i] else 0.0, round(float(share[i]), 1)]
+            for i in order]
+    return ["Specialization", "Payments", "Revenue (INR)", "Avg Payment", "Share %"], rows
+
+
+def payment_mode_mix(data, doctors=None, start=None, end=None):
+    _, amount, mode, labels = _payments(data)
+    count = np.bincount(mode, minlength=len(labels))
+    total = np.bincount(mode, weights=amount, minlength=len(labels))
+    by_count = _pct(count, np.full(len(count), count.sum()))
+    by_amount = _pct(total, np.full(len(total), total.sum()))
+    order = np.argsort(-total, kind="stable")
+    rows = [[labels[i] or "(none)", int(count[i]), round(float(by_count[i]), 1), round(float(total[i]), 2),
+             round(float(by_amount[i]), 1)] for i in order]
+    return ["Payment Mode", "Payments", "% of Payments", "Amount (INR)", "% of Amount"], rows
+
+
+def length_of_stay(data, doctors=None, start=None, end=None):
+    """Average / longest stay (days) of discharged admissions, and current inpatients, per department."""
+    adm = data["admissions"]
+    depts = adm.labels["Department"]
+    done = ~np.isnat(adm["Discharge"]) & ~np.isnat(adm["Admit"])
+    stay_days = (adm["Discharge"][done] - adm["Admit"][done]).astype(np.float64) / 86400.0
+    codes = adm["Department"][done]
+    discharged = np.bincount(codes, minlength=len(depts))
+    total = np.bincount(codes, weights=stay_days, minlength=len(depts))
+    longest = np.zeros(len(depts))
+    np.maximum.at(longest, codes, stay_days)
+    inpatients = np.bincount(adm["Department"][np.isnat(adm["Discharge"])], minlength=len(depts))
+    avg = np.divide(total, discharged, out=np.zeros(len(depts)), where=discharged > 0)
+    order = sorted(range(len(depts)), key=lambda i: str(depts[i]))
+    rows = [[depts[i], int(discharged[i]), round(float(avg[i]), 2), round(float(longest[i]), 2),
+             int(inpatients[i])] for i in order]
+    if len(depts):
+        n = int(discharged.sum())
+        rows.append(["ALL", n, round(float(total.sum() / n), 2) if n else 0.0,
+                     round(float(longest.max()), 2), int(inpatients.sum())])
+    return ["Department", "Discharged", "Avg Stay (days)", "Longest (days)", "Inpatients"], rows
+
+
+REPORTS = {
+    "utilization": ("Doctor utilization", doctor_utilization),
+    "cancellations": ("Cancellation rates", cancellation_rates),
+    "revenue": ("Revenue per specialization", revenue_by_specialization),
+    "stay": ("Average length of stay", length_of_stay),
+    "modes": ("Payment mode mix", payment_mode_mix),
+}
+
+
+def data_span(data):
+    """(first, last + 1 day) of the loaded appointment dates, for an open-ended run."""
+    dates = data["appointments"]["Date"]
+    dates = dates[~np.isnat(dates)]
+    if not len(dates):
+        return None, None
+    return dates.min().astype(object), dates.max().astype(object) + timedelta(days=1)
+
+
+def run_reports(names, start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """
+    Load once and compute the named reports for start <= day < end.
+    Returns ({name: (title, headers, rows)}, timings) with timings in seconds.
+    """
+    t0 = time.perf_counter()
+    data = load_data(start, end, chunk_rows)
+    t1 = time.perf_counter()
+    doctors = {d["D_ID"]: d for d in all_doctors()}
+    if not start:
+        start, end = data_span(data)
+    results = {}
+    for name in names:
+        title, report = REPORTS[name]
+        if name == "utilization" and not start:
+            continue  # no appointments, so no period to measure
+        results[name] = (title,) + report(data, doctors, start, end)
+    t2 = time.perf_counter()
+    timings = {"rows": sum(len(f) for f in data.values()), "load": t1 - t0, "compute": t2 - t1}
+    return results, timings
+
+
+def write_csv(folder, name, headers, rows):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    return path
+
+
+def print_results(results, timings, csv_folder=None):
+    for name, (title, headers, rows) in results.items():
+        print(f"\n📊 {title}")
+        print(tabulate(rows, headers=headers, tablefmt="grid", floatfmt=".2f") if rows else "No data.")
+        if csv_folder:
+            print(f"💾 Saved: {write_csv(csv_folder, name, headers, rows)}")
+    print(f"\n⏱️ {timings['rows']} rows loaded in {timings['load']:.2f}s, "
+          f"reports computed in {timings['compute']:.3f}s")
+
+
+def analytics_menu():
+    """Interactive wrapper used by the admin panel."""
+    try:
+        start = input("From date (YYYY-MM-DD, Enter for all data): ").strip()
+        start = validate_date(start) if start else None
+        end = input("To date (YYYY-MM-DD, Enter for today): ").strip() if start else ""
+        end = (validate_date(end) if end else date.today()) + timedelta(days=1) if start else None
+    except ValueError:
+        print("⚠️ Invalid date format. Use YYYY-MM-DD.")
+        return
+    if start and end <= start:
+        print("⚠️ To date is before From date.")
+        return
+    folder = input("Also save CSV files to folder (Enter to skip): ").strip() or None
+    try:
+        print_results(*run_reports(list(REPORTS), start, end), csv_folder=folder)
+    except Exception as e:
+        print("❌ Error building reports:", e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Utilization and revenue analytics")
+    parser.add_argument("--from", dest="date_from", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="last day, inclusive (YYYY-MM-DD; default: today)")
+    parser.add_argument("--report", action="append", choices=list(REPORTS),
+                        help="report to run (repeatable; default: all)")
+    parser.add_argument("--csv", metavar="FOLDER", help="also write one CSV per report into FOLDER")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per fetchmany() batch")
+    args = parser.parse_args(argv)
+
+    start = end = None
+    try:
+        if args.date_from:
+            start = validate_date(args.date_from)
+            end = (validate_date(args.date_to) if args.date_to else date.today()) + timedelta(days=1)
+        elif args.date_to:
+            parser.error("--to needs --from")
+    except ValueError:
+        parser.error("dates must be YYYY-MM-DD")
+    if start and end <= start:
+        parser.error("--to is before --from")
+
+    ensure_database()
+    print_results(*run_reports(args.report or list(REPORTS), start, end, args.chunk), csv_folder=args.csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
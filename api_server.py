@@ -0,0 +1,275 @@
+# api_server.py
+"""
+Local HTTP/JSON API over the service layer.
+
+Requests are accepted by one listener thread and handled by a fixed pool
+of worker threads (HTTP/1.1 keep-alive, so a client reuses its socket).
+The database connection pool is sized to match the workers. Bodies and
+responses are JSON; errors come back as {"error": message} with the
+ServiceError status.
+
+    python api_server.py --port 8080 --workers 8
+
+    GET  /health
+    POST /patients                        {"Name", "Age", "Gender", "Phone_No", "Email", "Address"}
+    GET  /patients/<pid>                  GET /patients?phone=...
+    GET  /patients/<pid>/appointments
+    GET  /doctors                         GET /doctors/<did>/slots?date=YYYY-MM-DD
+    POST /appointments                    {"P_ID" | "Phone_No", "D_ID", "Date", "Time_Slot", "Reason", "Payment_Mode"}
+    GET  /appointments/<aid>/receipt
+    GET  /beds
+    GET  /admissions?all=1                POST /admissions {"P_ID", "Department", "Notes"}
+    POST /admissions/<id>/discharge       {"Notes"}
+    GET  /certificates?type=&patient=     POST /certificates {"Type", "Name", "P_ID", "DOB", "DOD", ...}
+"""
+import argparse
+import json
+import queue
+import re
+import sys
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import db_setup
+import services
+
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+MAX_BODY = 1 << 20
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _first(query, name, default=None):
+    return query.get(name, [default])[0]
+
+
+# ---------- ROUTES ----------
+# (method, path regex, handler(match, query, body) -> (status, payload))
+# Path IDs match any segment; the service layer rejects a non-numeric one with a 400.
+ROUTES = []
+
+
+def route(method, pattern):
+    def register(fn):
+        ROUTES.append((method, re.compile(f"^{pattern}$"), fn))
+        return fn
+    return register
+
+
+@route("GET", "/health")
+def _health(m, query, body):
+    return 200, {"status": "ok", "pool": db_setup.pool_stats()}
+
+
+@route("POST", "/patients")
+def _register(m, query, body):
+    return 201, services.register_patient(body.get("Name"), body.get("Age"), body.get("Gender"),
+                                          body.get("Phone_No"), body.get("Email"), body.get("Address"))
+
+
+@route("GET", "/patients")
+def _patient_by_phone(m, query, body):
+    return 200, services.find_patient(phone=_first(query, "phone"))
+
+
+@route("GET", r"/patients/([^/]+)")
+def _patient(m, query, body):
+    return 200, services.find_patient(pid=m.group(1))
+
+
+@route("GET", r"/patients/([^/]+)/appointments")
+def _appointments(m, query, body):
+    return 200, services.list_appointments(pid=m.group(1))
+
+
+@route("GET", "/doctors")
+def _doctors(m, query, body):
+    return 200, services.list_doctors()
+
+
+@route("GET", r"/doctors/([^/]+)/slots")
+def _slots(m, query, body):
+    return 200, services.doctor_slots(m.group(1), _first(query, "date"))
+
+
+@route("POST", "/appointments")
+def _book(m, query, body):
+    return 201, services.book_appointment(body.get("D_ID"), body.get("Date"), body.get("Time_Slot"),
+                                          body.get("Reason", ""), pid=body.get("P_ID"),
+                                          phone=body.get("Phone_No"), payment_mode=body.get("Payment_Mode"))
+
+
+@route("GET", r"/appointments/([^/]+)/receipt")
+def _receipt(m, query, body):
+    return 200, services.appointment_receipt(m.group(1), archive=_first(query, "archive", "1") != "0")
+
+
+@route("GET", "/beds")
+def _beds(m, query, body):
+    return 200, services.bed_counts()
+
+
+@route("GET", "/admissions")
+def _admissions(m, query, body):
+    return 200, services.list_admissions(active_only=_first(query, "all", "0") != "1")
+
+
+@route("POST", "/admissions")
+def _admit(m, query, body):
+    return 201, services.admit_patient(body.get("P_ID"), body.get("Department"), body.get("Notes", ""))
+
+
+@route("POST", r"/admissions/([^/]+)/discharge")
+def _discharge(m, query, body):
+    return 200, services.discharge_patient(m.group(1), body.get("Notes", ""))
+
+
+@route("GET", "/certificates")
+def _certificates(m, query, body):
+    return 200, services.list_certificates(_first(query, "type"), _first(query, "patient"))
+
+
+@route("POST", "/certificates")
+def _certificate(m, query, body):
+    return 201, services.create_certificate(body)
+
+
+def dispatch(method, path, query, body):
+    """Run the matching route. Returns (status, payload)."""
+    allowed = False
+    for verb, pattern, handler in ROUTES:
+        m = pattern.match(path)
+        if not m:
+            continue
+        if verb != method:
+            allowed = True
+            continue
+        try:
+            return handler(m, query, body)
+        except services.ServiceError as e:
+            return e.status, {"error": str(e)}
+    return (405, {"error": "method not allowed"}) if allowed else (404, {"error": "no such endpoint"})
+
+
+# ---------- HTTP PLUMBING ----------
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "HMS-API/1.0"
+    # a keep-alive client holds its worker; idle sockets are dropped after this many seconds
+    timeout = 15
+    # headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        body = {}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            return self._respond(413, {"error": "request body too large"})
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                return self._respond(400, {"error": "body is not valid JSON"})
+            if not isinstance(body, dict):
+                return self._respond(400, {"error": "body must be a JSON object"})
+        try:
+            status, payload = dispatch(method, url.path.rstrip("/") or "/", parse_qs(url.query), body)
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        self._respond(status, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer whose connections are served by `workers` long-lived threads."""
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers=DEFAULT_WORKERS, verbose=False):
+        super().__init__(address, handler)
+        self.verbose = verbose
+        self._requests = queue.Queue(maxsize=workers * 4)
+        self._workers = [threading.Thread(target=self._work, daemon=True, name=f"api-worker-{i}")
+                         for i in range(workers)]
+        for t in self._workers:
+            t.start()
+
+    def _work(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        # blocks the listener when every worker is busy and the backlog is full
+        self._requests.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._requests.put(None)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, workers=DEFAULT_WORKERS, verbose=False):
+    """Build (but do not start) the API server; sizes the DB pool to the workers."""
+    db_setup.POOL_CONFIG["size"] = max(db_setup.POOL_CONFIG["size"], workers)
+    return PooledHTTPServer((host, port), ApiHandler, workers, verbose)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hospital Management System HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="request worker threads")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.verbose)
+    db_setup.ensure_database()
+    print(f"🌐 API listening on http://{args.host}:{server.server_address[1]} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
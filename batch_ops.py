@@ -0,0 +1,434 @@
+# batch_ops.py
+"""
+Non-interactive batch mode: run typed operations from a JSONL file.
+
+Each non-blank line is one JSON object with an "op" and that operation's
+fields (the same names the HTTP API takes):
+
+    {"op": "register_patient", "Name": "Asha Rao", "Age": 34, "Gender": "Female", "Phone_No": "98450..."}
+    {"op": "book_appointment", "P_ID": 12, "D_ID": 3, "Date": "2025-02-03", "Time_Slot": "10:00-10:30", "Payment_Mode": "UPI"}
+    {"op": "record_payment", "P_ID": 12, "A_ID": 40, "Amount": 500, "Payment_Mode": "Cash", "Notes": ""}
+    {"op": "admit", "P_ID": 12, "Department": "ICU", "Notes": ""}
+    {"op": "discharge", "Admission_ID": 7, "Notes": ""}
+    {"op": "create_certificate", "Type": "Birth", "Name": "Baby Rao", "DOB": "2025-01-30", ...}
+
+Lines are validated as they are read and applied `commit_size` at a time
+in one transaction; runs of the same insert-only op (patients, payments,
+certificates) go through one executemany(). If the database rejects a
+chunk it is retried line by line so only the bad lines fail. Every line
+gets a row in the report. The last finished line is kept in the
+batch_checkpoints table and updated inside each chunk's transaction, so
+an interrupted run resumes exactly after the last committed chunk and
+never applies a line twice. The checkpoint is removed once the whole file
+has been applied. (A crash can lose the report rows of the last committed
+chunk; the data itself is never duplicated.)
+
+    python main.py batch ops.jsonl [--commit-size 500] [--resume | --restart] [--report ops.report.csv]
+"""
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import groupby
+
+import services
+from bed_allocator import allocator
+from bill_sequence import allocate_block, format_bill_no
+from cert_import import INSERT_SQL as CERT_INSERT_SQL, validate_row
+from cert_ops import save_certificate_text
+from db_setup import db_cursor, get_pool, insert_many_ids
+from doctor_cache import all_doctors
+from patient_cache import invalidate_patient
+from patient_search import index_patient
+from revenue_rollup import paid_now, record_revenue
+
+COMMIT_SIZE = 500
+REPORT_FIELDS = ["Line", "Op", "Status", "Result", "Error"]
+
+
+class _Chunk:
+    """Work to do once the chunk's transaction commits or rolls back."""
+
+    def __init__(self):
+        self.after_commit = []
+        self.on_rollback = []
+        self.patients = []     # (P_ID, phone) registered or looked up in this transaction
+
+    def committed(self):
+        for fn in self.after_commit:
+            fn()
+        self._forget_patients()
+
+    def rolled_back(self):
+        for fn in self.on_rollback:
+            fn()
+        self._forget_patients()
+
+    def _forget_patients(self):
+        # the resolver may have cached rows read inside the transaction
+        for pid, phone in self.patients:
+            invalidate_patient(pid, phone)
+
+
+def _as_int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise services.ServiceError(f"{field} must be a number")
+
+
+def _existing(cur, table, column, ids):
+    ids = sorted({i for i in ids if i is not None})
+    if not ids:
+        return set()
+    cur.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+    return {r[0] for r in cur.fetchall()}
+
+
+# ---------- OPERATIONS ----------
+# prepare(fields) -> params: validation only, raises ServiceError
+# apply(cur, chunk, [(line, params)]) -> [(line, result dict or ServiceError)], in the caller's transaction
+def _prepare_patient(f):
+    return services.patient_fields(f.get("Name"), f.get("Age"), f.get("Gender"),
+                                   f.get("Phone_No"), f.get("Email"), f.get("Address"))
+
+
+def _apply_patients(cur, chunk, items):
+    ids = insert_many_ids(cur, services.PATIENT_INSERT_SQL, [p for _, p in items])
+    out = []
+    for (line, p), pid in zip(items, ids):
+        index_patient(cur, pid, p[0])
+        chunk.patients.append((pid, p[3]))
+        out.append((line, {"P_ID": pid}))
+    return out
+
+
+def _prepare_booking(f):
+    if not f.get("P_ID") and not f.get("Phone_No"):
+        raise services.ServiceError("give a patient ID or phone number")
+    doctor, day, slot, mode = services.booking_fields(f.get("D_ID"), f.get("Date"), f.get("Time_Slot"),
+                                                      f.get("Payment_Mode"))
+    return f.get("P_ID"), f.get("Phone_No"), doctor, day, slot, f.get("Reason", ""), mode
+
+
+def _apply_bookings(cur, chunk, items):
+    out = []
+    for line, (pid, phone, doctor, day, slot, reason, mode) in items:
+        try:
+            p = services.find_patient(pid, phone, cur)
+            chunk.patients.append((p["P_ID"], p["Phone_No"]))
+            aid, paid = services.book(cur, p["P_ID"], doctor, day, slot, reason, mode)
+        except services.ServiceError as e:
+            out.append((line, e))
+            continue
+        out.append((line, {"A_ID": aid, "Amount_Paid": paid}))
+    return out
+
+
+def _prepare_payment(f):
+    return services.payment_fields(f.get("P_ID"), f.get("Amount"), f.get("Payment_Mode"),
+                                   f.get("A_ID"), f.get("Notes"))
+
+
+def _apply_payments(cur, chunk, items):
+    patients = _existing(cur, "patients", "P_ID", [p[1] for _, p in items])
+    aids = sorted({p[0] for _, p in items if p[0] is not None})
+    doctors = {}
+    if aids:
+        cur.execute(f"SELECT A_ID, D_ID FROM appointments WHERE A_ID IN ({', '.join(['%s'] * len(aids))})",
+                    tuple(aids))
+        doctors = dict(cur.fetchall())
+    out, ready = [], []
+    for line, p in items:
+        if p[1] not in patients:
+            out.append((line, services.NotFound(f"no patient with P_ID {p[1]}")))
+        elif p[0] is not None and p[0] not in doctors:
+            out.append((line, services.NotFound(f"no appointment with A_ID {p[0]}")))
+        else:
+            ready.append((line, p))
+    if not ready:
+        return out
+    # one block of bill numbers per run, reserved in this transaction
+    day = datetime.now().strftime("%Y%m%d")
+    first = allocate_block(cur, day, len(ready))
+    bills = [format_bill_no(day, first + i) for i in range(len(ready))]
+    paid_at, paid_day = paid_now()
+    ids = insert_many_ids(cur, services.RECEIPT_INSERT_SQL,
+                          [(aid, pid, bill, amount, mode, notes, paid_at)
+                           for (_, (aid, pid, amount, mode, notes)), bill in zip(ready, bills)])
+    for (line, (aid, pid, amount, mode, notes)), bill, rid in zip(ready, bills, ids):
+        record_revenue(cur, amount, mode, doctors.get(aid), paid_day)
+        out.append((line, {"Receipt_ID": rid, "Bill_No": bill}))
+    return out
+
+
+def _prepare_admission(f):
+    dept = allocator.department(f.get("Department"))
+    if not dept:
+        raise services.NotFound(f"unknown department '{f.get('Department')}'")
+    return _as_int(f.get("P_ID"), "patient ID"), dept, (f.get("Notes") or "").strip()
+
+
+def _apply_admissions(cur, chunk, items):
+    out = []
+    for line, (pid, dept, notes) in items:
+        try:
+            services.find_patient(pid=pid, cur=cur)
+        except services.ServiceError as e:
+            out.append((line, e))
+            continue
+        result = services.admit(cur, pid, dept, notes)
+        if result is None:
+            out.append((line, services.Conflict(f"no free beds available in {dept}")))
+            continue
+        admission_id, bed_id = result
+        chunk.on_rollback.append(lambda bed_id=bed_id: allocator.cancel(bed_id))
+        out.append((line, {"Admission_ID": admission_id, "Bed_ID": bed_id, "Department": dept}))
+    return out
+
+
+def _prepare_discharge(f):
+    return _as_int(f.get("Admission_ID"), "admission ID"), (f.get("Notes") or "").strip()
+
+
+def _apply_discharges(cur, chunk, items):
+    out = []
+    for line, (admission_id, notes) in items:
+        cur.execute("SELECT Bed_ID, Department FROM admissions WHERE Admission_ID=%s AND Status='Admitted'",
+                    (admission_id,))
+        row = cur.fetchone()
+        if not row or not services.discharge(cur, admission_id, row[0], row[1], notes):
+            out.append((line, services.NotFound("no active admission with that ID")))
+            continue
+        chunk.after_commit.append(lambda bed_id=row[0]: allocator.mark_free(bed_id))
+        out.append((line, {"Admission_ID": admission_id, "Bed_ID": row[0]}))
+    return out
+
+
+def _prepare_certificate(f):
+    try:
+        return validate_row({k: "" if v is None else str(v) for k, v in f.items() if k != "op"})
+    except ValueError as e:
+        raise services.ServiceError(str(e))
+
+
+def _apply_certificates(cur, chunk, items):
+    known = _existing(cur, "patients", "P_ID", [c["P_ID"] for _, c in items])
+    issued_on = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    out, ready = [], []
+    for line, cert in items:
+        if cert["P_ID"] is not None and cert["P_ID"] not in known:
+            out.append((line, services.NotFound(f"no patient with P_ID {cert['P_ID']}")))
+        else:
+            cert["Date_Issued"] = issued_on
+            ready.append((line, cert))
+    if not ready:
+        return out
+    ids = insert_many_ids(cur, CERT_INSERT_SQL, [
+        (c["P_ID"], c["Type"], c["Name"], c["DOB"], c["DOD"], c["Parent_Guardian"],
+         c["Place_Of_Event"], c["Notes"], c["Date_Issued"]) for _, c in ready])
+    for (line, cert), cid in zip(ready, ids):
+        cert["Certificate_ID"] = cid
+        result = {"Certificate_ID": cid}
+        # files are written only once the rows are committed
+        chunk.after_commit.append(lambda cert=cert, result=result: result.update(File=save_certificate_text(cert)))
+        out.append((line, result))
+    return out
+
+
+OPERATIONS = {
+    "register_patient": (_prepare_patient, _apply_patients),
+    "book_appointment": (_prepare_booking, _apply_bookings),
+    "record_payment": (_prepare_payment, _apply_payments),
+    "admit": (_prepare_admission, _apply_admissions),
+    "discharge": (_prepare_discharge, _apply_discharges),
+    "create_certificate": (_prepare_certificate, _apply_certificates),
+}
+
+
+def parse_line(text):
+    """(op, fields) for one JSONL line, or raises ServiceError with the reason."""
+    try:
+        fields = json.loads(text)
+    except ValueError:
+        raise services.ServiceError("line is not valid JSON")
+    if not isinstance(fields, dict):
+        raise services.ServiceError("line must be a JSON object")
+    op = fields.get("op")
+    if op not in OPERATIONS:
+        raise services.ServiceError(f"unknown op '{op}' (expected one of: {', '.join(OPERATIONS)})")
+    return op, fields
+
+
+def _apply(cur, chunk, work):
+    """Apply [(line, op, params)] in order; consecutive lines with the same op are applied together."""
+    out = []
+    for op, run in groupby(work, key=lambda w: w[1]):
+        out.extend(OPERATIONS[op][1](cur, chunk, [(line, params) for line, _, params in run]))
+    return out
+
+
+def _run_chunk(conn, cur, work, mark, last):
+    """
+    Apply and commit [(line, op, params)] as one transaction; if the database
+    rejects it, roll back and retry one line per transaction. mark(cur, line)
+    records the checkpoint inside every transaction before it commits;
+    `last` is the final input line the chunk covers.
+    Returns [(line, result dict or exception)].
+    """
+    chunk = _Chunk()
+    try:
+        out = _apply(cur, chunk, work)
+        mark(cur, last)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        chunk.rolled_back()
+    else:
+        chunk.committed()
+        return out
+    out = []
+    for item in work:
+        chunk = _Chunk()
+        try:
+            result = _apply(cur, chunk, [item])
+            mark(cur, item[0])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            chunk.rolled_back()
+            out.append((item[0], e))
+            continue
+        chunk.committed()
+        out.extend(result)
+    mark(cur, last)
+    conn.commit()
+    return out
+
+
+# ---------- CHECKPOINT ----------
+def read_checkpoint(cur, key):
+    """Last committed line of the batch `key`, or None if it has no checkpoint."""
+    cur.execute("SELECT Line FROM batch_checkpoints WHERE Batch_Key = %s", (key,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _save_checkpoint(cur, key, line):
+    cur.execute("UPDATE batch_checkpoints SET Line = %s, Updated_On = %s WHERE Batch_Key = %s",
+                (line, datetime.now(), key))
+
+
+def run_batch(path, commit_size=COMMIT_SIZE, resume=False, checkpoint=None, report_path=None,
+              restart=False):
+    """
+    Execute every operation in the JSONL file at `path`.
+    Writes a per-line report (default: <path>.report.csv). The checkpoint
+    (named `checkpoint`, default: the file's absolute path) moves with each
+    committed chunk and is removed when the run completes. With resume=True
+    the lines up to the checkpoint are skipped; restart=True discards it.
+    Returns {"ops", "ok", "failed", "skipped", "seconds", "ops_per_sec", "report"}.
+    """
+    if commit_size < 1:
+        raise ValueError("commit size must be at least 1")
+    if get_pool().size < 2:
+        # doctor / bed cache reloads borrow a second connection mid-transaction
+        raise ValueError("batch mode needs a connection pool of at least 2 (POOL_CONFIG['size'])")
+    if resume and restart:
+        raise ValueError("pass either --resume or --restart, not both")
+    key = checkpoint or os.path.abspath(path)
+    if len(key) > 255:
+        raise ValueError("checkpoint name longer than 255 characters; pass a shorter --checkpoint")
+    report_path = report_path or os.path.splitext(path)[0] + ".report.csv"
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"no such file: {path}")
+    with db_cursor() as (conn, cur):
+        skip_to = read_checkpoint(cur, key)
+        if skip_to is not None and restart:
+            cur.execute("DELETE FROM batch_checkpoints WHERE Batch_Key = %s", (key,))
+            skip_to = None
+        elif skip_to is not None and not resume:
+            raise ValueError(f"batch '{key}' was interrupted after line {skip_to}; "
+                             f"pass --resume to continue or --restart to start over")
+        if skip_to is None:
+            cur.execute("INSERT INTO batch_checkpoints (Batch_Key, Line, Updated_On) VALUES (%s, %s, %s)",
+                        (key, 0, datetime.now()))
+            skip_to = 0
+        conn.commit()
+    resumed = skip_to > 0
+    counts = {"ok": 0, "failed": 0}
+
+    # warm the caches that load through their own pooled connection
+    all_doctors()
+    allocator.counts()
+
+    start = time.perf_counter()
+    with open(path, encoding="utf-8-sig") as f, \
+            open(report_path, "a" if resumed else "w", newline="", encoding="utf-8") as report, \
+            db_cursor() as (conn, cur):
+        writer = csv.writer(report)
+        if not resumed:
+            writer.writerow(REPORT_FIELDS)
+
+        def mark(c, line):
+            _save_checkpoint(c, key, line)
+
+        def flush(rows):
+            work = [(line, op, params) for line, op, params, error in rows if error is None]
+            if work:
+                results = dict(_run_chunk(conn, cur, work, mark, rows[-1][0]))
+            else:
+                results = {}
+                mark(cur, rows[-1][0])
+                conn.commit()
+            for line, op, params, error in rows:
+                result = results.get(line, error)
+                if isinstance(result, dict):
+                    outcome, row = "ok", [line, op, "ok", json.dumps(result, default=str), ""]
+                else:
+                    status = "rejected" if error is not None else "failed"
+                    outcome, row = "failed", [line, op or "", status, "", str(result)]
+                writer.writerow(row)
+                counts[outcome] += 1
+            report.flush()
+
+        rows = []
+        for line, text in enumerate(f, start=1):
+            if line <= skip_to or not text.strip():
+                continue
+            op = None
+            try:
+                op, fields = parse_line(text)
+                rows.append((line, op, OPERATIONS[op][0](fields), None))
+            except services.ServiceError as e:
+                rows.append((line, op, None, e))
+            if len(rows) >= commit_size:
+                flush(rows)
+                rows = []
+        if rows:
+            flush(rows)
+        cur.execute("DELETE FROM batch_checkpoints WHERE Batch_Key = %s", (key,))
+        conn.commit()
+
+    elapsed = time.perf_counter() - start
+    ops = counts["ok"] + counts["failed"]
+    return {
+        "ops": ops,
+        "ok": counts["ok"],
+        "failed": counts["failed"],
+        "skipped": skip_to,
+        "seconds": elapsed,
+        "ops_per_sec": ops / elapsed if elapsed else 0.0,
+        "report": report_path,
+    }
+
+
+def print_batch_summary(result):
+    if result["skipped"]:
+        print(f"⏩ Resumed after line {result['skipped']}")
+    print(f"✅ {result['ok']} of {result['ops']} operations succeeded "
+          f"in {result['seconds']:.2f}s ({result['ops_per_sec']:.0f} ops/sec)")
+    if result["failed"]:
+        print(f"⚠️ {result['failed']} lines were rejected or failed — see the report.")
+    print(f"📝 Report saved at: {result['report']}")
@@ -0,0 +1,163 @@
+# bed_allocator.py
+"""
+Bed allocation backed by per-department occupancy bitmaps.
+
+Each department keeps its beds in Bed_ID order and an int bitmask with
+bit i set while bed i is free. Picking a free bed is the lowest set bit
+and free / total counts come straight from the mask, with no query.
+
+The bitmap is only a hint. A claim is confirmed in the caller's
+transaction: MySQL locks the row with `SELECT ... FOR UPDATE SKIP LOCKED`,
+and SQLite uses a conditional `UPDATE ... WHERE Is_Occupied = 0`. Two
+admissions (in this or another process) can never get the same bed. Hints
+that turn out stale are corrected as they are found, and the whole map is
+reloaded every RELOAD_INTERVAL seconds.
+"""
+import threading
+import time
+
+from db_setup import backend, db_cursor
+
+# Seconds before the bitmaps are re-read (picks up beds freed by other processes)
+RELOAD_INTERVAL = 60
+
+
+def _lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+class BedAllocator:
+    def __init__(self, reload_interval=RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._depts = None       # name -> {"ids": [Bed_ID], "free": bitmask}
+        self._where = {}         # Bed_ID -> (name, bit)
+        self._loaded_at = 0.0
+        self._stats = {"claims": 0, "stale_hints": 0, "fallbacks": 0, "reloads": 0}
+
+    def _load(self, cur=None):
+        q = "SELECT Bed_ID, Department, Is_Occupied FROM beds ORDER BY Department, Bed_ID"
+        if cur is not None:
+            cur.execute(q)
+            rows = cur.fetchall()
+        else:
+            with db_cursor() as (conn, c):
+                c.execute(q)
+                rows = c.fetchall()
+        depts, where = {}, {}
+        for bed_id, dept, occupied in rows:
+            d = depts.setdefault(dept, {"ids": [], "free": 0})
+            bit = len(d["ids"])
+            d["ids"].append(bed_id)
+            if not occupied:
+                d["free"] |= 1 << bit
+            where[bed_id] = (dept, bit)
+        with self._lock:
+            self._depts, self._where = depts, where
+            self._loaded_at = time.monotonic()
+            self._stats["reloads"] += 1
+
+    def _ensure_loaded(self, cur=None):
+        if self._depts is None or time.monotonic() - self._loaded_at > self.reload_interval:
+            self._load(cur)
+
+    def _set(self, bed_id, free):
+        with self._lock:
+            loc = self._where.get(bed_id)
+            if loc is None:
+                return
+            d = self._depts[loc[0]]
+            if free:
+                d["free"] |= 1 << loc[1]
+            else:
+                d["free"] &= ~(1 << loc[1])
+
+    # ---------- lookups ----------
+    def department(self, name):
+        """Canonical department name for `name` (case-insensitive), or None."""
+        self._ensure_loaded()
+        name = (name or "").strip().lower()
+        for dept in self._depts:
+            if dept.lower() == name:
+                return dept
+        return None
+
+    def counts(self):
+        """{department: (free, total)} straight from the bitmaps."""
+        self._ensure_loaded()
+        with self._lock:
+            return {dept: (_popcount(d["free"]), len(d["ids"])) for dept, d in self._depts.items()}
+
+    def _take_hint(self, dept):
+        """Pop the lowest free bed of `dept` from the bitmap (None if it looks full)."""
+        with self._lock:
+            d = self._depts.get(dept)
+            if not d or not d["free"]:
+                return None
+            bit = _lowest_bit(d["free"])
+            d["free"] &= ~(1 << bit)
+            return d["ids"][bit]
+
+    # ---------- transactional claim / release ----------
+    def _confirm(self, cur, bed_id, pid):
+        """Occupy `bed_id` for `pid` inside the caller's transaction if it is still free."""
+        if backend() == "mysql":
+            cur.execute("SELECT Bed_ID FROM beds WHERE Bed_ID=%s AND Is_Occupied=0 FOR UPDATE SKIP LOCKED",
+                        (bed_id,))
+            if not cur.fetchone():
+                return False
+        cur.execute("UPDATE beds SET Is_Occupied=1, Current_P_ID=%s WHERE Bed_ID=%s AND Is_Occupied=0",
+                    (pid, bed_id))
+        return cur.rowcount == 1
+
+    def claim(self, cur, dept, pid):
+        """
+        Occupy a free bed of `dept` for patient `pid` in the caller's
+        transaction and return its Bed_ID, or None if the department is full.
+        If the transaction is rolled back, call cancel(bed_id).
+        """
+        self._ensure_loaded(cur)
+        while True:
+            bed_id = self._take_hint(dept)
+            if bed_id is None:
+                break
+            if self._confirm(cur, bed_id, pid):
+                self._stats["claims"] += 1
+                return bed_id
+            self._stats["stale_hints"] += 1   # taken elsewhere; the bit stays cleared
+        # bitmap says full: ask the database (beds may have been freed by another process)
+        self._stats["fallbacks"] += 1
+        lock = " FOR UPDATE SKIP LOCKED" if backend() == "mysql" else ""
+        cur.execute(f"SELECT Bed_ID FROM beds WHERE Department=%s AND Is_Occupied=0 ORDER BY Bed_ID LIMIT 5{lock}",
+                    (dept,))
+        for (bed_id,) in cur.fetchall():
+            if self._confirm(cur, bed_id, pid):
+                self._stats["claims"] += 1
+                return bed_id
+        return None
+
+    def cancel(self, bed_id):
+        """Undo the bitmap side of a claim whose transaction was rolled back."""
+        self._set(bed_id, True)
+
+    def release(self, cur, bed_id):
+        """Free the bed inside the caller's transaction; call mark_free() after commit."""
+        cur.execute("UPDATE beds SET Is_Occupied=0, Current_P_ID=NULL WHERE Bed_ID=%s", (bed_id,))
+
+    def mark_free(self, bed_id):
+        self._set(bed_id, True)
+
+    def invalidate(self):
+        with self._lock:
+            self._depts = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+allocator = BedAllocator()
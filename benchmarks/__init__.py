@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Stand-alone performance benchmarks. Run from the repo root with `python -m benchmarks.<name>`."""
@@ -0,0 +1,107 @@
+# benchmarks/analytics.py
+"""
+Throughput benchmark for the NumPy analytics reports.
+
+Fills a fresh database with synthetic doctors, appointments, billing,
+receipts and admissions, then times the columnar load and the report
+computation separately.
+
+    python -m benchmarks.analytics --appointments 1000000 --chunk 50000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import analytics
+from benchmarks.common import add_backend_args, setup_backend
+from db_setup import db_cursor
+from doctor_cache import invalidate_doctors
+
+SPECIALIZATIONS = ["Cardiology", "Neurology", "Orthopedics", "Pediatrics", "Dermatology", "ENT"]
+DEPARTMENTS = ["ICU", "IPD", "Emergency", "Surgery"]
+MODES = ["Cash", "Card", "UPI"]
+STATUSES = ["Completed"] * 6 + ["Scheduled"] * 3 + ["Cancelled"]
+SLOTS = ["09:00-09:30", "09:30-10:00", "10:00-10:30", "10:30-11:00", "11:00-11:30", "11:30-12:00"]
+
+
+def _populate(appointments, doctors, days, batch=20000):
+    rnd = random.Random(7)
+    first = date.today() - timedelta(days=days)
+    tag = f"{time.time_ns() % 10**9:09d}"
+    availability = json.dumps({d: SLOTS for d in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]})
+    with db_cursor() as (conn, cur):
+        cur.executemany("""
+            INSERT INTO doctors (Name, Specialization, Fees, Phone_No, Email, Availability)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(f"Dr Bench {i}", SPECIALIZATIONS[i % len(SPECIALIZATIONS)], 300 + 50 * (i % 8),
+               f"D{tag}{i:03d}", f"d{tag}_{i}@bench", availability) for i in range(doctors)])
+        cur.execute("SELECT D_ID FROM doctors WHERE Email LIKE %s", (f"d{tag}_%",))
+        dids = [r[0] for r in cur.fetchall()]
+        cur.execute("INSERT INTO patients (Name, Age, Gender, Phone_No, Email) VALUES (%s, %s, %s, %s, %s)",
+                    ("Analytics Bench", 40, "Other", f"P{tag}", f"p{tag}@bench"))
+        pid = cur.lastrowid
+        cur.execute("SELECT COALESCE(MAX(A_ID), 0) FROM appointments")
+        next_aid = cur.fetchone()[0] + 1
+        for start in range(0, appointments, batch):
+            n = min(batch, appointments - start)
+            appts, bills, receipts, stays = [], [], [], []
+            for i in range(n):
+                aid = next_aid + start + i
+                day = first + timedelta(days=rnd.randrange(days))
+                status = rnd.choice(STATUSES)
+                appts.append((aid, pid, rnd.choice(dids), day, rnd.choice(SLOTS), status))
+                paid = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rnd.randrange(600))
+                if status != "Cancelled":
+                    bills.append((aid, 300 + 50 * rnd.randrange(8), rnd.choice(MODES), paid))
+                if i % 5 == 0:
+                    receipts.append((aid, pid, f"BENCH-{tag}-{aid}", rnd.randrange(100, 5000),
+                                     rnd.choice(MODES), paid))
+                if i % 20 == 0:
+                    out = paid + timedelta(hours=rnd.randrange(6, 24 * 14))
+                    stays.append((pid, 1, rnd.choice(DEPARTMENTS), paid, out, "Discharged"))
+            cur.executemany("""
+                INSERT INTO appointments (A_ID, P_ID, D_ID, Appointment_Date, Time_Slot, Status)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, appts)
+            cur.executemany("INSERT INTO billing (A_ID, Amount, Payment_Mode, Date_Paid) VALUES (%s, %s, %s, %s)",
+                            bills)
+            cur.executemany("""
+                INSERT INTO receipts (A_ID, P_ID, Bill_No, Amount, Payment_Mode, Date_Paid)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, receipts)
+            cur.executemany("""
+                INSERT INTO admissions (P_ID, Bed_ID, Department, Admit_Date, Discharge_Date, Status)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, stays)
+            conn.commit()
+    invalidate_doctors()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--appointments", type=int, default=200000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365, help="spread appointments over this many days")
+    parser.add_argument("--chunk", type=int, default=analytics.CHUNK_ROWS, help="rows per fetchmany() batch")
+    parser.add_argument("--show", action="store_true", help="print the report tables")
+    args = parser.parse_args()
+    setup_backend(args)
+
+    t0 = time.perf_counter()
+    _populate(args.appointments, args.doctors, args.days)
+    print(f"Populated {args.appointments} appointments in {time.perf_counter() - t0:.1f}s")
+
+    for label, span in (("all data", (None, None)), ("last 30 days", (date.today() - timedelta(days=30), date.today()))):
+        results, timings = analytics.run_reports(list(analytics.REPORTS), *span, chunk_rows=args.chunk)
+        total = timings["load"] + timings["compute"]
+        print(f"\n{label:13}: {timings['rows']} rows  load {timings['load']:.2f}s  "
+              f"compute {timings['compute'] * 1000:.1f}ms  ({timings['rows'] / total:,.0f} rows/s)")
+    if args.show:
+        analytics.print_results(results, timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/api_throughput.py
+"""
+Requests/sec of the HTTP/JSON API at several client concurrency levels.
+
+Starts api_server in-process on a free port, then for each level runs that
+many keep-alive clients for a fixed number of requests each. The mix is
+60% reads (a patient's appointments, a doctor's free slots, bed counts)
+and 40% writes (booking a distinct slot with payment, registering a patient).
+
+    python -m benchmarks.api_throughput --workers 8 --levels 1,4,16,32 --requests 200
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from datetime import date, timedelta
+from itertools import count
+
+import api_server
+from benchmarks.common import add_backend_args, percentile, setup_backend
+from db_setup import db_cursor
+from doctor_cache import invalidate_doctors
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SLOTS = [f"{h:02d}:{m:02d}-{h + (m + 10) // 60:02d}:{(m + 10) % 60:02d}" for h in range(8, 20) for m in range(0, 60, 10)]
+
+
+def _prepare(patients):
+    tag = f"{time.time_ns() % 10**9:09d}"
+    with db_cursor() as (conn, cur):
+        cur.execute("""
+            INSERT INTO doctors (Name, Specialization, Fees, Phone_No, Email, Availability)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (f"Dr API {tag}", "General", 400, f"A{tag}", f"api{tag}@bench", json.dumps({d: SLOTS for d in WEEKDAYS})))
+        did = cur.lastrowid
+        cur.executemany("INSERT INTO patients (Name, Age, Gender, Phone_No, Email) VALUES (%s, %s, %s, %s, %s)",
+                        [(f"Api Patient {i}", 30, "Other", f"Q{tag}{i:04d}", f"q{tag}_{i}@bench")
+                         for i in range(patients)])
+        cur.execute("SELECT P_ID FROM patients WHERE Email LIKE %s ORDER BY P_ID", (f"q{tag}_%",))
+        pids = [r[0] for r in cur.fetchall()]
+        conn.commit()
+    invalidate_doctors()
+    return tag, did, pids
+
+
+def run_level(port, clients, per_client, tag, did, pids, booking, walk_ins):
+    latencies, errors, statuses = [], [], {}
+    lock = threading.Lock()
+    gate = threading.Barrier(clients + 1)
+    tomorrow = date.today() + timedelta(days=1)
+
+    def client(n):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, local_status = [], {}
+        gate.wait()
+        for i in range(per_client):
+            pid = pids[(n * per_client + i) % len(pids)]
+            kind = i % 5
+            if kind == 0:
+                method, path, body = "GET", f"/patients/{pid}/appointments", None
+            elif kind == 1:
+                method, path, body = "GET", f"/doctors/{did}/slots?date={tomorrow}", None
+            elif kind == 2:
+                method, path, body = "GET", "/beds", None
+            elif kind == 3:
+                k = next(booking)
+                method, path = "POST", "/appointments"
+                body = {"P_ID": pid, "D_ID": did, "Time_Slot": SLOTS[k % len(SLOTS)],
+                        "Date": str(tomorrow + timedelta(days=k // len(SLOTS))), "Payment_Mode": "UPI"}
+            else:
+                method, path = "POST", "/patients"
+                body = {"Name": f"Walk In {n} {i}", "Age": 40, "Gender": "Female",
+                        "Phone_No": f"W{tag}{next(walk_ins):06d}"}
+            data = json.dumps(body).encode() if body is not None else None
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                local_status[resp.status] = local_status.get(resp.status, 0) + 1
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                with lock:
+                    errors.append(str(e))
+                continue
+            local.append(time.perf_counter() - t0)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            for status, n_ in local_status.items():
+                statuses[status] = statuses.get(status, 0) + n_
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    gate.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return wall, latencies, statuses, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--workers", type=int, default=api_server.DEFAULT_WORKERS, help="server worker threads")
+    parser.add_argument("--levels", default="1,4,16,32", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client per level")
+    parser.add_argument("--patients", type=int, default=200)
+    args = parser.parse_args()
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    setup_backend(args, pool_size=args.workers)
+
+    tag, did, pids = _prepare(args.patients)
+    server = api_server.make_server(port=0, workers=args.workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    booking, walk_ins = count(), count()
+    print(f"API on port {port} with {args.workers} workers; {args.requests} requests per client\n")
+
+    try:
+        for clients in levels:
+            wall, lat, statuses, errors = run_level(port, clients, args.requests, tag, did, pids, booking, walk_ins)
+            done = len(lat)
+            print(f"clients {clients:>3}: {done / wall:8.0f} req/s   "
+                  f"p50 {percentile(lat, 50) * 1000:6.2f}ms  p95 {percentile(lat, 95) * 1000:6.2f}ms  "
+                  f"p99 {percentile(lat, 99) * 1000:6.2f}ms   status {dict(sorted(statuses.items()))}"
+                  + (f"  errors {len(errors)}" if errors else ""))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
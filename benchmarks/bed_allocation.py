@@ -0,0 +1,131 @@
+# benchmarks/bed_allocation.py
+"""
+Concurrent admission benchmark for the bed allocator.
+
+N admitting clerks each admit and then discharge patients into one small
+department, so beds are contended and recycled constantly. Reports
+admissions/sec and claim latency, then checks that no bed was ever held
+by two active admissions and that beds and admissions agree.
+
+    python -m benchmarks.bed_allocation --clerks 16 --admits 50 --beds 8
+"""
+import argparse
+import random
+import threading
+import time
+
+from services import admit, discharge
+from bed_allocator import allocator
+from benchmarks.common import add_backend_args, percentile, setup_backend
+from db_setup import db_cursor, get_connection
+from ward_census import read_census, rebuild_census
+
+
+def _prepare(beds, clerks):
+    tag = f"{time.time_ns() % 10**9:09d}"
+    dept = f"Bench{tag}"
+    with db_cursor() as (conn, cur):
+        cur.executemany("INSERT INTO beds (Department, Bed_No) VALUES (%s, %s)",
+                        [(dept, f"B{i + 1}") for i in range(beds)])
+        cur.executemany("INSERT INTO patients (Name, Age, Gender, Phone_No, Email) VALUES (%s, %s, %s, %s, %s)",
+                        [(f"Inpatient {i}", 40, "Other", f"I{tag}{i:03d}", f"i{tag}_{i}@bench") for i in range(clerks)])
+        cur.execute("SELECT P_ID FROM patients WHERE Email LIKE %s ORDER BY P_ID", (f"i{tag}_%",))
+        pids = [r[0] for r in cur.fetchall()]
+        rebuild_census(cur)
+        conn.commit()
+    allocator.invalidate()
+    return dept, pids
+
+
+def run(clerks, admits, beds):
+    dept, pids = _prepare(beds, clerks)
+    latencies = []
+    results = {"admitted": 0, "full": 0, "errors": 0}
+    lock = threading.Lock()
+    gate = threading.Barrier(clerks)
+
+    def clerk(pid):
+        local_lat, local = [], {"admitted": 0, "full": 0, "errors": 0}
+        gate.wait()
+        for _ in range(admits):
+            t0 = time.perf_counter()
+            bed_id = None
+            with get_connection() as conn:
+                cur = conn.cursor()
+                try:
+                    result = admit(cur, pid, dept, "bench")
+                    if result is None:
+                        conn.rollback()
+                        local["full"] += 1
+                    else:
+                        admission_id, bed_id = result
+                        conn.commit()
+                        local["admitted"] += 1
+                except Exception:
+                    conn.rollback()
+                    if bed_id is not None:
+                        allocator.cancel(bed_id)
+                    local["errors"] += 1
+                local_lat.append(time.perf_counter() - t0)
+                if bed_id is not None:
+                    time.sleep(random.uniform(0, 0.002))   # the patient stays a moment
+                    discharge(cur, admission_id, bed_id, dept)
+                    conn.commit()
+                    allocator.mark_free(bed_id)
+                cur.close()
+        with lock:
+            latencies.extend(local_lat)
+            for k, v in local.items():
+                results[k] += v
+
+    threads = [threading.Thread(target=clerk, args=(pid,)) for pid in pids]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    with db_cursor() as (conn, cur):
+        cur.execute("""
+            SELECT a.Bed_ID, COUNT(*) FROM admissions a
+            WHERE a.Department = %s AND a.Status = 'Admitted'
+            GROUP BY a.Bed_ID HAVING COUNT(*) > 1
+        """, (dept,))
+        doubled = cur.fetchall()
+        cur.execute("SELECT COUNT(*) FROM beds WHERE Department = %s AND Is_Occupied = 1", (dept,))
+        occupied = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM admissions WHERE Department = %s AND Status = 'Admitted'", (dept,))
+        active = cur.fetchone()[0]
+        census = {r[0]: r[2] for r in read_census(cur)}.get(dept)
+
+    latencies.sort()
+    total = clerks * admits
+    print(f"\nClerks: {clerks}  admits each: {admits}  beds: {beds}")
+    print(f"Wall time        : {wall:.3f}s  ({results['admitted'] / wall:.0f} admissions/s, {total / wall:.0f} attempts/s)")
+    print(f"Admitted / full  : {results['admitted']} / {results['full']}  errors: {results['errors']}")
+    print(f"Claim latency ms : p50 {percentile(latencies, 50) * 1000:.2f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.2f}  p99 {percentile(latencies, 99) * 1000:.2f}")
+    print(f"Allocator        : {allocator.stats()}")
+    if doubled or occupied != active or census != occupied:
+        print(f"❌ INCONSISTENT: doubled beds {doubled}, occupied {occupied} vs active admissions {active}"
+              f" vs census {census}")
+        return False
+    print("✅ No bed was assigned twice; beds, admissions and the ward census agree.")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--clerks", type=int, default=16)
+    parser.add_argument("--admits", type=int, default=50)
+    parser.add_argument("--beds", type=int, default=8)
+    args = parser.parse_args()
+    setup_backend(args, pool_size=args.clerks)
+    ok = run(args.clerks, args.admits, args.beds)
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
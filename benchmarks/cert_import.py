@@ -0,0 +1,82 @@
+# benchmarks/cert_import.py
+"""
+Throughput benchmark for bulk certificate issuance.
+
+Generates a synthetic CSV (a share of the rows deliberately invalid),
+imports it with cert_import and reports rows/sec, alongside the old
+one-INSERT-per-certificate path for comparison.
+
+    python -m benchmarks.cert_import --rows 5000 --chunk 500 --workers 4
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import cert_ops
+from benchmarks.common import add_backend_args, setup_backend
+from cert_import import INSERT_SQL, import_certificates
+from db_setup import db_cursor
+
+
+def _write_csv(path, rows, bad_ratio):
+    start = date(2024, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Type", "Name", "P_ID", "DOB", "DOD", "Parent_Guardian", "Place_Of_Event", "Notes"])
+        for i in range(rows):
+            dob = start + timedelta(days=i % 365)
+            if random.random() < bad_ratio:
+                w.writerow(["Birth", f"Bad Row {i}", "", "31-12-2024", "", "", "", ""])
+            elif i % 10 == 0:
+                w.writerow(["Death", f"Person {i}", "", dob - timedelta(days=20000), dob, f"Kin {i}", "Hospital", ""])
+            else:
+                w.writerow(["Birth", f"Baby {i}", "", dob, "", f"Parent {i}", "Hospital", "bench"])
+
+
+def _row_at_a_time(rows):
+    """Baseline: what create_certificate does per row (INSERT, commit, SELECT back, write file)."""
+    t0 = time.perf_counter()
+    with db_cursor(dictionary=True) as (conn, cur):
+        for i in range(rows):
+            cur.execute(INSERT_SQL, (None, "Birth", f"Single {i}", date(2024, 1, 1), None,
+                                     "Parent", "Hospital", "", time.strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+            cur.execute("SELECT * FROM certificates WHERE Certificate_ID=%s", (cur.lastrowid,))
+            cert_ops.save_certificate_text(cur.fetchone())
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bad-ratio", type=float, default=0.02, help="share of invalid rows")
+    parser.add_argument("--baseline-rows", type=int, default=500,
+                        help="rows for the one-at-a-time comparison (0 to skip)")
+    args = parser.parse_args()
+    setup_backend(args)
+
+    work = tempfile.mkdtemp(prefix="hms_cert_bench_")
+    cert_ops.CERT_FOLDER = os.path.join(work, "Certificates")
+    os.makedirs(cert_ops.CERT_FOLDER, exist_ok=True)
+    csv_path = os.path.join(work, "certificates.csv")
+    _write_csv(csv_path, args.rows, args.bad_ratio)
+
+    result = import_certificates(csv_path, chunk_size=args.chunk, workers=args.workers)
+    print(f"\nRows: {result['rows']}  chunk: {args.chunk}  workers: {args.workers}")
+    print(f"Bulk import     : {result['seconds']:.3f}s  ({result['rows_per_sec']:.0f} rows/s)  "
+          f"issued {result['issued']}, rejected {result['failed']}")
+    if args.baseline_rows:
+        secs = _row_at_a_time(args.baseline_rows)
+        print(f"Row at a time   : {secs:.3f}s  ({args.baseline_rows / secs:.0f} rows/s) for {args.baseline_rows} rows")
+    print(f"Report: {result['report']}")
+
+
+if __name__ == "__main__":
+    main()
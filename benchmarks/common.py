@@ -0,0 +1,59 @@
+# benchmarks/common.py
+"""Shared setup for the benchmark scripts: backend selection, fresh schema, timing helpers."""
+import builtins
+import os
+import tempfile
+from contextlib import contextmanager
+
+import db_setup
+
+
+def add_backend_args(parser):
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite",
+                        help="storage engine to benchmark (default: sqlite)")
+    parser.add_argument("--sqlite-path", default=None,
+                        help="SQLite file to use (default: a fresh temporary file)")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="connection pool size (default: matches the concurrency)")
+
+
+def setup_backend(args, pool_size=None):
+    """Point db_setup at the chosen backend and make sure the schema exists."""
+    size = args.pool_size or pool_size
+    if size:
+        db_setup.POOL_CONFIG["size"] = size
+    if args.backend == "sqlite":
+        path = args.sqlite_path or os.path.join(tempfile.mkdtemp(prefix="hms_bench_"), "hospital.db")
+        db_setup.configure_backend("sqlite", path=path)
+        print(f"Backend: sqlite ({path})")
+    else:
+        db_setup.configure_backend("mysql")
+        print(f"Backend: mysql ({db_setup.DB_CONFIG['host']}/{db_setup.DB_CONFIG['database']})")
+    db_setup.init_database()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+@contextmanager
+def scripted_input(answers):
+    """Answer input() prompts from `answers` in order, so an interactive *_ops function can be timed."""
+    answers = iter(answers)
+    real = builtins.input
+
+    def fake(prompt=""):
+        try:
+            return next(answers)
+        except StopIteration:
+            raise RuntimeError(f"no scripted answer for prompt {prompt!r}")
+
+    builtins.input = fake
+    try:
+        yield
+    finally:
+        builtins.input = real
@@ -0,0 +1,105 @@
+# benchmarks/patient_import.py
+"""
+Throughput benchmark for the bulk patient importer.
+
+Registers a set of existing patients, then generates a legacy-style CSV
+(messy phone formats, mixed-case emails, M/F genders) in which a share of
+the rows repeat an existing or earlier phone / email or are invalid. The
+import is timed against the 50k rows/min target, alongside the
+one-patient-per-transaction register_patient path for comparison.
+
+    python -m benchmarks.patient_import --rows 100000 --chunk 1000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+import services
+from benchmarks.common import add_backend_args, setup_backend
+from db_setup import db_cursor
+from patient_import import CHUNK_SIZE, import_patients
+
+TARGET_ROWS_PER_MIN = 50000
+
+
+def _phone(tag, i):
+    digits = f"9{tag}{i:06d}"
+    style = i % 3
+    if style == 0:
+        return digits
+    if style == 1:
+        return f"+91 {digits[:5]}-{digits[5:]}"
+    return f"({digits[:3]}) {digits[3:6]} {digits[6:]}"
+
+
+def _seed_existing(tag, count):
+    with db_cursor() as (conn, cur):
+        cur.executemany(services.PATIENT_INSERT_SQL,
+                        [(f"Existing {i}", 40, "Male", f"9{tag}{i:06d}", f"old{i}.{tag}@bench", "")
+                         for i in range(count)])
+        conn.commit()
+
+
+def _write_csv(path, rows, tag, existing, dup_ratio, bad_ratio):
+    rnd = random.Random(11)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Name", "Age", "Gender", "Phone_No", "Email", "Address"])
+        for i in range(existing, existing + rows):
+            roll = rnd.random()
+            phone, email = _phone(tag, i), f"Patient{i}.{tag}@Bench.example"
+            if roll < dup_ratio / 2 and existing:
+                phone = _phone(tag, rnd.randrange(existing))                 # already registered
+            elif roll < dup_ratio and i > existing:
+                email = f"patient{rnd.randrange(existing, i)}.{tag}@bench.example"   # earlier in this file
+            elif roll < dup_ratio + bad_ratio:
+                phone = "n/a"
+            w.writerow([f"Legacy Patient {i}", rnd.randrange(1, 95), rnd.choice("MFO"), phone, email,
+                        f"{i} Main Road"])
+
+
+def _one_at_a_time(tag, rows):
+    """Baseline: register_patient per row (own transaction, trigram index, cache invalidation)."""
+    t0 = time.perf_counter()
+    for i in range(rows):
+        services.register_patient(f"Single {i}", 30, "Female", f"8{tag}{i:06d}", None)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--existing", type=int, default=10000, help="patients registered before the import")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--dup-ratio", type=float, default=0.03, help="share of duplicate rows")
+    parser.add_argument("--bad-ratio", type=float, default=0.01, help="share of invalid rows")
+    parser.add_argument("--baseline-rows", type=int, default=500,
+                        help="rows for the one-at-a-time comparison (0 to skip)")
+    args = parser.parse_args()
+    setup_backend(args)
+
+    tag = f"{time.time_ns() % 10**3:03d}"
+    _seed_existing(tag, args.existing)
+    work = tempfile.mkdtemp(prefix="hms_patient_bench_")
+    csv_path = os.path.join(work, "patients.csv")
+    _write_csv(csv_path, args.rows, tag, args.existing, args.dup_ratio, args.bad_ratio)
+
+    result = import_patients(csv_path, chunk_size=args.chunk)
+    verdict = "meets" if result["rows_per_min"] >= TARGET_ROWS_PER_MIN else "MISSES"
+    print(f"\nRows: {result['rows']}  existing: {args.existing}  chunk: {args.chunk}")
+    print(f"Bulk import     : {result['seconds']:.2f}s  ({result['rows_per_min']:,.0f} rows/min, "
+          f"{verdict} the {TARGET_ROWS_PER_MIN:,} target)  imported {result['imported']}, "
+          f"rejected {result['rejected']}")
+    if args.baseline_rows:
+        secs = _one_at_a_time(tag, args.baseline_rows)
+        print(f"One at a time   : {secs:.2f}s  ({args.baseline_rows / secs * 60:,.0f} rows/min) "
+              f"for {args.baseline_rows} rows")
+    print(f"Rejects: {result['rejects']}")
+
+
+if __name__ == "__main__":
+    main()
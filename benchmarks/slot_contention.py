@@ -0,0 +1,117 @@
+# benchmarks/slot_contention.py
+"""
+Contention benchmark for slot reservations.
+
+N concurrent bookers hammer the same hot doctor on one day. Every slot has
+a fixed capacity, so the number of successful bookings must never exceed
+slots x capacity no matter how many bookers race for them.
+
+    python -m benchmarks.slot_contention --bookers 32 --attempts 50 --slots 8 --capacity 2
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import add_backend_args, percentile, setup_backend
+from db_setup import db_cursor, get_connection
+from slot_inventory import SlotUnavailable, book_slot
+
+
+def _prepare(slots, bookers):
+    """Create one hot doctor with `slots` slots on a future day and one patient per booker."""
+    slot_names = [f"{9 + i // 2:02d}:{30 * (i % 2):02d}-{9 + (i + 1) // 2:02d}:{30 * ((i + 1) % 2):02d}"
+                  for i in range(slots)]
+    day = date.today() + timedelta(days=30)
+    tag = f"{time.time_ns() % 10**9:09d}"
+    with db_cursor() as (conn, cur):
+        cur.execute("""
+            INSERT INTO doctors (Name, Specialization, Experience, Fees, Phone_No, Email, Availability, Gender)
+            VALUES (%s, 'Bench', 1, 100, %s, %s, NULL, 'Other')
+        """, (f"Hot Doctor {tag}", f"H{tag}", f"hot{tag}@bench"))
+        did = cur.lastrowid
+        patients = [(f"Booker {i}", 30, "Other", f"B{tag}{i:03d}", f"b{tag}_{i}@bench") for i in range(bookers)]
+        cur.executemany("""
+            INSERT INTO patients (Name, Age, Gender, Phone_No, Email) VALUES (%s, %s, %s, %s, %s)
+        """, patients)
+        cur.execute("SELECT P_ID FROM patients WHERE Email LIKE %s ORDER BY P_ID", (f"b{tag}_%",))
+        pids = [r[0] for r in cur.fetchall()]
+        conn.commit()
+    return did, day, slot_names, pids
+
+
+def run(bookers, attempts, slots, capacity):
+    did, day, slot_names, pids = _prepare(slots, bookers)
+    latencies = []
+    results = {"booked": 0, "full": 0, "errors": 0, "retries": 0}
+    lock = threading.Lock()
+    start_gate = threading.Barrier(bookers)
+
+    def booker(pid):
+        local_lat, local = [], {"booked": 0, "full": 0, "errors": 0, "retries": 0}
+        start_gate.wait()
+        for _ in range(attempts):
+            slot = random.choice(slot_names)
+            t0 = time.perf_counter()
+            with get_connection() as conn:
+                try:
+                    book_slot(conn, pid, did, day, slot, "bench", capacity=capacity, stats=local)
+                    local["booked"] += 1
+                except SlotUnavailable:
+                    local["full"] += 1
+                except Exception:
+                    local["errors"] += 1
+            local_lat.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local_lat)
+            for k, v in local.items():
+                results[k] += v
+
+    threads = [threading.Thread(target=booker, args=(pid,)) for pid in pids]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    with db_cursor() as (conn, cur):
+        cur.execute("""
+            SELECT Time_Slot, COUNT(*) FROM appointments
+            WHERE D_ID = %s AND Appointment_Date = %s AND Status <> 'Cancelled'
+            GROUP BY Time_Slot
+        """, (did, day))
+        per_slot = dict(cur.fetchall())
+    overbooked = {s: n for s, n in per_slot.items() if n > capacity}
+
+    latencies.sort()
+    total = bookers * attempts
+    print(f"\nBookers: {bookers}  attempts each: {attempts}  slots: {slots}  capacity: {capacity}")
+    print(f"Wall time       : {wall:.3f}s  ({total / wall:.0f} attempts/s)")
+    print(f"Booked / full   : {results['booked']} / {results['full']}  (max possible {slots * capacity})")
+    print(f"Retries / errors: {results['retries']} / {results['errors']}")
+    print(f"Latency ms      : p50 {percentile(latencies, 50) * 1000:.2f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.2f}  p99 {percentile(latencies, 99) * 1000:.2f}")
+    if overbooked or results["booked"] > slots * capacity:
+        print(f"❌ DOUBLE BOOKING DETECTED: {overbooked}")
+        return False
+    print("✅ No slot exceeded its capacity.")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    parser.add_argument("--bookers", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=25)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=1)
+    args = parser.parse_args()
+    setup_backend(args, pool_size=args.bookers)
+    ok = run(args.bookers, args.attempts, args.slots, args.capacity)
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# benchmarks/suite.py
+"""
+Latency suite for the hot operations of every *_ops module.
+
+Fills the database with benchmarks.synthetic data (or reuses an already
+generated one with --skip-generate), then times each scenario: the real
+interactive function from patient_ops, appointment_ops, admissions_ops,
+billing_ops or cert_ops, answered from a script with its output
+discarded. Every scenario reports p50 / p95 / p99 / mean latency and
+ops/sec; the generator reports rows/sec per table. --json writes the
+whole run (commit, backend, table sizes, results) so runs can be diffed
+with --compare. A scenario whose runs raise or print ❌ is reported as
+FAILED without latencies, and the suite then exits with status 1.
+
+    python -m benchmarks.suite --scale small --json results/base.json
+    python -m benchmarks.suite --sqlite-path big.db --skip-generate --compare results/base.json
+    python -m benchmarks.suite --backend mysql --scale medium --only billing_ops
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from itertools import count
+
+from tabulate import tabulate
+
+import admissions_ops
+import appointment_ops
+import billing_ops
+import cert_ops
+import db_setup
+import patient_ops
+import receipt_archive
+from benchmarks.common import add_backend_args, percentile, scripted_input, setup_backend
+from benchmarks.synthetic import FIRST_NAMES, LAST_NAMES, add_scale_args, generate, print_generated, scale_from_args
+from db_setup import db_cursor
+from doctor_cache import all_doctors
+from services import bed_counts
+
+TABLES = ["patients", "doctors", "appointments", "billing", "receipts", "admissions", "certificates"]
+
+
+class Context:
+    """What the scenario scripts draw their IDs, names and dates from."""
+
+    def __init__(self, seed):
+        self.rnd = random.Random(seed)
+        self.tag = f"{time.time_ns() % 1000:03d}"
+        self.serial = count()
+        self.doctors = [d for d in all_doctors() if d["Availability"]]
+        with db_cursor() as (conn, cur):
+            self.pids = self._range(cur, "patients", "P_ID")
+            self.aids = self._range(cur, "appointments", "A_ID")
+            self.receipt_ids = self._range(cur, "receipts", "Receipt_ID")
+            cur.execute("SELECT MIN(Appointment_Date), MAX(Appointment_Date) FROM appointments")
+            # aggregates come back as text on SQLite
+            first, last = (date.fromisoformat(str(d)[:10]) if d else date.today() for d in cur.fetchone())
+        self.first_day = first
+        self.last_day = min(last, date.today())
+        self.queue = []
+
+    @staticmethod
+    def _range(cur, table, column):
+        cur.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+        lo, hi = cur.fetchone()
+        return (lo or 1, hi or 1)
+
+    def pick(self, id_range):
+        return str(self.rnd.randint(*id_range))
+
+    def name(self, typo=False):
+        name = f"{self.rnd.choice(FIRST_NAMES)} {self.rnd.choice(LAST_NAMES)}"
+        if typo:
+            i = self.rnd.randrange(1, len(name) - 1)
+            name = name[:i] + name[i + 1:]
+        return name
+
+    def day(self):
+        span = max(1, (self.last_day - self.first_day).days)
+        return self.first_day + timedelta(days=self.rnd.randrange(span))
+
+    def window(self, days=30):
+        first = self.day()
+        return str(first), str(first + timedelta(days=days - 1))
+
+    def fetch_ids(self, sql):
+        with db_cursor() as (conn, cur):
+            cur.execute(sql)
+            self.queue = [str(r[0]) for r in cur.fetchall()]
+        return len(self.queue)
+
+
+class Scenario:
+    def __init__(self, name, fn, script=lambda ctx: ([], {}), max_runs=None, setup=None):
+        self.name = name
+        self.fn = fn
+        self.script = script          # ctx -> (input() answers, keyword arguments)
+        self.max_runs = max_runs      # cap on timed runs (slow scans)
+        self.setup = setup            # ctx -> how many runs the scenario has data for
+
+
+# ---------- SCENARIOS ----------
+def _register(ctx):
+    n = next(ctx.serial)
+    return [f"Bench Patient {n}", "35", "Female", f"7{ctx.tag}{n:06d}", f"bench{ctx.tag}_{n}@example.com",
+            "Bench Road"], {}
+
+
+def _booking(ctx):
+    doctor = ctx.rnd.choice(ctx.doctors)
+    availability = doctor["Availability"]
+    # beyond the generated horizon, so most slots are still free
+    day = date.today() + timedelta(days=ctx.rnd.randint(90, 400))
+    while day.strftime("%A") not in availability:
+        day += timedelta(days=1)
+    slots = availability[day.strftime("%A")]
+    return [ctx.pick(ctx.pids), str(doctor["D_ID"]), str(day), str(ctx.rnd.randint(1, len(slots))),
+            "bench booking", "y", "UPI"], {}
+
+
+def _appointment_filters(ctx):
+    first, last = ctx.window()
+    return [str(ctx.rnd.choice(ctx.doctors)["D_ID"]), "", first, last, "", "n", "n", "q"], {}
+
+
+def _free_department(ctx):
+    free = [dept for dept, c in bed_counts().items() if c["Free"]]
+    return ctx.rnd.choice(free) if free else "ICU"
+
+
+def _free_beds(ctx):
+    return sum(c["Free"] for c in bed_counts().values())
+
+
+SCENARIOS = [
+    # patient_ops
+    Scenario("patient_ops.register_patient", patient_ops.register_patient, _register),
+    Scenario("patient_ops.search_patient_by_id", patient_ops.search_patient_by_id,
+             lambda ctx: ([ctx.pick(ctx.pids)], {})),
+    Scenario("patient_ops.search_patient_by_name", patient_ops.search_patient_by_name,
+             lambda ctx: ([ctx.name(typo=True)], {})),
+    Scenario("patient_ops.view_my_appointments", patient_ops.view_my_appointments,
+             lambda ctx: ([ctx.pick(ctx.pids)], {})),
+    Scenario("patient_ops.print_receipt_by_appointment", patient_ops.print_receipt_by_appointment,
+             lambda ctx: ([ctx.pick(ctx.aids)], {})),
+    Scenario("patient_ops.delete_patient", patient_ops.delete_patient,
+             lambda ctx: ([ctx.queue.pop()], {}),
+             setup=lambda ctx: ctx.fetch_ids("SELECT P_ID FROM patients WHERE Name LIKE 'Bench Patient %'")),
+    # appointment_ops
+    Scenario("appointment_ops.book_appointment", appointment_ops.book_appointment, _booking, max_runs=50),
+    Scenario("appointment_ops.view_all_appointments", appointment_ops.view_all_appointments,
+             _appointment_filters),
+    Scenario("appointment_ops.view_todays_scheduled", appointment_ops.view_todays_scheduled,
+             lambda ctx: (["n", "q"], {})),
+    Scenario("appointment_ops.view_appointments_datewise", appointment_ops.view_appointments_datewise,
+             lambda ctx: ([str(ctx.day())], {}), max_runs=20),
+    Scenario("appointment_ops.edit_appointment", appointment_ops.edit_appointment,
+             lambda ctx: ([ctx.pick(ctx.aids), "", "", "", ""], {})),
+    Scenario("appointment_ops.record_payment", appointment_ops.record_payment,
+             lambda ctx: ([ctx.pick(ctx.aids), "Card"], {})),
+    Scenario("appointment_ops.delete_appointment", appointment_ops.delete_appointment,
+             lambda ctx: ([ctx.queue.pop()], {}),
+             setup=lambda ctx: ctx.fetch_ids("SELECT A_ID FROM appointments WHERE Reason = 'bench booking'")),
+    # admissions_ops
+    Scenario("admissions_ops.view_beds", admissions_ops.view_beds),
+    Scenario("admissions_ops.admit_patient", admissions_ops.admit_patient,
+             lambda ctx: ([ctx.pick(ctx.pids), _free_department(ctx), "bench"], {}), setup=_free_beds),
+    Scenario("admissions_ops.view_admissions", admissions_ops.view_admissions, max_runs=50),
+    Scenario("admissions_ops.discharge_patient", admissions_ops.discharge_patient,
+             lambda ctx: ([ctx.queue.pop(), "bench"], {}),
+             setup=lambda ctx: ctx.fetch_ids("SELECT Admission_ID FROM admissions WHERE Status = 'Admitted'")),
+    Scenario("admissions_ops.view_ward_census", admissions_ops.view_ward_census),
+    Scenario("admissions_ops.recount_ward_census", admissions_ops.recount_ward_census, max_runs=20),
+    # billing_ops
+    Scenario("billing_ops.record_payment", billing_ops.record_payment,
+             lambda ctx: (["", ctx.pick(ctx.pids), "500", "Card", "bench"], {})),
+    Scenario("billing_ops.print_receipt", billing_ops.print_receipt,
+             lambda ctx: ([], {"receipt_id": ctx.pick(ctx.receipt_ids)})),
+    Scenario("billing_ops.search_receipts[date]", billing_ops.search_receipts,
+             lambda ctx: ([], {"by_date": ctx.day()})),
+    Scenario("billing_ops.search_receipts[name]", billing_ops.search_receipts,
+             lambda ctx: ([], {"by_name": ctx.name()}), max_runs=20),
+    Scenario("billing_ops.view_revenue[day]", billing_ops.view_revenue,
+             lambda ctx: (list(ctx.window()), {"group_by": "day"})),
+    Scenario("billing_ops.view_revenue[mode]", billing_ops.view_revenue,
+             lambda ctx: (list(ctx.window()), {"group_by": "mode"})),
+    Scenario("billing_ops.view_revenue[doctor]", billing_ops.view_revenue,
+             lambda ctx: (list(ctx.window()), {"group_by": "doctor"})),
+    # cert_ops
+    Scenario("cert_ops.create_certificate", cert_ops.create_certificate,
+             lambda ctx: (["Birth", ctx.pick(ctx.pids), ctx.name(), "2025-01-01", "Guardian", "Hospital",
+                           "bench"], {})),
+    Scenario("cert_ops.view_certificates", cert_ops.view_certificates,
+             lambda ctx: ([], {"by_patient": ctx.pick(ctx.pids)})),
+    Scenario("cert_ops.search_certificate", cert_ops.search_certificate,
+             lambda ctx: ([ctx.name()], {}), max_runs=20),
+    Scenario("cert_ops.delete_certificate", cert_ops.delete_certificate,
+             lambda ctx: ([ctx.queue.pop()], {}),
+             setup=lambda ctx: ctx.fetch_ids("SELECT Certificate_ID FROM certificates")),
+]
+
+
+# ---------- RUNNER ----------
+def run_scenario(scenario, ctx, iterations, warmup):
+    runs = iterations
+    if scenario.max_runs:
+        runs = min(runs, scenario.max_runs)
+    if scenario.setup:
+        available = scenario.setup(ctx)
+        warmup = min(warmup, available)
+        runs = min(runs, available - warmup)
+    latencies, errors = [], []
+    for i in range(warmup + runs):
+        answers, kwargs = scenario.script(ctx)
+        out = io.StringIO()
+        t0 = time.perf_counter()
+        try:
+            with scripted_input(answers), redirect_stdout(out):
+                scenario.fn(**kwargs)
+            # the menus catch their own exceptions and print ❌
+            error = next((line for line in out.getvalue().splitlines() if "❌" in line), None)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - t0
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        if error:
+            errors.append(error)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "runs": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": total / len(latencies) * 1000 if latencies else 0.0,
+        "ops_per_sec": len(latencies) / total if total else 0.0,
+    }
+
+
+def table_sizes():
+    sizes = {}
+    with db_cursor() as (conn, cur):
+        for table in TABLES:
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+            sizes[table] = cur.fetchone()[0]
+    return sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results, previous=None):
+    rows = []
+    for name, r in results.items():
+        if r["errors"]:
+            # latencies of failing runs measure the error path, not the operation
+            rows.append([name, r["runs"], "", "", "", "", f"FAILED ({r['errors']})"]
+                        + ([""] if previous is not None else []))
+            continue
+        row = [name, r["runs"], f"{r['p50_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['p99_ms']:.2f}",
+               f"{r['ops_per_sec']:.0f}", ""]
+        if previous is not None:
+            old = previous.get(name)
+            row.append(f"{(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.0f}%"
+                       if old and old["p50_ms"] and not old["errors"] else "new")
+        rows.append(row)
+    headers = ["Scenario", "Runs", "p50 ms", "p95 ms", "p99 ms", "ops/s", "Errors"]
+    if previous is not None:
+        headers.append("p50 vs base")
+    print(tabulate(rows, headers=headers, tablefmt="grid"))
+    for name, r in results.items():
+        if r["first_error"]:
+            print(f"⚠️ {name}: {r['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    add_scale_args(parser)
+    parser.add_argument("--skip-generate", action="store_true", help="use the data already in the database")
+    parser.add_argument("--iterations", type=int, default=100, help="timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed runs before each scenario")
+    parser.add_argument("--only", action="append", help="run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier --json file to compare p50 latency against")
+    args = parser.parse_args()
+    setup_backend(args)
+
+    generated = {}
+    if not args.skip_generate:
+        sizes = scale_from_args(args)
+        print("Generating:")
+        generated = generate(**sizes, seed=args.seed)
+        print_generated(generated)
+
+    # certificate files and receipts go to a scratch folder, not the working tree
+    work = tempfile.mkdtemp(prefix="hms_suite_")
+    cert_ops.CERT_FOLDER = os.path.join(work, "Certificates")
+    os.makedirs(cert_ops.CERT_FOLDER, exist_ok=True)
+    receipt_archive.archive.root = os.path.join(work, "archive")
+
+    sizes = table_sizes()
+    print("\nData: " + ", ".join(f"{t} {n:,}" for t, n in sizes.items()))
+    ctx = Context(args.seed)
+    scenarios = [s for s in SCENARIOS if not args.only or any(o in s.name for o in args.only)]
+    results = {}
+    for scenario in scenarios:
+        print(f"  {scenario.name} ...", flush=True)
+        results[scenario.name] = run_scenario(scenario, ctx, args.iterations, args.warmup)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["scenarios"]
+    print()
+    print_results(results, previous)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "backend": db_setup.backend(),
+                "iterations": args.iterations,
+                "tables": sizes,
+                "generated": generated,
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"\n📝 Results written to {args.json}")
+
+    failed = [name for name, r in results.items() if r["errors"]]
+    if failed:
+        print(f"\n❌ {len(failed)} scenario(s) FAILED: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
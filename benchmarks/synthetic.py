@@ -0,0 +1,351 @@
+# benchmarks/synthetic.py
+"""
+Synthetic hospital data at benchmark scale.
+
+Generates patients (with their name trigrams), doctors with realistic
+Availability JSON (3-6 working days, morning and/or evening shifts split
+into 10-30 minute slots), appointments that never double-book a slot,
+billing, receipts with proper bill numbers, admissions (history plus beds
+occupied right now) and certificates. All rows are inserted with batched
+executemany() and explicit IDs, then the derived tables (slot_inventory,
+bill_sequences, revenue_daily, ward_census, beds) are brought in line.
+
+    python -m benchmarks.synthetic --scale large --sqlite-path big.db
+    python -m benchmarks.synthetic --patients 50000 --doctors 200 --appointments 500000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import add_backend_args, setup_backend
+from bed_allocator import allocator
+from bill_sequence import format_bill_no
+from db_setup import db_cursor, insert_ignore_sql
+from doctor_cache import invalidate_doctors
+from patient_search import name_trigrams
+from revenue_rollup import rebuild_revenue
+from Utils.validation import slot_start_minutes
+from ward_census import rebuild_census
+
+SCALES = {
+    "small": {"patients": 10000, "doctors": 100, "appointments": 100000},
+    "medium": {"patients": 100000, "doctors": 1000, "appointments": 1000000},
+    "large": {"patients": 1000000, "doctors": 5000, "appointments": 10000000},
+}
+BATCH = 20000
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Ayaan", "Krishna", "Ishaan",
+               "Rohan", "Kabir", "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Myra",
+               "Sara", "Ira", "Meera", "Kavya", "Priya", "Riya", "Neha", "Pooja", "Rahul", "Amit",
+               "Suresh", "Ramesh", "Lakshmi", "Sunita", "Geeta", "Farhan", "Imran", "Zoya", "John", "Maria"]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Iyer", "Nair", "Reddy", "Rao", "Patel", "Shah", "Mehta",
+              "Singh", "Kaur", "Das", "Bose", "Mukherjee", "Banerjee", "Chatterjee", "Pillai", "Menon", "Kulkarni",
+              "Joshi", "Desai", "Naidu", "Khan", "Hussain", "Fernandes", "D'Souza", "Thomas", "Mathew", "Yadav"]
+SPECIALIZATIONS = ["General Medicine", "Cardiology", "Neurology", "Orthopedics", "Pediatrics", "Dermatology",
+                   "ENT", "Gynecology", "Ophthalmology", "Psychiatry", "Oncology", "Nephrology"]
+REASONS = ["Fever", "Follow-up", "Chest pain", "Back pain", "Headache", "Routine check-up", "Skin rash",
+           "Cough and cold", "Diabetes review", "Blood pressure", "Vaccination", "Post-op review"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MODES = ["Cash", "Card", "UPI", "UPI"]
+GENDERS = ["Male", "Female", "Other"]
+
+
+def _slots(start_h, end_h, minutes):
+    out, t = [], start_h * 60
+    while t + minutes <= end_h * 60:
+        out.append(f"{t // 60:02d}:{t % 60:02d}-{(t + minutes) // 60:02d}:{(t + minutes) % 60:02d}")
+        t += minutes
+    return out
+
+
+def random_availability(rnd):
+    """{weekday: [time slots]} — 3-6 working days, morning and/or evening shifts."""
+    minutes = rnd.choice([10, 15, 15, 20, 30])
+    shifts = rnd.choice([[(9, 13)], [(10, 14)], [(17, 20)], [(9, 13), (17, 20)], [(8, 12), (14, 17)]])
+    day_slots = [s for start, end in shifts for s in _slots(start, end, minutes)]
+    days = sorted(rnd.sample(WEEKDAYS[:6], rnd.randint(3, 6)), key=WEEKDAYS.index)
+    return {d: day_slots for d in days}
+
+
+class _Timer:
+    """Rows and seconds per generated table."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def add(self, table, rows, seconds):
+        t = self.tables.setdefault(table, {"rows": 0, "seconds": 0.0})
+        t["rows"] += rows
+        t["seconds"] += seconds
+
+    def report(self):
+        return {table: dict(t, rows_per_sec=t["rows"] / t["seconds"] if t["seconds"] else 0.0)
+                for table, t in self.tables.items()}
+
+
+def _insert(cur, timer, table, sql, rows):
+    if not rows:
+        return
+    t0 = time.perf_counter()
+    cur.executemany(sql, rows)
+    timer.add(table, len(rows), time.perf_counter() - t0)
+
+
+def _next_id(cur, table, column):
+    cur.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return cur.fetchone()[0] + 1
+
+
+def _gen_patients(conn, cur, rnd, timer, count, first_day):
+    first = _next_id(cur, "patients", "P_ID")
+    span = (date.today() - first_day).days
+    for start in range(0, count, BATCH):
+        rows, grams = [], []
+        for pid in range(first + start, first + min(count, start + BATCH)):
+            fn, ln = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+            name = f"{fn} {ln}"
+            registered = datetime.combine(first_day + timedelta(days=rnd.randrange(span)), datetime.min.time()) \
+                + timedelta(minutes=rnd.randrange(8 * 60, 20 * 60))
+            rows.append((pid, name, rnd.randint(1, 90), rnd.choice(GENDERS), f"9{pid:09d}",
+                         f"{fn}.{ln}{pid}@example.com".lower().replace("'", ""),
+                         f"{rnd.randint(1, 400)} {ln} Nagar", registered))
+            grams.extend((g, pid) for g in sorted(name_trigrams(name)))
+        _insert(cur, timer, "patients", """
+            INSERT INTO patients (P_ID, Name, Age, Gender, Phone_No, Email, Address, Date_Registered)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+        _insert(cur, timer, "patient_name_trigrams",
+                "INSERT INTO patient_name_trigrams (Trigram, P_ID) VALUES (%s, %s)", grams)
+        conn.commit()
+    return range(first, first + count)
+
+
+def _gen_doctors(conn, cur, rnd, timer, count):
+    first = _next_id(cur, "doctors", "D_ID")
+    doctors = {}
+    rows = []
+    for did in range(first, first + count):
+        availability = random_availability(rnd)
+        fees = rnd.choice([300, 400, 500, 600, 800, 1000, 1500])
+        doctors[did] = (availability, fees)
+        rows.append((did, f"Dr. {rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}", rnd.choice(SPECIALIZATIONS),
+                     rnd.randint(1, 35), fees, f"8{did:09d}", f"doctor{did}@hospital.example",
+                     json.dumps(availability), rnd.choice(GENDERS[:2]), "Hospital Campus"))
+    _insert(cur, timer, "doctors", """
+        INSERT INTO doctors (D_ID, Name, Specialization, Experience, Fees, Phone_No, Email, Availability, Gender, Address)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    conn.commit()
+    return doctors
+
+
+def _bill_counters(cur):
+    cur.execute("SELECT Seq_Day, Next_Value FROM bill_sequences")
+    return {day: value for day, value in cur.fetchall()}
+
+
+def _gen_appointments(conn, cur, rnd, timer, count, doctors, pids, first_day, last_day):
+    """Appointments (one per slot), billing, receipts and future slot_inventory rows."""
+    today = date.today()
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    bill_next = _bill_counters(cur)
+    touched_days = set()
+    next_aid = _next_id(cur, "appointments", "A_ID")
+    per_doctor, extra = divmod(count, len(doctors))
+    appts, bills, receipts, inventory = [], [], [], []
+    made = 0
+    start_cache = {}
+
+    def flush():
+        _insert(cur, timer, "appointments", """
+            INSERT INTO appointments (A_ID, P_ID, D_ID, Appointment_Date, Time_Slot, Slot_Start, Reason, Status, Date_Created)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, appts)
+        _insert(cur, timer, "billing",
+                "INSERT INTO billing (A_ID, Amount, Payment_Mode, Date_Paid) VALUES (%s, %s, %s, %s)", bills)
+        _insert(cur, timer, "receipts", """
+            INSERT INTO receipts (A_ID, P_ID, Bill_No, Amount, Payment_Mode, Date_Paid, Notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, receipts)
+        _insert(cur, timer, "slot_inventory", """
+            INSERT INTO slot_inventory (D_ID, Slot_Date, Time_Slot, Capacity, Booked) VALUES (%s, %s, %s, %s, %s)
+        """, inventory)
+        conn.commit()
+        for rows in (appts, bills, receipts, inventory):
+            rows.clear()
+
+    for n, (did, (availability, fees)) in enumerate(doctors.items()):
+        capacity = [(d, s) for d in days if d.strftime("%A") in availability for s in availability[d.strftime("%A")]]
+        quota = min(len(capacity), per_doctor + (1 if n < extra else 0))
+        for day, slot in sorted(rnd.sample(capacity, quota)):
+            aid = next_aid + made
+            made += 1
+            start = start_cache.get(slot)
+            if start is None:
+                start = start_cache[slot] = slot_start_minutes(slot)
+            pid = rnd.choice(pids)
+            at = datetime.combine(day, datetime.min.time()) + timedelta(minutes=start)
+            if day < today:
+                status = rnd.choices(["Completed", "Cancelled", "Scheduled"], [85, 10, 5])[0]
+            else:
+                status = "Cancelled" if rnd.random() < 0.08 else "Scheduled"
+            appts.append((aid, pid, did, day, slot, start, rnd.choice(REASONS), status,
+                          at - timedelta(days=rnd.randint(0, 20))))
+            if status == "Cancelled":
+                continue
+            if day >= today:
+                inventory.append((did, day, slot, 1, 1))
+            if day < today or rnd.random() < 0.5:
+                mode = rnd.choice(MODES)
+                paid = min(at, datetime.now())
+                bills.append((aid, fees, mode, paid))
+                if rnd.random() < 0.25:
+                    key = paid.strftime("%Y%m%d")
+                    number = bill_next.get(key, 1)
+                    bill_next[key] = number + 1
+                    touched_days.add(key)
+                    receipts.append((aid, pid, format_bill_no(key, number), fees + rnd.choice([0, 0, 150, 500]),
+                                     mode, paid, rnd.choice(["", "Consultation", "Lab tests", "Pharmacy"])))
+            if len(appts) >= BATCH:
+                flush()
+    flush()
+    # live bill numbers must continue after the synthetic ones
+    for key in touched_days:
+        cur.execute(insert_ignore_sql("bill_sequences", ["Seq_Day", "Next_Value"]), (key, bill_next[key]))
+        cur.execute("UPDATE bill_sequences SET Next_Value = %s WHERE Seq_Day = %s AND Next_Value < %s",
+                    (bill_next[key], key, bill_next[key]))
+    conn.commit()
+    return made
+
+
+def _gen_admissions(conn, cur, rnd, timer, count, pids, first_day, occupancy):
+    """Discharged history plus current admissions filling `occupancy` of the free beds."""
+    cur.execute("SELECT Bed_ID, Department FROM beds")
+    beds = cur.fetchall()
+    span = (date.today() - first_day).days
+    rows = []
+    for _ in range(count):
+        bed_id, dept = rnd.choice(beds)
+        admitted = datetime.combine(first_day + timedelta(days=rnd.randrange(span)), datetime.min.time()) \
+            + timedelta(minutes=rnd.randrange(24 * 60))
+        discharged = min(admitted + timedelta(hours=rnd.randint(6, 24 * 14)), datetime.now())
+        rows.append((rnd.choice(pids), bed_id, dept, admitted, discharged, "Discharged", "synthetic"))
+        if len(rows) >= BATCH:
+            _insert(cur, timer, "admissions", """
+                INSERT INTO admissions (P_ID, Bed_ID, Department, Admit_Date, Discharge_Date, Status, Notes)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, rows)
+            rows = []
+    cur.execute("SELECT Bed_ID, Department FROM beds WHERE Is_Occupied = 0")
+    free = cur.fetchall()
+    occupied = []
+    for bed_id, dept in rnd.sample(free, int(len(free) * occupancy)):
+        pid = rnd.choice(pids)
+        admitted = datetime.now() - timedelta(hours=rnd.randint(1, 24 * 10))
+        rows.append((pid, bed_id, dept, admitted, None, "Admitted", "synthetic"))
+        occupied.append((pid, bed_id))
+    _insert(cur, timer, "admissions", """
+        INSERT INTO admissions (P_ID, Bed_ID, Department, Admit_Date, Discharge_Date, Status, Notes)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+    cur.executemany("UPDATE beds SET Is_Occupied = 1, Current_P_ID = %s WHERE Bed_ID = %s", occupied)
+    conn.commit()
+
+
+def _gen_certificates(conn, cur, rnd, timer, count, pids, first_day):
+    span = (date.today() - first_day).days
+    rows = []
+    for i in range(count):
+        when = first_day + timedelta(days=rnd.randrange(span))
+        name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+        if i % 5:
+            rows.append((rnd.choice(pids), "Birth", name, when, None, f"{rnd.choice(FIRST_NAMES)} {name.split()[1]}",
+                         "Hospital", "", when))
+        else:
+            rows.append((rnd.choice(pids), "Death", name, when - timedelta(days=rnd.randint(20000, 32000)), when,
+                         "", "Hospital", "", when))
+    for start in range(0, len(rows), BATCH):
+        _insert(cur, timer, "certificates", """
+            INSERT INTO certificates (P_ID, Type, Name, DOB, DOD, Parent_Guardian, Place_Of_Event, Notes, Date_Issued)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows[start:start + BATCH])
+    conn.commit()
+
+
+def generate(patients, doctors, appointments, admissions=None, certificates=None,
+             days_back=365, days_ahead=60, occupancy=0.6, seed=1, log=print):
+    """
+    Fill the configured database. Admissions and certificates default to 5%
+    and 1% of the patient count. Returns {table: {"rows", "seconds", "rows_per_sec"}}.
+    """
+    rnd = random.Random(seed)
+    timer = _Timer()
+    first_day = date.today() - timedelta(days=days_back)
+    last_day = date.today() + timedelta(days=days_ahead)
+    admissions = patients // 20 if admissions is None else admissions
+    certificates = patients // 100 if certificates is None else certificates
+    with db_cursor() as (conn, cur):
+        log(f"  patients ({patients:,}) ...")
+        pids = _gen_patients(conn, cur, rnd, timer, patients, first_day)
+        log(f"  doctors ({doctors:,}) ...")
+        doctor_rows = _gen_doctors(conn, cur, rnd, timer, doctors)
+        log(f"  appointments ({appointments:,}), billing, receipts ...")
+        made = _gen_appointments(conn, cur, rnd, timer, appointments, doctor_rows, pids, first_day, last_day)
+        if made < appointments:
+            log(f"  ⚠️ only {made:,} appointments fit the doctors' slots")
+        log(f"  admissions ({admissions:,}) and certificates ({certificates:,}) ...")
+        _gen_admissions(conn, cur, rnd, timer, admissions, pids, first_day, occupancy)
+        _gen_certificates(conn, cur, rnd, timer, certificates, pids, first_day)
+        log("  rebuilding revenue rollups and ward census ...")
+        t0 = time.perf_counter()
+        timer.add("revenue_daily", rebuild_revenue(cur), time.perf_counter() - t0)
+        rebuild_census(cur)
+        conn.commit()
+    invalidate_doctors()
+    allocator.invalidate()
+    return timer.report()
+
+
+def add_scale_args(parser):
+    parser.add_argument("--scale", choices=list(SCALES), default="small",
+                        help="preset sizes: " + "; ".join(f"{k} = {v['patients']:,} patients / {v['doctors']:,} "
+                                                          f"doctors / {v['appointments']:,} appointments"
+                                                          for k, v in SCALES.items()))
+    parser.add_argument("--patients", type=int, help="override the preset")
+    parser.add_argument("--doctors", type=int, help="override the preset")
+    parser.add_argument("--appointments", type=int, help="override the preset")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def scale_from_args(args):
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    return sizes
+
+
+def print_generated(tables):
+    for table, t in tables.items():
+        print(f"  {table:22} {t['rows']:>11,} rows  {t['seconds']:8.2f}s  {t['rows_per_sec']:>10,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_args(parser)
+    add_scale_args(parser)
+    args = parser.parse_args()
+    setup_backend(args)
+    sizes = scale_from_args(args)
+
+    t0 = time.perf_counter()
+    print("Generating:")
+    tables = generate(**sizes, seed=args.seed)
+    print(f"\nGenerated in {time.perf_counter() - t0:.1f}s")
+    print_generated(tables)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# bill_sequence.py
+"""
+Per-day bill number sequence (hi/lo block allocation).
+
+Bill numbers look like BILL-20250114-000042. Each process reserves a
+block of BLOCK_SIZE numbers for the day with one short transaction on
+bill_sequences (an atomic `Next_Value = Next_Value + block` UPDATE), then
+hands them out from memory. Numbers never collide across processes and
+always increase within a process. A process that exits mid-block leaves a
+gap, which is fine for bill numbers. Because they are ascending and
+zero-padded, new Bill_No keys land at the right edge of the UNIQUE index
+and sort in issue order.
+
+Blocks are reserved on the sequence's own connection, outside the pool:
+callers ask for a number while holding a pooled connection, and a refill
+waiting for a second pooled connection could deadlock a busy pool.
+"""
+import random
+import threading
+import time
+from datetime import datetime
+
+from db_setup import dedicated_connection, insert_ignore_sql, is_retryable_error
+
+BLOCK_SIZE = 20
+MAX_RETRIES = 5
+
+
+def format_bill_no(day, number):
+    return f"BILL-{day}-{number:06d}"
+
+
+def allocate_block(cur, day, size):
+    """
+    Reserve `size` numbers for `day` (YYYYMMDD) inside the caller's
+    transaction. Returns the first number of the block.
+    """
+    cur.execute(insert_ignore_sql("bill_sequences", ["Seq_Day", "Next_Value"]), (day, 1))
+    # the UPDATE takes the row lock, so the SELECT sees our own increment
+    cur.execute("UPDATE bill_sequences SET Next_Value = Next_Value + %s WHERE Seq_Day = %s", (size, day))
+    cur.execute("SELECT Next_Value FROM bill_sequences WHERE Seq_Day = %s", (day,))
+    return cur.fetchone()[0] - size
+
+
+class BillNumberSequence:
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._day = None
+        self._next = 0
+        self._hi = -1      # last number of the current block
+        self._conn = None  # dedicated connection used for refills (under _lock)
+        self._lock = threading.Lock()
+        self._stats = {"issued": 0, "blocks": 0}
+
+    def _connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.ping()
+            except Exception:
+                self._close()
+        if self._conn is None:
+            self._conn = dedicated_connection()
+        return self._conn
+
+    def _close(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def _refill(self, day):
+        for attempt in range(MAX_RETRIES):
+            conn = self._connection()
+            cur = conn.cursor()
+            try:
+                first = allocate_block(cur, day, self.block_size)
+                conn.commit()
+                break
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                if not is_retryable_error(e):
+                    self._close()
+                    raise
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(random.uniform(0.005, 0.02) * (attempt + 1))
+            finally:
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+        self._day, self._next, self._hi = day, first, first + self.block_size - 1
+        self._stats["blocks"] += 1
+
+    def next_bill_no(self):
+        with self._lock:
+            day = datetime.now().strftime("%Y%m%d")
+            if day != self._day or self._next > self._hi:
+                self._refill(day)
+            number = self._next
+            self._next += 1
+            self._stats["issued"] += 1
+        return format_bill_no(day, number)
+
+    def stats(self):
+        with self._lock:
+            snap = dict(self._stats)
+            snap["day"] = self._day
+            snap["left_in_block"] = max(0, self._hi - self._next + 1) if self._day else 0
+        return snap
+
+
+sequence = BillNumberSequence()
+
+
+def next_bill_no():
+    return sequence.next_bill_no()
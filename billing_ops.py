@@ -1,17 +1,21 @@
 # billing_ops.py
-from db_setup import get_connection
-from datetime import datetime
-import uuid
+from datetime import date, timedelta
+from tabulate import tabulate
+from db_setup import db_cursor
+from bill_sequence import next_bill_no
+from revenue_rollup import (
+    day_bounds, doctor_names, paid_now, rebuild_revenue, record_revenue, revenue_total, revenue_totals
+)
+from Utils.validation import validate_date
 
-def _generate_bill_no(conn):
-    # Format: BILL-YYYYMMDD-XXXX (incremental-like using UUID short part to avoid race)
-    today = datetime.now().strftime("%Y%m%d")
-    short = uuid.uuid4().hex[:6].upper()
-    return f"BILL-{today}-{short}"
+# search_receipts sort keys -> indexed columns (Receipt_ID breaks ties)
+RECEIPT_SORTS = {
+    "Date_Paid": "r.Date_Paid",        # idx_receipts_date_paid
+    "Bill_No": "r.Bill_No",            # UNIQUE
+    "Receipt_ID": "r.Receipt_ID",      # primary key
+}
 
 def record_payment():
-    conn = get_connection(); cur = conn.cursor()
-    cur.execute("USE hospital")
     print("\n--- Record Payment ---")
     aid = input("Appointment ID (optional, press Enter if none): ").strip() or None
     pid = input("Patient ID: ").strip()
@@ -19,48 +23,61 @@ def record_payment():
     mode = input("Payment Mode (Cash/Card/UPI): ").strip().capitalize() or "Cash"
     notes = input("Notes (optional): ").strip()
 
-    bill_no = _generate_bill_no(conn)
-    cur.execute("""
-        INSERT INTO receipts (A_ID, P_ID, Bill_No, Amount, Payment_Mode, Notes)
-        VALUES (%s,%s,%s,%s,%s,%s)
-    """, (aid, pid, bill_no, amount, mode, notes))
-    conn.commit()
-    print(f"✅ Payment recorded. Receipt ID: {cur.lastrowid} | Bill No: {bill_no}")
-    cur.close(); conn.close()
-    return cur.lastrowid
+    with db_cursor() as (conn, cur):
+        bill_no = next_bill_no()  # BILL-YYYYMMDD-000001, monotonic per day
+        paid_at, day = paid_now()
+        cur.execute("""
+            INSERT INTO receipts (A_ID, P_ID, Bill_No, Amount, Payment_Mode, Notes, Date_Paid)
+            VALUES (%s,%s,%s,%s,%s,%s,%s)
+        """, (aid, pid, bill_no, amount, mode, notes, paid_at))
+        receipt_id = cur.lastrowid
+        did = None
+        if aid:
+            cur.execute("SELECT D_ID FROM appointments WHERE A_ID=%s", (aid,))
+            row = cur.fetchone()
+            did = row[0] if row else None
+        record_revenue(cur, amount, mode, did, day)
+        conn.commit()
+    print(f"✅ Payment recorded. Receipt ID: {receipt_id} | Bill No: {bill_no}")
+    return receipt_id
 
 def print_receipt(receipt_id=None, bill_no=None):
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-    if receipt_id:
-        cur.execute("SELECT * FROM receipts WHERE Receipt_ID=%s", (receipt_id,))
-    elif bill_no:
-        cur.execute("SELECT * FROM receipts WHERE Bill_No=%s", (bill_no,))
-    else:
+    if not receipt_id and not bill_no:
         print("Provide receipt_id or bill_no")
         return
-    r = cur.fetchone()
-    if not r:
-        print("Receipt not found.")
-        return
-    # fetch patient and appointment info
-    cur.execute("SELECT Name, Age, Phone_No, Email FROM patients WHERE P_ID=%s", (r['P_ID'],))
-    p = cur.fetchone()
+    with db_cursor(dictionary=True) as (conn, cur):
+        if receipt_id:
+            cur.execute("SELECT * FROM receipts WHERE Receipt_ID=%s", (receipt_id,))
+        else:
+            cur.execute("SELECT * FROM receipts WHERE Bill_No=%s", (bill_no,))
+        r = cur.fetchone()
+        if not r:
+            print("Receipt not found.")
+            return
+        # fetch patient and appointment info
+        cur.execute("SELECT Name, Age, Phone_No, Email FROM patients WHERE P_ID=%s", (r['P_ID'],))
+        p = cur.fetchone()
     print("\n------ RECEIPT ------")
     print(f"Bill No : {r['Bill_No']}")
     print(f"Receipt ID : {r['Receipt_ID']}")
     if p:
-        print(f"Patient : {p[0]} | Age: {p[1]} | Phone: {p[2]} | Email: {p[3]}")
+        print(f"Patient : {p['Name']} | Age: {p['Age']} | Phone: {p['Phone_No']} | Email: {p['Email']}")
     print(f"Amount : ₹{r['Amount']:.2f}")
     print(f"Payment Mode : {r['Payment_Mode']}")
     print(f"Date Paid : {r['Date_Paid']}")
     print(f"Notes : {r['Notes']}")
     print("---------------------\n")
-    cur.close(); conn.close()
+
+def _as_date(value):
+    return validate_date(value) if isinstance(value, str) else value
 
 def search_receipts(by_name=None, by_date=None, sort_by='Date_Paid', asc=True):
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
+    """
+    by_date is a day or a (first, last) tuple of days, both inclusive; dates
+    may be date objects or 'YYYY-MM-DD'. sort_by must be a RECEIPT_SORTS key.
+    """
+    if sort_by not in RECEIPT_SORTS:
+        raise ValueError(f"sort_by must be one of {', '.join(RECEIPT_SORTS)}")
     q = """
         SELECT r.Receipt_ID, r.Bill_No, r.Amount, r.Payment_Mode, r.Date_Paid, p.Name AS Patient
         FROM receipts r
@@ -71,19 +88,99 @@ def search_receipts(by_name=None, by_date=None, sort_by='Date_Paid', asc=True):
     if by_name:
         where.append("p.Name LIKE %s"); params.append(f"%{by_name}%")
     if by_date:
-        # by_date can be 'YYYY-MM-DD' or tuple(start,end)
-        if isinstance(by_date, tuple):
-            where.append("DATE(r.Date_Paid) BETWEEN %s AND %s"); params.extend(by_date)
-        else:
-            where.append("DATE(r.Date_Paid) = %s"); params.append(by_date)
+        # half-open range on the raw column so idx_receipts_date_paid is usable
+        first, last = by_date if isinstance(by_date, tuple) else (by_date, by_date)
+        first, last = _as_date(first), _as_date(last)
+        where.append("r.Date_Paid >= %s AND r.Date_Paid < %s")
+        params.extend(day_bounds(first, last + timedelta(days=1)))
     if where:
         q += " WHERE " + " AND ".join(where)
-    q += f" ORDER BY {sort_by} {'ASC' if asc else 'DESC'}"
-    cur.execute(q, tuple(params))
-    rows = cur.fetchall()
+    direction = 'ASC' if asc else 'DESC'
+    q += f" ORDER BY {RECEIPT_SORTS[sort_by]} {direction}"
+    if sort_by != "Receipt_ID":
+        q += f", r.Receipt_ID {direction}"
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, tuple(params))
+        rows = cur.fetchall()
     if not rows:
         print("No receipts found.")
     else:
-        from tabulate import tabulate
         print(tabulate(rows, headers="keys", tablefmt="grid"))
-    cur.close(); conn.close()
+
+
+# ---------- REVENUE REPORTS ----------
+def _ask_range():
+    """Inclusive From/To dates from the user -> half-open (start, end), or None."""
+    today = date.today()
+    try:
+        start = input(f"From date (YYYY-MM-DD, Enter for {today.replace(day=1)}): ").strip()
+        start = validate_date(start) if start else today.replace(day=1)
+        end = input(f"To date (YYYY-MM-DD, Enter for {today}): ").strip()
+        end = validate_date(end) if end else today
+    except ValueError:
+        print("⚠️ Invalid date format. Use YYYY-MM-DD.")
+        return None
+    if end < start:
+        print("⚠️ To date is before From date.")
+        return None
+    return start, end + timedelta(days=1)
+
+def view_revenue(group_by):
+    span = _ask_range()
+    if not span:
+        return
+    rows = revenue_totals(*span, group_by=group_by)
+    if not rows:
+        print("No payments in this period.")
+        return
+    if group_by == "doctor":
+        names = doctor_names([r[0] for r in rows])
+        rows = [(did, names.get(did, "(no appointment)"), n, amount) for did, n, amount in rows]
+        headers = ["D_ID", "Doctor", "Payments", "Amount (INR)"]
+    else:
+        headers = ["Date" if group_by == "day" else "Payment Mode", "Payments", "Amount (INR)"]
+    print(tabulate(rows, headers=headers, tablefmt="grid", floatfmt=".2f"))
+    payments, amount = revenue_total(*span)
+    print(f"Total: {payments} payments, ₹{float(amount):.2f}")
+
+def search_receipts_menu():
+    name = input("Patient name contains (optional): ").strip() or None
+    first = input("From date (YYYY-MM-DD, optional): ").strip()
+    last = input("To date (YYYY-MM-DD, optional): ").strip() or first
+    sort_by = input(f"Sort by ({'/'.join(RECEIPT_SORTS)}, Enter for Date_Paid): ").strip() or "Date_Paid"
+    asc = input("Newest first? (y/n): ").strip().lower() != 'y'
+    try:
+        search_receipts(name, (first, last) if first else None, sort_by, asc)
+    except ValueError as e:
+        print("⚠️", e)
+
+def rebuild_revenue_menu():
+    with db_cursor() as (conn, cur):
+        n = rebuild_revenue(cur)
+        conn.commit()
+    print(f"✅ Revenue rollups rebuilt ({n} day/mode/doctor rows).")
+
+def revenue_menu():
+    while True:
+        print("\n--- Revenue Reports ---")
+        print("1. Revenue by day")
+        print("2. Revenue by payment mode")
+        print("3. Revenue by doctor")
+        print("4. Search receipts")
+        print("5. Rebuild revenue rollups")
+        print("6. Back")
+        ch = input("Choose: ").strip()
+        if ch == '1':
+            view_revenue("day")
+        elif ch == '2':
+            view_revenue("mode")
+        elif ch == '3':
+            view_revenue("doctor")
+        elif ch == '4':
+            search_receipts_menu()
+        elif ch == '5':
+            rebuild_revenue_menu()
+        elif ch == '6':
+            break
+        else:
+            print("⚠️ Invalid choice.")
@@ -0,0 +1,245 @@
+# cert_import.py
+"""
+Bulk birth / death certificate issuance from CSV.
+
+Rows are validated up front, inserted with one executemany() per chunk
+(one transaction per chunk) and the certificate files are rendered by a
+thread pool while the next chunk is inserted. If a chunk is rejected by
+the database, that chunk is retried row by row so only the bad rows
+fail. Every CSV line gets a line in the result report.
+
+CSV header (case-insensitive; only Type and Name are required):
+    Type,Name,P_ID,DOB,DOD,Parent_Guardian,Place_Of_Event,Notes
+
+    python cert_import.py births.csv [--report births.report.csv] [--chunk 500] [--workers 4]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cert_ops import save_certificate_text
+from db_setup import db_cursor, ensure_database, insert_many_ids
+from Utils.validation import validate_date
+
+CHUNK_SIZE = 500
+RENDER_WORKERS = 4
+
+CSV_FIELDS = ["Type", "Name", "P_ID", "DOB", "DOD", "Parent_Guardian", "Place_Of_Event", "Notes"]
+INSERT_SQL = """
+    INSERT INTO certificates
+    (P_ID, Type, Name, DOB, DOD, Parent_Guardian, Place_Of_Event, Notes, Date_Issued)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+REPORT_FIELDS = ["Line", "Status", "Certificate_ID", "File", "Error"]
+
+
+def _normalize_header(row):
+    keys = {k.replace(" ", "_").lower(): k for k in CSV_FIELDS}
+    return {keys.get((k or "").strip().replace(" ", "_").lower(), k): (v or "").strip()
+            for k, v in row.items()}
+
+
+def validate_row(row):
+    """Cleaned certificate fields for one CSV row, or raises ValueError with the reason."""
+    row = _normalize_header(row)
+    ctype = row.get("Type", "").capitalize()
+    if ctype not in ("Birth", "Death"):
+        raise ValueError("Type must be Birth or Death")
+    name = row.get("Name", "")
+    if not name:
+        raise ValueError("Name is required")
+    if len(name) > 100:
+        raise ValueError("Name longer than 100 characters")
+    pid = row.get("P_ID") or None
+    if pid is not None:
+        if not pid.isdigit():
+            raise ValueError(f"P_ID '{pid}' is not a number")
+        pid = int(pid)
+    try:
+        dob = validate_date(row["DOB"]) if row.get("DOB") else None
+        dod = validate_date(row["DOD"]) if row.get("DOD") else None
+    except ValueError:
+        raise ValueError("dates must be YYYY-MM-DD")
+    if ctype == "Birth" and not dob:
+        raise ValueError("DOB is required for a birth certificate")
+    if ctype == "Death" and not dod:
+        raise ValueError("DOD is required for a death certificate")
+    if dob and dod and dod < dob:
+        raise ValueError("DOD is before DOB")
+    for field in ("Parent_Guardian", "Place_Of_Event"):
+        if len(row.get(field, "")) > 100:
+            raise ValueError(f"{field} longer than 100 characters")
+    return {
+        "P_ID": pid, "Type": ctype, "Name": name, "DOB": dob, "DOD": dod,
+        "Parent_Guardian": row.get("Parent_Guardian", ""),
+        "Place_Of_Event": row.get("Place_Of_Event", ""),
+        "Notes": row.get("Notes", ""),
+    }
+
+
+def _known_patients(cur, pids):
+    if not pids:
+        return set()
+    pids = sorted(pids)
+    cur.execute(f"SELECT P_ID FROM patients WHERE P_ID IN ({', '.join(['%s'] * len(pids))})", tuple(pids))
+    return {r[0] for r in cur.fetchall()}
+
+
+def _params(cert):
+    return (cert["P_ID"], cert["Type"], cert["Name"], cert["DOB"], cert["DOD"],
+            cert["Parent_Guardian"], cert["Place_Of_Event"], cert["Notes"], cert["Date_Issued"])
+
+
+def _insert_chunk(conn, cur, certs):
+    """
+    Insert [(line, cert)] in one transaction; on failure fall back to one
+    row per transaction. Returns ([(line, cert)] inserted, [(line, error)]).
+    """
+    try:
+        ids = insert_many_ids(cur, INSERT_SQL, [_params(c) for _, c in certs])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+    else:
+        for (_, cert), cid in zip(certs, ids):
+            cert["Certificate_ID"] = cid
+        return certs, []
+    inserted, failed = [], []
+    for line, cert in certs:
+        try:
+            cur.execute(INSERT_SQL, _params(cert))
+            cert["Certificate_ID"] = cur.lastrowid
+            conn.commit()
+            inserted.append((line, cert))
+        except Exception as e:
+            conn.rollback()
+            failed.append((line, str(e)))
+    return inserted, failed
+
+
+def import_certificates(path, report_path=None, chunk_size=CHUNK_SIZE, workers=RENDER_WORKERS):
+    """
+    Issue every valid certificate in the CSV at `path`.
+    Writes a per-line report (default: <path>.report.csv) and returns
+    {"rows", "issued", "failed", "seconds", "rows_per_sec", "report"}.
+    """
+    report_path = report_path or os.path.splitext(path)[0] + ".report.csv"
+    issued_on = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    results = {}   # line -> [Line, Status, Certificate_ID, File, Error]
+    start = time.perf_counter()
+
+    with open(path, newline="", encoding="utf-8-sig") as f, \
+            db_cursor() as (conn, cur), \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        reader = csv.DictReader(f)
+        header = {(h or "").strip().replace(" ", "_").lower() for h in reader.fieldnames or []}
+        if not {"type", "name"} <= header:
+            raise ValueError("CSV needs at least Type and Name columns")
+
+        rendering = []
+
+        def finish_rendering():
+            for line, cid, future in rendering:
+                try:
+                    results[line] = [line, "issued", cid, future.result(), ""]
+                except OSError as e:
+                    results[line] = [line, "issued", cid, "", f"file not written: {e}"]
+            rendering.clear()
+
+        def flush(chunk):
+            pids = {c["P_ID"] for _, c in chunk if c["P_ID"] is not None}
+            known = _known_patients(cur, pids)
+            ready = []
+            for line, cert in chunk:
+                if cert["P_ID"] is not None and cert["P_ID"] not in known:
+                    results[line] = [line, "rejected", "", "", f"no patient with P_ID {cert['P_ID']}"]
+                else:
+                    ready.append((line, cert))
+            inserted, failed = _insert_chunk(conn, cur, ready) if ready else ([], [])
+            for line, error in failed:
+                results[line] = [line, "failed", "", "", error]
+            # the previous chunk's files have been rendering while this one was inserted
+            finish_rendering()
+            for line, cert in inserted:
+                rendering.append((line, cert["Certificate_ID"], pool.submit(save_certificate_text, cert)))
+
+        chunk = []
+        for line, row in enumerate(reader, start=2):
+            try:
+                cert = validate_row(row)
+            except ValueError as e:
+                results[line] = [line, "rejected", "", "", str(e)]
+                continue
+            cert["Date_Issued"] = issued_on
+            chunk.append((line, cert))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+        finish_rendering()
+
+    elapsed = time.perf_counter() - start
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_FIELDS)
+        for line in sorted(results):
+            writer.writerow(results[line])
+
+    issued = sum(1 for r in results.values() if r[1] == "issued")
+    return {
+        "rows": len(results),
+        "issued": issued,
+        "failed": len(results) - issued,
+        "seconds": elapsed,
+        "rows_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "report": report_path,
+    }
+
+
+def print_import_summary(result):
+    print(f"✅ Issued {result['issued']} of {result['rows']} certificates "
+          f"in {result['seconds']:.2f}s ({result['rows_per_sec']:.0f} rows/sec)")
+    if result["failed"]:
+        print(f"⚠️ {result['failed']} rows were rejected or failed — see the report.")
+    print(f"📝 Report saved at: {result['report']}")
+
+
+def import_certificates_menu():
+    """Interactive wrapper used by the certificate menu."""
+    path = input("Path to CSV file: ").strip().strip('"')
+    if not os.path.isfile(path):
+        print("⚠️ File not found.")
+        return
+    try:
+        print_import_summary(import_certificates(path))
+    except (ValueError, csv.Error) as e:
+        print("❌ Invalid CSV:", e)
+    except Exception as e:
+        print("❌ Error importing certificates:", e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Issue birth/death certificates in bulk from a CSV file")
+    parser.add_argument("csv_path")
+    parser.add_argument("--report", help="result report path (default: <csv>.report.csv)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="rows per insert transaction")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS, help="certificate file writer threads")
+    args = parser.parse_args(argv)
+
+    ensure_database()
+    try:
+        result = import_certificates(args.csv_path, args.report, args.chunk, args.workers)
+    except (OSError, ValueError, csv.Error) as e:
+        print("❌ Import failed:", e)
+        return 1
+    print_import_summary(result)
+    return 0 if not result["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 # cert_ops.py
-from db_setup import get_connection
+from db_setup import db_cursor
 from datetime import datetime
 from tabulate import tabulate
 import os
@@ -41,9 +41,6 @@ def save_certificate_text(cert_data):
 
 def create_certificate():
     """Create a new birth or death certificate record and generate file."""
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-
     print("\n--- CREATE CERTIFICATE ---")
     ctype = input("Certificate Type (Birth/Death): ").strip().capitalize()
     if ctype not in ('Birth', 'Death'):
@@ -60,33 +57,21 @@ def create_certificate():
     place = input("Place of Event (Hospital/Other): ").strip()
     notes = input("Additional Notes: ").strip()
 
-    
-    issued_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    cur.execute("""
-        INSERT INTO certificates 
-        (P_ID, Type, Name, DOB, DOD, Parent_Guardian, Place_Of_Event, Notes, Date_Issued)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    """, (p_id, ctype, name, dob, dod, parent, place, notes, issued_date))
-
-    conn.commit()
-
-    cert_id = cur.lastrowid
-    cur.execute("SELECT * FROM certificates WHERE Certificate_ID=%s", (cert_id,))
-    cert_data = cur.fetchone()
-
-    filepath = save_certificate_text(cert_data)
-    print(f"✅ Certificate created successfully (Certificate ID = {cert_id})")
-    print(f"📝 Certificate saved at: {filepath}")
-
-    cur.close(); conn.close()
+    from services import ServiceError, create_certificate as create_certificate_record  # services builds on this module
+    try:
+        cert = create_certificate_record({
+            "Type": ctype, "Name": name, "P_ID": p_id, "DOB": dob, "DOD": dod,
+            "Parent_Guardian": parent, "Place_Of_Event": place, "Notes": notes,
+        })
+    except ServiceError as e:
+        print("⚠️", e)
+        return
+    print(f"✅ Certificate created successfully (Certificate ID = {cert['Certificate_ID']})")
+    print(f"📝 Certificate saved at: {cert['File']}")
 
 
 def view_certificates(by_type=None, by_patient=None):
     """View all certificates, optionally filtered by type or patient."""
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-
     q = "SELECT * FROM certificates WHERE 1=1"
     params = []
     if by_type:
@@ -95,8 +80,9 @@ def view_certificates(by_type=None, by_patient=None):
         q += " AND P_ID=%s"; params.append(by_patient)
     q += " ORDER BY Date_Issued DESC"
 
-    cur.execute(q, tuple(params))
-    rows = cur.fetchall()
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, tuple(params))
+        rows = cur.fetchall()
 
     if not rows:
         print("⚠️ No certificates found.")
@@ -104,27 +90,23 @@ def view_certificates(by_type=None, by_patient=None):
         print("\n--- CERTIFICATES ---")
         print(tabulate(rows, headers="keys", tablefmt="grid"))
 
-    cur.close(); conn.close()
-
 def delete_certificate():
-    conn = get_connection(); cur = conn.cursor()
     cid = input("Enter Certificate ID to delete: ")
-    cur.execute("DELETE FROM certificates WHERE Cert_ID=%s", (cid,))
-    conn.commit()
+    with db_cursor() as (conn, cur):
+        cur.execute("DELETE FROM certificates WHERE Certificate_ID=%s", (cid,))
+        conn.commit()
     print("✅ Certificate deleted successfully.")
-    cur.close(); conn.close()
     
 def search_certificate():
     """Search for a certificate by ID or Name."""
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
     keyword = input("Enter Certificate ID or Name keyword: ").strip()
-    cur.execute("""
-        SELECT * FROM certificates
-        WHERE Certificate_ID=%s OR Name LIKE %s
-        ORDER BY Date_Issued DESC
-    """, (keyword, f"%{keyword}%"))
-    rows = cur.fetchall()
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute("""
+            SELECT * FROM certificates
+            WHERE Certificate_ID=%s OR Name LIKE %s
+            ORDER BY Date_Issued DESC
+        """, (keyword, f"%{keyword}%"))
+        rows = cur.fetchall()
 
     if not rows:
         print("⚠️ No matching certificate found.")
@@ -132,8 +114,6 @@ def search_certificate():
         print("\n--- SEARCH RESULTS ---")
         print(tabulate(rows, headers="keys", tablefmt="grid"))
 
-    cur.close(); conn.close()
-
 
 def certificate_menu():
     """Admin menu for managing certificates."""
@@ -144,7 +124,8 @@ def certificate_menu():
         print("3. View Certificates by Type")
         print("4. View Certificates by Patient ID")
         print("5. Search Certificate")
-        print("6. Back to Admin Menu")
+        print("6. Import Certificates from CSV")
+        print("7. Back to Admin Menu")
 
         ch = input("Choose an option: ").strip()
         if ch == '1':
@@ -160,6 +141,9 @@ def certificate_menu():
         elif ch == '5':
             search_certificate()
         elif ch == '6':
+            from cert_import import import_certificates_menu  # cert_import builds on this module
+            import_certificates_menu()
+        elif ch == '7':
             break
         else:
             print("⚠️ Invalid choice. Please try again.")
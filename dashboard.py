@@ -0,0 +1,160 @@
+# dashboard.py
+"""
+Live admin dashboard.
+
+The panels (bed census, today's appointments by status, today's revenue by
+payment mode, active admissions) are independent queries. They run at the
+same time on a thread pool, each on its own pooled connection, so one
+refresh takes about as long as the slowest panel rather than the sum of
+all of them. Each panel shows its own latency.
+
+    python dashboard.py [--refresh 5] [--count 10]
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from tabulate import tabulate
+
+from db_setup import db_cursor, ensure_database
+from revenue_rollup import revenue_total, revenue_totals
+from ward_census import CENSUS_COLUMNS, read_census
+
+ADMISSIONS_SHOWN = 10
+CLEAR_SCREEN = "\033[2J\033[H"
+
+
+# ---------- PANELS ----------
+# each returns (headers, rows, footer) and opens its own pooled connection
+def bed_census_panel():
+    rows = read_census()
+    table = [list(r) + [f"{(r[2] / r[1] * 100) if r[1] else 0:.0f}%"] for r in rows]
+    total, occupied = sum(r[1] for r in rows), sum(r[2] for r in rows)
+    return CENSUS_COLUMNS + ["Occupancy"], table, f"{occupied}/{total} beds occupied"
+
+
+def appointments_panel():
+    with db_cursor() as (conn, cur):
+        # range on idx_appointments_date_start (Appointment_Date leads)
+        cur.execute("""
+            SELECT Status, COUNT(*) FROM appointments
+            WHERE Appointment_Date = %s GROUP BY Status ORDER BY Status
+        """, (date.today(),))
+        rows = cur.fetchall()
+    return ["Status", "Appointments"], rows, f"{sum(r[1] for r in rows)} appointments today"
+
+
+def revenue_panel():
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    with db_cursor() as (conn, cur):
+        rows = revenue_totals(today, tomorrow, group_by="mode", cur=cur)
+        payments, amount = revenue_total(today, tomorrow, cur=cur)
+    table = [[mode, n, f"₹{float(total):.2f}"] for mode, n, total in rows]
+    return ["Payment Mode", "Payments", "Amount"], table, f"{payments} payments, ₹{float(amount):.2f} today"
+
+
+def admissions_panel():
+    with db_cursor() as (conn, cur):
+        # served by idx_admissions_status_date
+        cur.execute("SELECT COUNT(*) FROM admissions WHERE Status='Admitted'")
+        active = cur.fetchone()[0]
+        cur.execute(f"""
+            SELECT a.Admission_ID, p.Name, a.Department, b.Bed_No, a.Admit_Date
+            FROM admissions a
+            JOIN patients p ON a.P_ID = p.P_ID
+            JOIN beds b ON a.Bed_ID = b.Bed_ID
+            WHERE a.Status='Admitted'
+            ORDER BY a.Admit_Date DESC
+            LIMIT {ADMISSIONS_SHOWN}
+        """)
+        rows = cur.fetchall()
+    footer = f"{active} active admissions" + (f" (latest {ADMISSIONS_SHOWN} shown)" if active > len(rows) else "")
+    return ["Admission_ID", "Patient", "Department", "Bed", "Admitted"], rows, footer
+
+
+PANELS = [
+    ("🛏️ Bed census", bed_census_panel),
+    ("📅 Today's appointments", appointments_panel),
+    ("💰 Today's revenue", revenue_panel),
+    ("🏥 Active admissions", admissions_panel),
+]
+
+
+# ---------- FAN-OUT ----------
+def _timed(panel):
+    t0 = time.perf_counter()
+    try:
+        result, error = panel(), None
+    except Exception as e:
+        result, error = None, e
+    return result, error, time.perf_counter() - t0
+
+
+def collect_panels(pool):
+    """Run every panel concurrently. Returns ([(title, result, error, seconds)], wall seconds)."""
+    t0 = time.perf_counter()
+    futures = [(title, pool.submit(_timed, panel)) for title, panel in PANELS]
+    results = [(title,) + future.result() for title, future in futures]
+    return results, time.perf_counter() - t0
+
+
+def render(results, wall):
+    print(f"=== 🏥 HOSPITAL DASHBOARD — {datetime.now().strftime('%d-%b-%Y %I:%M:%S %p')} ===")
+    for title, result, error, secs in results:
+        print(f"\n{title}  ({secs * 1000:.1f} ms)")
+        if error is not None:
+            print(f"❌ {error}")
+            continue
+        headers, rows, footer = result
+        if rows:
+            print(tabulate(rows, headers=headers, tablefmt="grid"))
+        print(footer)
+    serial = sum(r[3] for r in results)
+    print(f"\n⏱️ Refreshed in {wall * 1000:.1f} ms (panels total {serial * 1000:.1f} ms)")
+
+
+def run_dashboard(refresh=None, count=None):
+    """Show the dashboard once, or every `refresh` seconds (`count` times, or until Ctrl+C)."""
+    shown = 0
+    with ThreadPoolExecutor(max_workers=len(PANELS), thread_name_prefix="dashboard") as pool:
+        try:
+            while True:
+                results, wall = collect_panels(pool)
+                if refresh:
+                    print(CLEAR_SCREEN, end="")
+                render(results, wall)
+                shown += 1
+                if not refresh or (count and shown >= count):
+                    break
+                print(f"(refreshing every {refresh}s — Ctrl+C to stop)")
+                time.sleep(refresh)
+        except KeyboardInterrupt:
+            print()
+
+
+def dashboard_menu():
+    """Interactive wrapper used by the admin panel."""
+    refresh = input("Refresh every N seconds (Enter to show once): ").strip()
+    try:
+        refresh = float(refresh) if refresh else None
+    except ValueError:
+        print("⚠️ Invalid number.")
+        return
+    run_dashboard(refresh)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live hospital dashboard")
+    parser.add_argument("--refresh", type=float, help="redraw every N seconds until Ctrl+C")
+    parser.add_argument("--count", type=int, help="stop after this many refreshes")
+    args = parser.parse_args(argv)
+    ensure_database()
+    run_dashboard(args.refresh, args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
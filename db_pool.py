@@ -0,0 +1,200 @@
+# db_pool.py
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw DB-API connection handed out by ConnectionPool.
+    Everything is delegated to the raw connection except close(), which
+    returns the connection to the pool instead of closing it.
+    Usable as a context manager: uncommitted work is rolled back on error.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._last_used = time.monotonic()
+        self._checked_out = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        """Return the connection to its pool (idempotent)."""
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of DB-API connections.
+
+      connect            : zero-argument callable returning a new raw connection
+      size               : maximum number of connections (idle + in use)
+      timeout            : seconds to wait for a free connection before PoolTimeout
+      max_lifetime       : seconds after which a connection is retired on borrow/return
+      health_check_after : connections idle longer than this are pinged on borrow
+      ping               : callable(raw) raising on a dead connection
+    """
+
+    def __init__(self, connect, size=5, timeout=10.0, max_lifetime=1800.0,
+                 health_check_after=5.0, ping=None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self._ping = ping
+        self._idle = deque()
+        self._total = 0
+        self._closed = False   # set by close_all(); returned connections are then closed
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "reconnects": 0,
+            "expired": 0,
+            "peak_in_use": 0,
+        }
+
+    # ------------------------------------------------------------------
+    def connection(self, timeout=None):
+        """Check out a healthy connection, waiting up to `timeout` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        with self._cond:
+            while not self._idle and self._total >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"no DB connection available after {timeout:.1f}s "
+                                      f"(pool size {self.size})")
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                    wait_start = time.monotonic()
+                self._cond.wait(remaining)
+            if waited:
+                self._stats["wait_time"] += time.monotonic() - wait_start
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                self._total += 1
+            self._stats["checkouts"] += 1
+            in_use = self._total - len(self._idle)
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], in_use)
+
+        try:
+            if pooled is not None:
+                pooled = self._validate(pooled)
+            else:
+                pooled = self._new_connection()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        pooled._checked_out = True
+        pooled._last_used = time.monotonic()
+        return pooled
+
+    def _new_connection(self):
+        raw = self._connect()
+        with self._cond:
+            self._stats["created"] += 1
+        return PooledConnection(self, raw, time.monotonic())
+
+    def _validate(self, pooled):
+        """Replace the connection if it is too old or fails its health check."""
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled._created_at > self.max_lifetime:
+            with self._cond:
+                self._stats["expired"] += 1
+            self._close_raw(pooled)
+            return self._new_connection()
+        if self._ping and now - pooled._last_used > self.health_check_after:
+            try:
+                self._ping(pooled._raw)
+            except Exception:
+                with self._cond:
+                    self._stats["reconnects"] += 1
+                self._close_raw(pooled)
+                return self._new_connection()
+        return pooled
+
+    def _release(self, pooled):
+        keep = True
+        try:
+            if getattr(pooled._raw, "in_transaction", True):
+                pooled._raw.rollback()
+        except Exception:
+            keep = False
+        if self.max_lifetime and time.monotonic() - pooled._created_at > self.max_lifetime:
+            keep = False
+            with self._cond:
+                self._stats["expired"] += 1
+        with self._cond:
+            keep = keep and not self._closed
+            if keep:
+                pooled._last_used = time.monotonic()
+                self._idle.append(pooled)
+            else:
+                self._total -= 1
+            self._cond.notify()
+        if not keep:
+            self._close_raw(pooled)
+
+    @staticmethod
+    def _close_raw(pooled):
+        try:
+            pooled._raw.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    def stats(self):
+        """Snapshot of pool counters plus current idle / in-use sizes."""
+        with self._cond:
+            snap = dict(self._stats)
+            snap["size"] = self.size
+            snap["open"] = self._total
+            snap["idle"] = len(self._idle)
+            snap["in_use"] = self._total - len(self._idle)
+        snap["avg_wait_ms"] = (snap["wait_time"] / snap["waits"] * 1000) if snap["waits"] else 0.0
+        return snap
+
+    def close_all(self):
+        """Close every idle connection (in-use ones are closed when returned)."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close_raw(pooled)
@@ -1,5 +1,22 @@
 # db_setup.py
-import mysql.connector as connector
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import mysql.connector as connector
+except ImportError:  # SQLite-only installs
+    connector = None
+
+import db_sqlite
+import query_stats
+from db_pool import ConnectionPool
+from migrations import MIGRATIONS, apply_migrations, latest_version
+
+# Storage engine: "mysql" (server) or "sqlite" (embedded, see db_sqlite.py).
+DB_BACKEND = os.environ.get("HMS_DB_BACKEND", "mysql").lower()
 
 DB_CONFIG = {
     "host": "localhost",
@@ -8,187 +25,336 @@ DB_CONFIG = {
     "database": "hospital"
 }
 
-def init_database():
+SQLITE_CONFIG = dict(db_sqlite.SQLITE_CONFIG, path=os.environ.get("HMS_SQLITE_PATH", "hospital.db"))
+
+# Connection pool sizing. `timeout` is the checkout wait in seconds,
+# `max_lifetime` retires connections older than this many seconds and
+# connections idle longer than `health_check_after` are pinged on borrow.
+POOL_CONFIG = {
+    "size": 5,
+    "timeout": 10.0,
+    "max_lifetime": 1800.0,
+    "health_check_after": 5.0
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+# MySQL's @@innodb_autoinc_lock_mode, read once (see insert_many_ids)
+_autoinc_lock_mode = None
+
+# ----------------------------------------------------------------
+# MySQL schema (the SQLite equivalent lives in db_sqlite.SCHEMA)
+MYSQL_SCHEMA = [
+    # Admin table (secure login storage)
     """
-    Create database (if not exists) and required tables.
-    Safe to run multiple times.
+    CREATE TABLE IF NOT EXISTS admin (
+        Admin_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Username VARCHAR(50) UNIQUE NOT NULL,
+        Password VARCHAR(255) NOT NULL,
+        Email VARCHAR(100),
+        Full_Name VARCHAR(100),
+        Created_On DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # patients
     """
-    tmp_conn = None
-    tmp_cur = None
-    try:
-        # Connect without database to ensure DB exists
-        tmp_conn = connector.connect(
-            host=DB_CONFIG["host"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"]
-        )
-        tmp_cur = tmp_conn.cursor()
-        tmp_cur.execute("CREATE DATABASE IF NOT EXISTS hospital;")
-        tmp_cur.execute("USE hospital;")
+    CREATE TABLE IF NOT EXISTS patients (
+        P_ID INT PRIMARY KEY AUTO_INCREMENT,
+        Name VARCHAR(50) NOT NULL,
+        Age INT CHECK (Age > 0),
+        Gender ENUM('Male', 'Female', 'Other'),
+        Phone_No VARCHAR(13) UNIQUE,
+        Email VARCHAR(50) UNIQUE,
+        Address VARCHAR(100),
+        Date_Registered DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # doctors
+    """
+    CREATE TABLE IF NOT EXISTS doctors (
+        D_ID INT PRIMARY KEY AUTO_INCREMENT,
+        Name VARCHAR(50) NOT NULL,
+        Specialization VARCHAR(50),
+        Experience INT,
+        Fees DECIMAL(10,2),
+        Phone_No VARCHAR(13) UNIQUE,
+        Email VARCHAR(50) UNIQUE,
+        Availability JSON,
+        Gender ENUM('Male', 'Female', 'Other'),
+        Address VARCHAR(100)
+    );
+    """,
+    # appointments
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+        A_ID INT PRIMARY KEY AUTO_INCREMENT,
+        P_ID INT,
+        D_ID INT,
+        Appointment_Date DATE,
+        Time_Slot VARCHAR(50),
+        Reason VARCHAR(200),
+        Status ENUM('Scheduled', 'Completed', 'Cancelled') DEFAULT 'Scheduled',
+        Date_Created DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE CASCADE,
+        FOREIGN KEY (D_ID) REFERENCES doctors(D_ID) ON DELETE CASCADE
+    );
+    """,
+    # billing
+    """
+    CREATE TABLE IF NOT EXISTS billing (
+        Bill_ID INT AUTO_INCREMENT PRIMARY KEY,
+        A_ID INT,
+        Amount DECIMAL(10,2),
+        Payment_Mode ENUM('Cash','Card','UPI'),
+        Date_Paid DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (A_ID) REFERENCES appointments(A_ID) ON DELETE SET NULL
+    );
+    """,
+    # receipts (human-readable bills)
+    """
+    CREATE TABLE IF NOT EXISTS receipts (
+        Receipt_ID INT AUTO_INCREMENT PRIMARY KEY,
+        A_ID INT NULL,
+        P_ID INT NOT NULL,
+        Bill_No VARCHAR(50) UNIQUE NOT NULL,
+        Amount DECIMAL(10,2) NOT NULL,
+        Payment_Mode ENUM('Cash','Card','UPI') DEFAULT 'Cash',
+        Date_Paid DATETIME DEFAULT CURRENT_TIMESTAMP,
+        Notes VARCHAR(255),
+        FOREIGN KEY (A_ID) REFERENCES appointments(A_ID),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID)
+    );
+    """,
+    # beds (inventory)
+    """
+    CREATE TABLE IF NOT EXISTS beds (
+        Bed_ID INT AUTO_INCREMENT PRIMARY KEY,
+        Department VARCHAR(50) NOT NULL,
+        Bed_No VARCHAR(20) NOT NULL,
+        Is_Occupied TINYINT(1) DEFAULT 0,
+        Current_P_ID INT NULL,
+        UNIQUE (Department, Bed_No),
+        FOREIGN KEY (Current_P_ID) REFERENCES patients(P_ID)
+    );
+    """,
+    # admissions (track patients)
+    """
+    CREATE TABLE IF NOT EXISTS admissions (
+        Admission_ID INT AUTO_INCREMENT PRIMARY KEY,
+        P_ID INT NOT NULL,
+        Bed_ID INT NOT NULL,
+        Department VARCHAR(50) NOT NULL,
+        Admit_Date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        Discharge_Date DATETIME NULL,
+        Status ENUM('Admitted','Discharged') DEFAULT 'Admitted',
+        Notes VARCHAR(255),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID),
+        FOREIGN KEY (Bed_ID) REFERENCES beds(Bed_ID)
+    );
+    """,
+    # certificates (birth/death)
+    """
+    CREATE TABLE IF NOT EXISTS certificates (
+        Certificate_ID INT AUTO_INCREMENT PRIMARY KEY,
+        P_ID INT NULL,
+        Type ENUM('Birth','Death') NOT NULL,
+        Name VARCHAR(100) NOT NULL,
+        DOB DATE NULL,
+        DOD DATE NULL,
+        Parent_Guardian VARCHAR(100),
+        Place_Of_Event VARCHAR(100),
+        Notes TEXT,
+        Issued_By VARCHAR(100) DEFAULT 'Hospital Admin',
+        Date_Issued DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE SET NULL
+    );
+    """
+]
 
-        # ----------------------------------------------------------------
-        # Admin table (secure login storage)
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS admin (
-            Admin_ID INT AUTO_INCREMENT PRIMARY KEY,
-            Username VARCHAR(50) UNIQUE NOT NULL,
-            Password VARCHAR(255) NOT NULL,
-            Email VARCHAR(100),
-            Full_Name VARCHAR(100),
-            Created_On DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """)
+# Single-row record of the schema build this database was set up with.
+# Startup compares it against schema_fingerprint() to skip the DDL pass.
+SCHEMA_META_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        Meta_Key VARCHAR(20) PRIMARY KEY,
+        Version INT NOT NULL,
+        Fingerprint CHAR(64) NOT NULL,
+        Updated_On DATETIME
+    )
+"""
 
-        # Ensure a default admin exists
-        tmp_cur.execute("SELECT COUNT(*) FROM admin;")
-        if tmp_cur.fetchone()[0] == 0:
-            tmp_cur.execute("""
-                INSERT INTO admin (Username, Password, Email, Full_Name)
-                VALUES ('admin', 'admin123', 'admin@hospital.com', 'System Administrator');
-            """)
+# Default bed inventory seeded into an empty beds table
+DEFAULT_BEDS = {
+    "OPD": 10,
+    "IPD": 30,
+    "ICU": 6,
+    "Emergency": 8,
+    "Radiology": 4,
+    "Surgery": 12
+}
 
-        # ----------------------------------------------------------------
-        # patients
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS patients (
-            P_ID INT PRIMARY KEY AUTO_INCREMENT,
-            Name VARCHAR(50) NOT NULL,
-            Age INT CHECK (Age > 0),
-            Gender ENUM('Male', 'Female', 'Other'),
-            Phone_No VARCHAR(13) UNIQUE,
-            Email VARCHAR(50) UNIQUE,
-            Address VARCHAR(100),
-            Date_Registered DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        """)
 
-        # doctors
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS doctors (
-            D_ID INT PRIMARY KEY AUTO_INCREMENT,
-            Name VARCHAR(50) NOT NULL,
-            Specialization VARCHAR(50),
-            Experience INT,
-            Fees DECIMAL(10,2),
-            Phone_No VARCHAR(13) UNIQUE,
-            Email VARCHAR(50) UNIQUE,
-            Availability JSON,
-            Gender ENUM('Male', 'Female', 'Other'),
-            Address VARCHAR(100)
-        );
-        """)
+def backend():
+    """Name of the active storage engine ("mysql" or "sqlite")."""
+    return DB_BACKEND
 
-        # appointments
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS appointments (
-            A_ID INT PRIMARY KEY AUTO_INCREMENT,
-            P_ID INT,
-            D_ID INT,
-            Appointment_Date DATE,
-            Time_Slot VARCHAR(50),
-            Reason VARCHAR(200),
-            Status ENUM('Scheduled', 'Completed', 'Cancelled') DEFAULT 'Scheduled',
-            Date_Created DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE CASCADE,
-            FOREIGN KEY (D_ID) REFERENCES doctors(D_ID) ON DELETE CASCADE
-        );
-        """)
 
-        # billing
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS billing (
-            Bill_ID INT AUTO_INCREMENT PRIMARY KEY,
-            A_ID INT,
-            Amount DECIMAL(10,2),
-            Payment_Mode ENUM('Cash','Card','UPI'),
-            Date_Paid DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (A_ID) REFERENCES appointments(A_ID) ON DELETE SET NULL
-        );
-        """)
+def configure_backend(name, **options):
+    """
+    Switch storage engine at runtime (benchmarks, test rigs).
+    `options` update DB_CONFIG (mysql) or SQLITE_CONFIG (sqlite).
+    Any existing pool is drained so new connections use the new settings.
+    """
+    global DB_BACKEND, _pool
+    name = name.lower()
+    if name not in ("mysql", "sqlite"):
+        raise ValueError(f"Unknown DB backend: {name}")
+    DB_BACKEND = name
+    (SQLITE_CONFIG if name == "sqlite" else DB_CONFIG).update(options)
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = None
 
-        # receipts (human-readable bills)
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS receipts (
-            Receipt_ID INT AUTO_INCREMENT PRIMARY KEY,
-            A_ID INT NULL,
-            P_ID INT NOT NULL,
-            Bill_No VARCHAR(50) UNIQUE NOT NULL,
-            Amount DECIMAL(10,2) NOT NULL,
-            Payment_Mode ENUM('Cash','Card','UPI') DEFAULT 'Cash',
-            Date_Paid DATETIME DEFAULT CURRENT_TIMESTAMP,
-            Notes VARCHAR(255),
-            FOREIGN KEY (A_ID) REFERENCES appointments(A_ID),
-            FOREIGN KEY (P_ID) REFERENCES patients(P_ID)
-        );
-        """)
 
-        # beds (inventory)
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS beds (
-            Bed_ID INT AUTO_INCREMENT PRIMARY KEY,
-            Department VARCHAR(50) NOT NULL,
-            Bed_No VARCHAR(20) NOT NULL,
-            Is_Occupied TINYINT(1) DEFAULT 0,
-            Current_P_ID INT NULL,
-            UNIQUE (Department, Bed_No),
-            FOREIGN KEY (Current_P_ID) REFERENCES patients(P_ID)
-        );
-        """)
+def insert_ignore_sql(table, columns, key_column=None):
+    """
+    INSERT statement (with %s placeholders) that silently skips rows whose
+    primary/unique key already exists, in the active dialect. Unlike MySQL's
+    INSERT IGNORE it does not swallow other errors such as FK violations.
+    """
+    cols = ", ".join(columns)
+    marks = ", ".join(["%s"] * len(columns))
+    if DB_BACKEND == "sqlite":
+        return f"INSERT INTO {table} ({cols}) VALUES ({marks}) ON CONFLICT DO NOTHING"
+    key = key_column or columns[0]
+    return f"INSERT INTO {table} ({cols}) VALUES ({marks}) ON DUPLICATE KEY UPDATE {key} = {key}"
 
-        # Populate default beds if empty
-        tmp_cur.execute("SELECT COUNT(*) FROM beds")
-        if tmp_cur.fetchone()[0] == 0:
-            departments = {
-                "OPD": 10,
-                "IPD": 30,
-                "ICU": 6,
-                "Emergency": 8,
-                "Radiology": 4,
-                "Surgery": 12
-            }
-            for dept, cnt in departments.items():
-                for i in range(1, cnt+1):
-                    bed_no = f"{dept[:3].upper()}-{i:02d}"
-                    tmp_cur.execute("INSERT INTO beds (Department, Bed_No) VALUES (%s, %s)", (dept, bed_no))
-
-        # admissions (track patients)
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS admissions (
-            Admission_ID INT AUTO_INCREMENT PRIMARY KEY,
-            P_ID INT NOT NULL,
-            Bed_ID INT NOT NULL,
-            Department VARCHAR(50) NOT NULL,
-            Admit_Date DATETIME DEFAULT CURRENT_TIMESTAMP,
-            Discharge_Date DATETIME NULL,
-            Status ENUM('Admitted','Discharged') DEFAULT 'Admitted',
-            Notes VARCHAR(255),
-            FOREIGN KEY (P_ID) REFERENCES patients(P_ID),
-            FOREIGN KEY (Bed_ID) REFERENCES beds(Bed_ID)
-        );
-        """)
 
-        # certificates (birth/death)
-        tmp_cur.execute("""
-        CREATE TABLE IF NOT EXISTS certificates (
-            Certificate_ID INT AUTO_INCREMENT PRIMARY KEY,
-            P_ID INT NULL,
-            Type ENUM('Birth','Death') NOT NULL,
-            Name VARCHAR(100) NOT NULL,
-            DOB DATE NULL,
-            DOD DATE NULL,
-            Parent_Guardian VARCHAR(100),
-            Place_Of_Event VARCHAR(100),
-            Notes TEXT,
-            Issued_By VARCHAR(100) DEFAULT 'Hospital Admin',
-            Date_Issued DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE SET NULL
-        );
+def _consecutive_insert_ids(cur):
+    """
+    True when a multi-row INSERT is guaranteed a consecutive block of
+    auto-increment IDs. MySQL's interleaved lock mode
+    (innodb_autoinc_lock_mode=2, the MySQL 8 default) lets concurrent
+    sessions take IDs from the middle of the block.
+    """
+    global _autoinc_lock_mode
+    if DB_BACKEND == "sqlite":
+        return True
+    if _autoinc_lock_mode is None:
+        cur.execute("SELECT @@innodb_autoinc_lock_mode")
+        _autoinc_lock_mode = int(cur.fetchone()[0])
+    return _autoinc_lock_mode != 2
+
+
+def insert_many_ids(cur, sql, rows):
+    """
+    executemany() an INSERT and return the generated IDs in row order.
+    MySQL's connector sends one multi-row INSERT whose lastrowid is the
+    first new ID; SQLite reports the last one through last_insert_rowid().
+    Both hand out consecutive IDs inside one statement / write transaction,
+    except MySQL in interleaved auto-increment mode, where the rows are
+    inserted one at a time instead.
+    """
+    if not _consecutive_insert_ids(cur):
+        ids = []
+        for row in rows:
+            cur.execute(sql, row)
+            ids.append(cur.lastrowid)
+        return ids
+    cur.executemany(sql, rows)
+    if DB_BACKEND == "sqlite":
+        cur.execute("SELECT last_insert_rowid()")
+        first = cur.fetchone()[0] - len(rows) + 1
+    else:
+        first = cur.lastrowid
+    return list(range(first, first + len(rows)))
+
+
+def is_retryable_error(exc):
+    """True for transient lock conflicts: MySQL deadlock / lock wait timeout, SQLite busy."""
+    if getattr(exc, "errno", None) in (1205, 1213):
+        return True
+    msg = str(exc).lower()
+    return "database is locked" in msg or "database is busy" in msg or "deadlock" in msg
+
+
+def schema_fingerprint():
+    """SHA-256 over the active backend's DDL, migration list and seed data."""
+    h = hashlib.sha256(DB_BACKEND.encode())
+    for ddl in (db_sqlite.SCHEMA if DB_BACKEND == "sqlite" else MYSQL_SCHEMA):
+        h.update(" ".join(ddl.split()).encode())
+    for m in MIGRATIONS:
+        h.update(f"{m.version}:{m.description}".encode())
+    h.update(repr(sorted(DEFAULT_BEDS.items())).encode())
+    return h.hexdigest()
+
+
+def _seed_defaults(cur):
+    """Insert the default admin and bed inventory into empty tables."""
+    # Ensure a default admin exists
+    cur.execute("SELECT COUNT(*) FROM admin")
+    if cur.fetchone()[0] == 0:
+        cur.execute("""
+            INSERT INTO admin (Username, Password, Email, Full_Name)
+            VALUES ('admin', 'admin123', 'admin@hospital.com', 'System Administrator')
         """)
 
+    # Populate default beds if empty
+    cur.execute("SELECT COUNT(*) FROM beds")
+    if cur.fetchone()[0] == 0:
+        beds = []
+        for dept, cnt in DEFAULT_BEDS.items():
+            for i in range(1, cnt+1):
+                beds.append((dept, f"{dept[:3].upper()}-{i:02d}"))
+        cur.executemany("INSERT INTO beds (Department, Bed_No) VALUES (%s, %s)", beds)
+
+
+def _bootstrap_connection():
+    """Raw connection used for DDL; creates the MySQL database if needed."""
+    if DB_BACKEND == "sqlite":
+        return db_sqlite.connect(SQLITE_CONFIG)
+    # Connect without database to ensure DB exists
+    conn = connector.connect(
+        host=DB_CONFIG["host"],
+        user=DB_CONFIG["user"],
+        password=DB_CONFIG["password"]
+    )
+    cur = conn.cursor()
+    cur.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']};")
+    cur.execute(f"USE {DB_CONFIG['database']};")
+    cur.close()
+    return conn
+
+
+def init_database():
+    """
+    Create database (if not exists) and required tables.
+    Safe to run multiple times.
+    """
+    tmp_conn = None
+    tmp_cur = None
+    try:
+        tmp_conn = _bootstrap_connection()
+        tmp_cur = tmp_conn.cursor()
+        schema = db_sqlite.SCHEMA if DB_BACKEND == "sqlite" else MYSQL_SCHEMA
+        for ddl in schema:
+            tmp_cur.execute(ddl)
+        _seed_defaults(tmp_cur)
+        tmp_conn.commit()
+
+        applied = apply_migrations(tmp_conn, DB_BACKEND)
+
+        tmp_cur.execute(SCHEMA_META_DDL)
+        tmp_cur.execute("""
+            REPLACE INTO schema_meta (Meta_Key, Version, Fingerprint, Updated_On)
+            VALUES ('schema', %s, %s, %s)
+        """, (latest_version(), schema_fingerprint(), time.strftime("%Y-%m-%d %H:%M:%S")))
         tmp_conn.commit()
         print("✅ Database and tables checked/created successfully.")
+        if applied:
+            print(f"🛠️ Applied schema migrations: {', '.join(map(str, applied))}")
 
-    except connector.Error as e:
+    except Exception as e:
         print("❌ DB setup error:", e)
 
     finally:
@@ -201,6 +367,110 @@ def init_database():
             pass
 
 
-def get_connection():
-    """Returns a new connection using the `hospital` database."""
+def ensure_database(timings=None):
+    """
+    Startup entry point. Reads the stored schema version and fingerprint in
+    one query on a pooled connection and only falls back to the full
+    init_database() DDL pass when they do not match this build (or the
+    database does not exist yet).
+    `timings`, if given, is filled with seconds spent in each phase.
+    Returns True when the fast path was taken.
+    """
+    timings = {} if timings is None else timings
+    expected = (latest_version(), schema_fingerprint())
+    stored = None
+
+    start = time.perf_counter()
+    try:
+        conn = get_connection()
+    except Exception:
+        conn = None
+    timings["connect"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if conn is not None:
+        with conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT Version, Fingerprint FROM schema_meta WHERE Meta_Key = 'schema'")
+                stored = cur.fetchone()
+            except Exception:
+                stored = None
+            finally:
+                cur.close()
+    timings["schema_check"] = time.perf_counter() - start
+
+    if stored is not None and tuple(stored) == expected:
+        print(f"✅ Database schema up to date (version {expected[0]}).")
+        return True
+
+    start = time.perf_counter()
+    init_database()
+    timings["ddl"] = time.perf_counter() - start
+    return False
+
+
+def _connect_raw():
+    if DB_BACKEND == "sqlite":
+        return db_sqlite.connect(SQLITE_CONFIG)
     return connector.connect(**DB_CONFIG)
+
+
+def _connect():
+    # cursors report per-statement timings to query_stats, which EXPLAINs on its own raw connections
+    return query_stats.instrument(_connect_raw(), DB_BACKEND, _connect_raw)
+
+
+def _ping(raw):
+    raw.ping(reconnect=False)
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect, ping=_ping, **POOL_CONFIG)
+    return _pool
+
+
+def dedicated_connection():
+    """
+    Open a connection outside the pool, owned (and closed) by the caller.
+    For short bookkeeping transactions issued while the caller already
+    holds a pooled connection, so they never wait on the pool.
+    """
+    return _connect()
+
+
+def get_connection():
+    """
+    Borrow a connection to the `hospital` database from the pool.
+    Its cursors are instrumented (see query_stats.py).
+    Calling close() (or leaving a `with` block) hands it back to the pool.
+    """
+    return get_pool().connection()
+
+
+@contextmanager
+def db_cursor(dictionary=False):
+    """
+    Borrow a pooled connection and yield (conn, cur).
+    The cursor is closed and the connection returned to the pool on exit;
+    uncommitted work is rolled back.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor(dictionary=True) if dictionary else conn.cursor()
+        try:
+            yield conn, cur
+        finally:
+            try:
+                cur.close()
+            except Exception:
+                pass
+
+
+def pool_stats():
+    """Counters for sizing the pool: checkouts, waits, timeouts, reconnects..."""
+    return get_pool().stats()
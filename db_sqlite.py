@@ -0,0 +1,231 @@
+# db_sqlite.py
+"""
+Embedded SQLite storage engine.
+
+Runs the whole system in-process against a single database file. The
+connection and cursor classes accept the same calls the ops modules make
+on mysql.connector (`%s` placeholders, cursor(dictionary=True),
+lastrowid ...) so callers do not need to know which backend is active.
+"""
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+SQLITE_CONFIG = {
+    "path": "hospital.db",
+    "busy_timeout_ms": 5000,
+    "cache_size_kb": 32768,
+    "mmap_size": 268435456
+}
+
+# ----------------------------------------------------------------
+# Schema — mirrors the MySQL DDL in db_setup.py. ENUM becomes a CHECK
+# constraint, JSON a json_valid() CHECK, AUTO_INCREMENT AUTOINCREMENT.
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS admin (
+        Admin_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Username VARCHAR(50) UNIQUE NOT NULL,
+        Password VARCHAR(255) NOT NULL,
+        Email VARCHAR(100),
+        Full_Name VARCHAR(100),
+        Created_On DATETIME DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS patients (
+        P_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Name VARCHAR(50) NOT NULL,
+        Age INT CHECK (Age > 0),
+        Gender TEXT CHECK (Gender IN ('Male', 'Female', 'Other')),
+        Phone_No VARCHAR(13) UNIQUE,
+        Email VARCHAR(50) UNIQUE,
+        Address VARCHAR(100),
+        Date_Registered DATETIME DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS doctors (
+        D_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Name VARCHAR(50) NOT NULL,
+        Specialization VARCHAR(50),
+        Experience INT,
+        Fees DECIMAL(10,2),
+        Phone_No VARCHAR(13) UNIQUE,
+        Email VARCHAR(50) UNIQUE,
+        Availability TEXT CHECK (Availability IS NULL OR json_valid(Availability)),
+        Gender TEXT CHECK (Gender IN ('Male', 'Female', 'Other')),
+        Address VARCHAR(100)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+        A_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        P_ID INT,
+        D_ID INT,
+        Appointment_Date DATE,
+        Time_Slot VARCHAR(50),
+        Reason VARCHAR(200),
+        Status TEXT DEFAULT 'Scheduled' CHECK (Status IN ('Scheduled', 'Completed', 'Cancelled')),
+        Date_Created DATETIME DEFAULT (datetime('now', 'localtime')),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE CASCADE,
+        FOREIGN KEY (D_ID) REFERENCES doctors(D_ID) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS billing (
+        Bill_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        A_ID INT,
+        Amount DECIMAL(10,2),
+        Payment_Mode TEXT CHECK (Payment_Mode IN ('Cash', 'Card', 'UPI')),
+        Date_Paid DATETIME DEFAULT (datetime('now', 'localtime')),
+        FOREIGN KEY (A_ID) REFERENCES appointments(A_ID) ON DELETE SET NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS receipts (
+        Receipt_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        A_ID INT NULL,
+        P_ID INT NOT NULL,
+        Bill_No VARCHAR(50) UNIQUE NOT NULL,
+        Amount DECIMAL(10,2) NOT NULL,
+        Payment_Mode TEXT DEFAULT 'Cash' CHECK (Payment_Mode IN ('Cash', 'Card', 'UPI')),
+        Date_Paid DATETIME DEFAULT (datetime('now', 'localtime')),
+        Notes VARCHAR(255),
+        FOREIGN KEY (A_ID) REFERENCES appointments(A_ID),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS beds (
+        Bed_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Department VARCHAR(50) NOT NULL,
+        Bed_No VARCHAR(20) NOT NULL,
+        Is_Occupied INTEGER DEFAULT 0,
+        Current_P_ID INT NULL,
+        UNIQUE (Department, Bed_No),
+        FOREIGN KEY (Current_P_ID) REFERENCES patients(P_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS admissions (
+        Admission_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        P_ID INT NOT NULL,
+        Bed_ID INT NOT NULL,
+        Department VARCHAR(50) NOT NULL,
+        Admit_Date DATETIME DEFAULT (datetime('now', 'localtime')),
+        Discharge_Date DATETIME NULL,
+        Status TEXT DEFAULT 'Admitted' CHECK (Status IN ('Admitted', 'Discharged')),
+        Notes VARCHAR(255),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID),
+        FOREIGN KEY (Bed_ID) REFERENCES beds(Bed_ID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS certificates (
+        Certificate_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        P_ID INT NULL,
+        Type TEXT NOT NULL CHECK (Type IN ('Birth', 'Death')),
+        Name VARCHAR(100) NOT NULL,
+        DOB DATE NULL,
+        DOD DATE NULL,
+        Parent_Guardian VARCHAR(100),
+        Place_Of_Event VARCHAR(100),
+        Notes TEXT,
+        Issued_By VARCHAR(100) DEFAULT 'Hospital Admin',
+        Date_Issued DATETIME DEFAULT (datetime('now', 'localtime')),
+        FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE SET NULL
+    )
+    """
+]
+
+
+# ----------------------------------------------------------------
+# Type adapters / converters so DATE, DATETIME and DECIMAL columns come
+# back as the same Python types mysql.connector returns.
+def _convert_date(raw):
+    try:
+        return date.fromisoformat(raw.decode()[:10])
+    except ValueError:
+        return raw.decode()
+
+
+def _convert_datetime(raw):
+    try:
+        return datetime.fromisoformat(raw.decode())
+    except ValueError:
+        return raw.decode()
+
+
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda dt: dt.isoformat(sep=" ", timespec="seconds"))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DECIMAL", lambda raw: Decimal(raw.decode()))
+
+
+def _concat(*args):
+    """MySQL CONCAT(): NULL if any argument is NULL."""
+    if any(a is None for a in args):
+        return None
+    return "".join(str(a) for a in args)
+
+
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|%s")
+
+
+@lru_cache(maxsize=512)
+def translate(sql):
+    """Rewrite mysql.connector `%s` placeholders to SQLite `?` outside string literals."""
+    return _PLACEHOLDER.sub(lambda m: "?" if m.group(0) == "%s" else m.group(0), sql)
+
+
+def _dict_row(cur, row):
+    return {col[0]: val for col, val in zip(cur.description, row)}
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """Cursor accepting `%s` placeholders like mysql.connector's."""
+
+    def execute(self, sql, params=()):
+        return super().execute(translate(sql), params)
+
+    def executemany(self, sql, seq_of_params):
+        return super().executemany(translate(sql), seq_of_params)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """Connection whose cursor() understands mysql.connector's `dictionary=True`."""
+
+    def cursor(self, dictionary=False):
+        cur = super().cursor(SQLiteCursor)
+        if dictionary:
+            cur.row_factory = _dict_row
+        return cur
+
+    def ping(self, reconnect=False):
+        self.execute("SELECT 1")
+
+
+def connect(config=None):
+    """Open a tuned connection to the embedded database file."""
+    config = {**SQLITE_CONFIG, **(config or {})}
+    conn = sqlite3.connect(
+        config["path"],
+        timeout=config["busy_timeout_ms"] / 1000,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,
+        factory=SQLiteConnection
+    )
+    conn.create_function("CONCAT", -1, _concat, deterministic=True)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA busy_timeout={int(config['busy_timeout_ms'])}")
+    conn.execute(f"PRAGMA cache_size=-{int(config['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size={int(config['mmap_size'])}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
@@ -0,0 +1,121 @@
+# doctor_cache.py
+"""
+In-process doctor directory cache.
+
+Booking needs the doctor list, one doctor's Availability and the Fees.
+The directory loads the doctors table once, keeps Availability already
+parsed, and serves every read from memory until the TTL expires or
+doctor_ops invalidates it after add/edit/delete.
+"""
+import json
+import threading
+import time
+
+from db_setup import db_cursor
+
+# Seconds before the directory is reloaded even without an invalidation
+# (bounds staleness from writes made by other processes).
+DOCTOR_CACHE_TTL = 300
+
+
+def _parse_availability(raw):
+    if not raw:
+        return {}
+    if isinstance(raw, dict):
+        return raw
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+
+
+class DoctorDirectory:
+    def __init__(self, ttl=DOCTOR_CACHE_TTL):
+        self.ttl = ttl
+        self._doctors = None
+        self._loaded_at = 0.0
+        self._generation = 0   # bumped by invalidate(); a load started earlier is not stored
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _load(self):
+        with db_cursor() as (conn, cur):
+            cur.execute("""
+                SELECT D_ID, Name, Specialization, Experience, Fees, Gender, Availability
+                FROM doctors ORDER BY D_ID
+            """)
+            rows = cur.fetchall()
+        return {
+            r[0]: {
+                "D_ID": r[0],
+                "Name": r[1],
+                "Specialization": r[2],
+                "Experience": r[3],
+                "Fees": r[4],
+                "Gender": r[5],
+                "Availability": _parse_availability(r[6])
+            }
+            for r in rows
+        }
+
+    def _snapshot(self):
+        with self._lock:
+            fresh = self._doctors is not None and time.monotonic() - self._loaded_at < self.ttl
+            if fresh:
+                self._stats["hits"] += 1
+                return self._doctors
+            self._stats["misses"] += 1
+            generation = self._generation
+        doctors = self._load()
+        with self._lock:
+            # an invalidate() during the load means these rows may predate the write
+            if generation == self._generation:
+                self._doctors = doctors
+                self._loaded_at = time.monotonic()
+        return doctors
+
+    def all(self):
+        """All doctors as dicts (Availability pre-parsed), ordered by D_ID."""
+        return list(self._snapshot().values())
+
+    def get(self, did):
+        """One doctor by D_ID (int or numeric string), or None."""
+        try:
+            did = int(did)
+        except (TypeError, ValueError):
+            return None
+        return self._snapshot().get(did)
+
+    def invalidate(self):
+        """Drop the cached directory; the next read reloads it."""
+        with self._lock:
+            self._doctors = None
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            snap = dict(self._stats)
+            snap["cached_doctors"] = len(self._doctors) if self._doctors is not None else 0
+        lookups = snap["hits"] + snap["misses"]
+        snap["hit_ratio"] = snap["hits"] / lookups if lookups else 0.0
+        return snap
+
+
+directory = DoctorDirectory()
+
+
+def all_doctors():
+    return directory.all()
+
+
+def get_doctor(did):
+    return directory.get(did)
+
+
+def invalidate_doctors():
+    directory.invalidate()
+
+
+def doctor_cache_stats():
+    return directory.stats()
@@ -1,17 +1,14 @@
 # doctor_ops.py
 import json
 from tabulate import tabulate
-from db_setup import get_connection
+from db_setup import db_cursor
+from doctor_cache import invalidate_doctors
 
 
 # ---------------------------------------------------------
 # Add a new doctor
 # ---------------------------------------------------------
 def add_doctor():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
     print("\n--- Add New Doctor ---")
     name = input("Name: ").strip()
     specialization = input("Specialization: ").strip()
@@ -33,33 +30,29 @@ def add_doctor():
         availability[day] = [s.strip() for s in slots if s.strip()]
 
     try:
-        cur.execute("""
-            INSERT INTO doctors
-            (Name, Specialization, Experience, Fees, Phone_No, Email, Availability, Gender, Address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            name, specialization, experience, fees, phone, email,
-            json.dumps(availability), gender, address
-        ))
-        conn.commit()
-        print(f"✅ Doctor added successfully (D_ID = {cur.lastrowid})")
+        with db_cursor() as (conn, cur):
+            cur.execute("""
+                INSERT INTO doctors
+                (Name, Specialization, Experience, Fees, Phone_No, Email, Availability, Gender, Address)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                name, specialization, experience, fees, phone, email,
+                json.dumps(availability), gender, address
+            ))
+            conn.commit()
+            invalidate_doctors()
+            print(f"✅ Doctor added successfully (D_ID = {cur.lastrowid})")
     except Exception as e:
         print("❌ Error adding doctor:", e)
-    finally:
-        cur.close()
-        conn.close()
 
 
 # ---------------------------------------------------------
 # View all doctors (summary table)
 # ---------------------------------------------------------
 def view_doctors():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
-    cur.execute("SELECT D_ID, Name, Specialization, Experience, Fees, Phone_No, Email FROM doctors")
-    rows = cur.fetchall()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT D_ID, Name, Specialization, Experience, Fees, Phone_No, Email FROM doctors")
+        rows = cur.fetchall()
 
     if not rows:
         print("⚠️ No doctors found.")
@@ -67,21 +60,15 @@ def view_doctors():
         headers = ["D_ID", "Name", "Specialization", "Experience", "Fees", "Phone", "Email"]
         print(tabulate(rows, headers=headers, tablefmt="grid"))
 
-    cur.close()
-    conn.close()
-
 
 # ---------------------------------------------------------
 # View detailed info for one doctor
 # ---------------------------------------------------------
 def view_doctor_detail():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
     did = input("Enter Doctor ID: ").strip()
-    cur.execute("SELECT * FROM doctors WHERE D_ID = %s", (did,))
-    r = cur.fetchone()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT * FROM doctors WHERE D_ID = %s", (did,))
+        r = cur.fetchone()
 
     if not r:
         print("⚠️ Doctor not found.")
@@ -103,8 +90,6 @@ def view_doctor_detail():
                 print(f"  - {day}: {', '.join(slots)}")
         except Exception:
             print("  [Invalid JSON format]")
-    cur.close()
-    conn.close()
 
 
 # ---------------------------------------------------------
@@ -116,18 +101,13 @@ def edit_doctor():
     Allows updating a single field or multiple selected fields 
     instead of all details each time.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
     did = input("Enter Doctor ID to edit: ").strip()
-    cur.execute("SELECT * FROM doctors WHERE D_ID = %s", (did,))
-    doc = cur.fetchone()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT * FROM doctors WHERE D_ID = %s", (did,))
+        doc = cur.fetchone()
 
     if not doc:
         print("⚠️ Doctor not found.")
-        cur.close()
-        conn.close()
         return
 
     print(f"\nEditing Doctor: {doc[1]} ({doc[2]})")
@@ -179,8 +159,6 @@ def edit_doctor():
 
     if not updates:
         print("ℹ️ No updates made.")
-        cur.close()
-        conn.close()
         return
 
     # Build dynamic SQL query
@@ -188,14 +166,13 @@ def edit_doctor():
     values = list(updates.values()) + [did]
 
     try:
-        cur.execute(f"UPDATE doctors SET {set_clause} WHERE D_ID = %s", values)
-        conn.commit()
+        with db_cursor() as (conn, cur):
+            cur.execute(f"UPDATE doctors SET {set_clause} WHERE D_ID = %s", values)
+            conn.commit()
+        invalidate_doctors()
         print("✅ Doctor details updated successfully.")
     except Exception as e:
         print("❌ Error updating doctor:", e)
-    finally:
-        cur.close()
-        conn.close()
 
 
 
@@ -203,13 +180,10 @@ def edit_doctor():
 # Delete doctor
 # ---------------------------------------------------------
 def delete_doctor():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("USE hospital")
-
     did = input("Enter Doctor ID to delete: ").strip()
-    cur.execute("SELECT Name FROM doctors WHERE D_ID = %s", (did,))
-    r = cur.fetchone()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT Name FROM doctors WHERE D_ID = %s", (did,))
+        r = cur.fetchone()
 
     if not r:
         print("⚠️ Doctor not found.")
@@ -218,12 +192,12 @@ def delete_doctor():
     confirm = input(f"Are you sure you want to delete Dr. {r[0]} (Y/N)? ").strip().lower()
     if confirm == "y":
         try:
-            cur.execute("DELETE FROM doctors WHERE D_ID = %s", (did,))
-            conn.commit()
+            with db_cursor() as (conn, cur):
+                cur.execute("DELETE FROM doctors WHERE D_ID = %s", (did,))
+                conn.commit()
+            invalidate_doctors()
             print("✅ Doctor deleted successfully.")
         except Exception as e:
             print("❌ Error deleting doctor:", e)
     else:
         print("Deletion cancelled.")
-    cur.close()
-    conn.close()
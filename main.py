@@ -1,6 +1,11 @@
 # main.py
+import time
+_IMPORT_START = time.perf_counter()
 
-from db_setup import init_database
+import argparse
+import sys
+from tabulate import tabulate
+from db_setup import ensure_database
 from patient_ops import (
     register_patient,
     view_my_appointments,
@@ -10,6 +15,8 @@ from patient_ops import (
 from appointment_ops import book_appointment
 from admin_ops import admin_menu, forgot_credentials
 
+_IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
 
 def patient_portal_menu():
     """Patient-side menu and operations."""
@@ -40,9 +47,47 @@ def patient_portal_menu():
             print("⚠️ Invalid choice. Please try again.")
 
 
+def print_startup_profile(timings):
+    """Print the measured startup-time breakdown (--startup-profile)."""
+    rows = [[phase, f"{secs * 1000:.1f}"] for phase, secs in timings.items()]
+    rows.append(["total", f"{sum(timings.values()) * 1000:.1f}"])
+    print(tabulate(rows, headers=["Startup phase", "ms"], tablefmt="grid"))
+
+
+def run_batch_command(args):
+    """`main.py batch <file.jsonl>`: run the operations file without any menus."""
+    import batch_ops
+    try:
+        result = batch_ops.run_batch(args.file, args.commit_size or batch_ops.COMMIT_SIZE,
+                                     args.resume, args.checkpoint, args.report, args.restart)
+    except (OSError, ValueError) as e:
+        print("❌ Batch failed:", e)
+        return 1
+    batch_ops.print_batch_summary(result)
+    return 0 if not result["failed"] else 2
+
+
 def main():
     """Main entry point for Hospital Management System."""
-    init_database()
+    parser = argparse.ArgumentParser(description="Hospital Management System")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print a breakdown of startup time (import, connect, schema check)")
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser("batch", help="run operations from a JSONL file without the menus")
+    batch.add_argument("file", help="one JSON operation per line (see batch_ops.py)")
+    batch.add_argument("--commit-size", type=int, help="operations per transaction (default: 500)")
+    batch.add_argument("--resume", action="store_true", help="continue after the last checkpointed line")
+    batch.add_argument("--restart", action="store_true", help="discard an interrupted run's checkpoint")
+    batch.add_argument("--checkpoint", help="checkpoint name (default: the file's absolute path)")
+    batch.add_argument("--report", help="per-line report path (default: <file>.report.csv)")
+    args = parser.parse_args()
+
+    timings = {"import": _IMPORT_TIME}
+    ensure_database(timings)
+    if args.startup_profile:
+        print_startup_profile(timings)
+    if args.command == "batch":
+        sys.exit(run_batch_command(args))
     print("\n🏥 Welcome to Hospital Management System 🏥\n")
 
     while True:
@@ -0,0 +1,385 @@
+# migrations.py
+"""
+Versioned schema migrations.
+
+Each migration has a number, an `up` step that changes the schema and a
+`verify` step that checks the change is actually in place. Applied
+versions are recorded in the `schema_version` table, so init_database()
+only runs what is missing. Add new migrations to the end of MIGRATIONS;
+never renumber or edit one that has shipped.
+"""
+from datetime import datetime
+
+from Utils.validation import UNKNOWN_SLOT_START, slot_start_minutes
+from patient_search import name_trigrams
+
+
+class MigrationError(Exception):
+    """Raised when a migration's verify step fails after `up` ran."""
+
+
+class Migration:
+    def __init__(self, version, description, up, verify, supersedes=()):
+        self.version = version
+        self.description = description
+        self.up = up
+        self.verify = verify
+        # earlier versions whose schema this one deliberately undoes
+        self.supersedes = supersedes
+
+
+# ----------------------------------------------------------------
+# Helpers shared by migrations. `dialect` is "mysql" or "sqlite".
+def index_exists(cur, dialect, table, name):
+    if dialect == "sqlite":
+        cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='index' AND tbl_name=%s AND name=%s",
+                    (table, name))
+    else:
+        cur.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+    return cur.fetchone()[0] > 0
+
+
+def table_exists(cur, dialect, table):
+    if dialect == "sqlite":
+        cur.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name=%s", (table,))
+    else:
+        cur.execute("""
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        """, (table,))
+    return cur.fetchone()[0] > 0
+
+
+def column_exists(cur, dialect, table, column):
+    if dialect == "sqlite":
+        cur.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cur.fetchall())
+    cur.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cur.fetchone()[0] > 0
+
+
+def create_index(cur, dialect, table, name, columns):
+    """CREATE INDEX that is safe to re-run (MySQL has no IF NOT EXISTS for indexes)."""
+    if not index_exists(cur, dialect, table, name):
+        cur.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+
+def drop_index(cur, dialect, table, name):
+    """DROP INDEX that is safe to re-run (MySQL has no IF EXISTS for indexes)."""
+    if index_exists(cur, dialect, table, name):
+        cur.execute(f"DROP INDEX {name}" if dialect == "sqlite" else f"DROP INDEX {name} ON {table}")
+
+
+def _index_migration(version, description, table, name, columns):
+    return Migration(
+        version, description,
+        up=lambda cur, dialect: create_index(cur, dialect, table, name, columns),
+        verify=lambda cur, dialect: index_exists(cur, dialect, table, name)
+    )
+
+
+def _create_slot_inventory(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS slot_inventory (
+            D_ID INT NOT NULL,
+            Slot_Date DATE NOT NULL,
+            Time_Slot VARCHAR(50) NOT NULL,
+            Capacity INT NOT NULL DEFAULT 1,
+            Booked INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (D_ID, Slot_Date, Time_Slot),
+            CHECK (Booked >= 0 AND Booked <= Capacity),
+            FOREIGN KEY (D_ID) REFERENCES doctors(D_ID) ON DELETE CASCADE
+        )
+    """)
+    # Backfill from live appointments; slots that are already double-booked
+    # get their capacity raised to what is on the books.
+    cur.execute("SELECT COUNT(*) FROM slot_inventory")
+    if cur.fetchone()[0] == 0:
+        cur.execute("""
+            SELECT D_ID, Appointment_Date, Time_Slot, COUNT(*)
+            FROM appointments
+            WHERE Status <> 'Cancelled' AND D_ID IS NOT NULL
+              AND Appointment_Date IS NOT NULL AND Time_Slot IS NOT NULL
+            GROUP BY D_ID, Appointment_Date, Time_Slot
+        """)
+        rows = [(did, day, slot, max(n, 1), n) for did, day, slot, n in cur.fetchall()]
+        if rows:
+            cur.executemany("""
+                INSERT INTO slot_inventory (D_ID, Slot_Date, Time_Slot, Capacity, Booked)
+                VALUES (%s, %s, %s, %s, %s)
+            """, rows)
+
+
+def _add_slot_start(cur, dialect):
+    # Time_Slot is free text ('10:00-11:00', '2 PM - 4 PM'); listings need a
+    # sortable start time so they can page on an index.
+    if not column_exists(cur, dialect, "appointments", "Slot_Start"):
+        cur.execute(f"ALTER TABLE appointments ADD COLUMN Slot_Start SMALLINT NOT NULL DEFAULT {UNKNOWN_SLOT_START}")
+    cur.execute("SELECT DISTINCT Time_Slot FROM appointments WHERE Time_Slot IS NOT NULL")
+    updates = [(slot_start_minutes(slot), slot) for (slot,) in cur.fetchall()]
+    if updates:
+        cur.executemany("UPDATE appointments SET Slot_Start = %s WHERE Time_Slot = %s", updates)
+    create_index(cur, dialect, "appointments", "idx_appointments_date_start",
+                 ["Appointment_Date", "Slot_Start", "A_ID"])
+    create_index(cur, dialect, "appointments", "idx_appointments_doctor_date",
+                 ["D_ID", "Appointment_Date", "Slot_Start", "A_ID"])
+    create_index(cur, dialect, "appointments", "idx_appointments_status_date",
+                 ["Status", "Appointment_Date", "Slot_Start", "A_ID"])
+
+
+def _verify_slot_start(cur, dialect):
+    return (column_exists(cur, dialect, "appointments", "Slot_Start")
+            and index_exists(cur, dialect, "appointments", "idx_appointments_date_start")
+            and index_exists(cur, dialect, "appointments", "idx_appointments_doctor_date")
+            and index_exists(cur, dialect, "appointments", "idx_appointments_status_date"))
+
+
+def _create_name_trigrams(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS patient_name_trigrams (
+            Trigram VARCHAR(3) NOT NULL,
+            P_ID INT NOT NULL,
+            PRIMARY KEY (Trigram, P_ID),
+            FOREIGN KEY (P_ID) REFERENCES patients(P_ID) ON DELETE CASCADE
+        )
+    """)
+    # the cascade on patient delete looks rows up by P_ID
+    create_index(cur, dialect, "patient_name_trigrams", "idx_name_trigrams_pid", ["P_ID"])
+    cur.execute("SELECT COUNT(*) FROM patient_name_trigrams")
+    if cur.fetchone()[0] == 0:
+        cur.execute("SELECT P_ID, Name FROM patients")
+        rows = [(g, pid) for pid, name in cur.fetchall() for g in sorted(name_trigrams(name))]
+        for i in range(0, len(rows), 1000):
+            cur.executemany("INSERT INTO patient_name_trigrams (Trigram, P_ID) VALUES (%s, %s)",
+                            rows[i:i + 1000])
+
+
+def _create_bill_sequences(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS bill_sequences (
+            Seq_Day CHAR(8) PRIMARY KEY,
+            Next_Value BIGINT NOT NULL
+        )
+    """)
+    # Legacy bill numbers end in 6 random hex digits; some are all digits and
+    # could clash with the new zero-padded counter, so start each day past them.
+    cur.execute("SELECT Bill_No FROM receipts WHERE Bill_No LIKE %s", ("BILL-%",))
+    start = {}
+    for (bill_no,) in cur.fetchall():
+        parts = bill_no.split("-")
+        if len(parts) == 3 and len(parts[1]) == 8 and parts[2].isdigit():
+            start[parts[1]] = max(start.get(parts[1], 1), int(parts[2]) + 1)
+    cur.execute("SELECT Seq_Day FROM bill_sequences")
+    seeded = {row[0] for row in cur.fetchall()}
+    rows = [(day, value) for day, value in start.items() if day not in seeded]
+    if rows:
+        cur.executemany("INSERT INTO bill_sequences (Seq_Day, Next_Value) VALUES (%s, %s)", rows)
+
+
+def _create_ward_census(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ward_census (
+            Department VARCHAR(50) PRIMARY KEY,
+            Total INT NOT NULL DEFAULT 0,
+            Occupied INT NOT NULL DEFAULT 0,
+            Census_Date DATE NOT NULL,
+            Admitted_Today INT NOT NULL DEFAULT 0,
+            Discharged_Today INT NOT NULL DEFAULT 0
+        )
+    """)
+    # imported here: ward_census needs db_setup, which imports this module
+    from ward_census import rebuild_census
+    rebuild_census(cur)
+
+
+def _create_revenue_daily(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS revenue_daily (
+            Rev_Date DATE NOT NULL,
+            Payment_Mode VARCHAR(10) NOT NULL,
+            D_ID INT NOT NULL DEFAULT 0,
+            Payments INT NOT NULL DEFAULT 0,
+            Amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (Rev_Date, Payment_Mode, D_ID)
+        )
+    """)
+    # imported here for the same reason as ward_census
+    from revenue_rollup import rebuild_revenue
+    rebuild_revenue(cur)
+
+
+def _create_batch_checkpoints(cur, dialect):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS batch_checkpoints (
+            Batch_Key VARCHAR(255) PRIMARY KEY,
+            Line INT NOT NULL DEFAULT 0,
+            Updated_On DATETIME
+        )
+    """)
+
+
+def _binary_trigrams(cur, dialect):
+    # SQLite already compares TEXT as BINARY
+    if dialect == "mysql":
+        cur.execute("""
+            ALTER TABLE patient_name_trigrams
+            MODIFY Trigram VARCHAR(3) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL
+        """)
+
+
+def _verify_binary_trigrams(cur, dialect):
+    if dialect == "sqlite":
+        return True
+    cur.execute("""
+        SELECT COLLATION_NAME FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'patient_name_trigrams' AND column_name = 'Trigram'
+    """)
+    row = cur.fetchone()
+    return bool(row) and row[0] == "utf8mb4_bin"
+
+
+# ----------------------------------------------------------------
+MIGRATIONS = [
+    # view_appointments_datewise: WHERE Appointment_Date = ? ORDER BY Time_Slot
+    _index_migration(1, "appointments by date and slot",
+                     "appointments", "idx_appointments_date_slot",
+                     ["Appointment_Date", "Time_Slot"]),
+    # view_admissions: WHERE Status = 'Admitted' ORDER BY Admit_Date
+    _index_migration(2, "admissions by status and admit date",
+                     "admissions", "idx_admissions_status_date",
+                     ["Status", "Admit_Date"]),
+    # bed claims: WHERE Department = ? AND Is_Occupied = 0 (Bed_ID rides along as the row key)
+    _index_migration(3, "free beds per department",
+                     "beds", "idx_beds_dept_occupied",
+                     ["Department", "Is_Occupied"]),
+    # search_receipts: date range on Date_Paid, joined to patients on P_ID
+    _index_migration(4, "receipts by payment date",
+                     "receipts", "idx_receipts_date_paid",
+                     ["Date_Paid", "P_ID"]),
+    # latest bill for an appointment: WHERE A_ID = ? ORDER BY Date_Paid DESC LIMIT 1 -> Amount
+    _index_migration(5, "latest bill per appointment (covering)",
+                     "billing", "idx_billing_aid_paid",
+                     ["A_ID", "Date_Paid", "Amount"]),
+    # slot inventory keyed by (D_ID, Slot_Date, Time_Slot); the primary key
+    # doubles as the index for occupancy checks
+    Migration(6, "appointment slot inventory",
+              up=_create_slot_inventory,
+              verify=lambda cur, dialect: table_exists(cur, dialect, "slot_inventory")),
+    # paged appointment listings ordered by (Appointment_Date, slot start)
+    # with doctor / status filters
+    Migration(7, "appointment slot start time and listing indexes",
+              up=_add_slot_start, verify=_verify_slot_start),
+    # search_patient_by_name: trigram lookups instead of Name LIKE '%x%'
+    Migration(8, "patient name trigram index",
+              up=_create_name_trigrams,
+              verify=lambda cur, dialect: (table_exists(cur, dialect, "patient_name_trigrams")
+                                           and index_exists(cur, dialect, "patient_name_trigrams",
+                                                            "idx_name_trigrams_pid"))),
+    # record_payment: per-day hi/lo bill number blocks instead of random suffixes
+    Migration(9, "bill number sequences",
+              up=_create_bill_sequences,
+              verify=lambda cur, dialect: table_exists(cur, dialect, "bill_sequences")),
+    # bed boards: per-department counters kept by admit / discharge
+    Migration(10, "ward census counters",
+              up=_create_ward_census,
+              verify=lambda cur, dialect: table_exists(cur, dialect, "ward_census")),
+    # revenue reports: day x payment mode x doctor totals kept on payment insert;
+    # the primary key serves the Rev_Date range scans
+    Migration(11, "daily revenue rollups",
+              up=_create_revenue_daily,
+              verify=lambda cur, dialect: table_exists(cur, dialect, "revenue_daily")),
+    # batch mode: resume offset committed in the same transaction as each chunk
+    Migration(12, "batch checkpoints",
+              up=_create_batch_checkpoints,
+              verify=lambda cur, dialect: table_exists(cur, dialect, "batch_checkpoints")),
+    # trigrams differing only by accent ("ené" / "ene") collided in the
+    # primary key under MySQL's default accent-insensitive collation
+    Migration(13, "binary collation for name trigrams",
+              up=_binary_trigrams, verify=_verify_binary_trigrams),
+    # idx_appointments_date_slot (migration 1) is covered by the
+    # (Appointment_Date, Slot_Start, A_ID) index of migration 7 and only
+    # cost an extra write per booking
+    Migration(14, "drop redundant appointments date / slot index",
+              up=lambda cur, dialect: drop_index(cur, dialect, "appointments", "idx_appointments_date_slot"),
+              verify=lambda cur, dialect: not index_exists(cur, dialect, "appointments",
+                                                           "idx_appointments_date_slot"),
+              supersedes=(1,)),
+]
+
+
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            Version INT PRIMARY KEY,
+            Description VARCHAR(200) NOT NULL,
+            Applied_On DATETIME
+        )
+    """)
+
+
+def applied_versions(cur):
+    """Set of migration numbers already recorded in schema_version."""
+    _ensure_version_table(cur)
+    cur.execute("SELECT Version FROM schema_version")
+    return {row[0] for row in cur.fetchall()}
+
+
+def latest_version():
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def apply_migrations(conn, dialect):
+    """
+    Run every pending migration in order on `conn`, verifying each one.
+    Returns the list of versions applied.
+    """
+    cur = conn.cursor()
+    try:
+        done = applied_versions(cur)
+        applied = []
+        for m in MIGRATIONS:
+            if m.version in done:
+                continue
+            m.up(cur, dialect)
+            if not m.verify(cur, dialect):
+                conn.rollback()
+                raise MigrationError(f"Migration {m.version} ({m.description}) failed verification")
+            cur.execute("INSERT INTO schema_version (Version, Description, Applied_On) VALUES (%s, %s, %s)",
+                        (m.version, m.description, datetime.now()))
+            conn.commit()
+            applied.append(m.version)
+        return applied
+    finally:
+        cur.close()
+
+
+def verify_migrations(conn, dialect):
+    """
+    Re-run the verify step of every applied migration. Returns
+    [(version, description, ok)]; a migration superseded by an applied
+    later one is reported ok without being re-verified.
+    """
+    cur = conn.cursor()
+    try:
+        done = applied_versions(cur)
+        superseded = {v for m in MIGRATIONS if m.version in done for v in m.supersedes}
+        return [(m.version, m.description, m.version in superseded or m.verify(cur, dialect))
+                for m in MIGRATIONS if m.version in done]
+    finally:
+        cur.close()
+
+
+def migration_status(conn):
+    """[(version, description, applied?)] for every known migration."""
+    cur = conn.cursor()
+    try:
+        done = applied_versions(cur)
+    finally:
+        cur.close()
+    return [(m.version, m.description, m.version in done) for m in MIGRATIONS]
@@ -0,0 +1,169 @@
+# patient_cache.py
+"""
+Bounded LRU resolver for patient identity lookups.
+
+Check-in paths (book appointment, view my appointments) identify the
+patient by Phone_No or P_ID. The resolver keeps the display record in
+memory under both keys. Unknown phones and IDs are cached too
+(negative entries, shorter TTL), so a repeat check-in skips the database.
+patient_ops invalidates entries on register and delete.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from db_setup import db_cursor
+
+# Entries kept per map before the least recently used one is evicted
+PATIENT_CACHE_SIZE = 1024
+# Seconds before a cached entry is re-read (bounds staleness from other processes)
+PATIENT_CACHE_TTL = 300
+# Unknown phone / ID answers expire sooner so a patient registered elsewhere shows up quickly
+NEGATIVE_TTL = 30
+
+_MISSING = object()
+
+
+class PatientResolver:
+    def __init__(self, size=PATIENT_CACHE_SIZE, ttl=PATIENT_CACHE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._by_phone = OrderedDict()   # phone -> (record or _MISSING, expires_at)
+        self._by_id = OrderedDict()      # P_ID -> (record or _MISSING, expires_at)
+        self._phone_of = {}              # P_ID -> phone key of its positive _by_phone entry
+        self._generation = 0             # bumped by invalidate(); loads started earlier are not stored
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _get(self, table, key):
+        with self._lock:
+            entry = table.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._stats["misses"] += 1
+                return None
+            table.move_to_end(key)
+            if entry[0] is _MISSING:
+                self._stats["negative_hits"] += 1
+            else:
+                self._stats["hits"] += 1
+            return entry
+
+    def _put(self, table, key, value, generation):
+        ttl = self.negative_ttl if value is _MISSING else self.ttl
+        with self._lock:
+            # an invalidation during the load means the row may predate the write
+            if generation != self._generation:
+                return
+            table[key] = (value, time.monotonic() + ttl)
+            table.move_to_end(key)
+            if table is self._by_phone and value is not _MISSING:
+                self._phone_of[value["P_ID"]] = key
+            while len(table) > self.size:
+                old_key, (old, _) = table.popitem(last=False)
+                if (table is self._by_phone and old is not _MISSING
+                        and self._phone_of.get(old["P_ID"]) == old_key):
+                    del self._phone_of[old["P_ID"]]
+                self._stats["evictions"] += 1
+
+    def _load(self, cur, column, value, generation):
+        q = f"SELECT P_ID, Name, Phone_No FROM patients WHERE {column} = %s"
+        if cur is not None:
+            cur.execute(q, (value,))
+            row = cur.fetchone()
+        else:
+            with db_cursor() as (conn, c):
+                c.execute(q, (value,))
+                row = c.fetchone()
+        if not row:
+            return None
+        record = {"P_ID": row[0], "Name": row[1], "Phone_No": row[2]}
+        self._put(self._by_id, row[0], record, generation)
+        if row[2]:
+            self._put(self._by_phone, row[2], record, generation)
+        return record
+
+    def by_id(self, pid, cur=None):
+        """{P_ID, Name, Phone_No} for a patient ID (int or numeric string), or None.
+        `cur`, if given, is reused for the lookup on a miss."""
+        try:
+            pid = int(pid)
+        except (TypeError, ValueError):
+            return None
+        entry = self._get(self._by_id, pid)
+        if entry is not None:
+            return None if entry[0] is _MISSING else entry[0]
+        generation = self._generation
+        record = self._load(cur, "P_ID", pid, generation)
+        if record is None:
+            self._put(self._by_id, pid, _MISSING, generation)
+        return record
+
+    def by_phone(self, phone, cur=None):
+        """Same as by_id() but keyed by the registered phone number."""
+        phone = (phone or "").strip()
+        if not phone:
+            return None
+        entry = self._get(self._by_phone, phone)
+        if entry is not None:
+            return None if entry[0] is _MISSING else entry[0]
+        generation = self._generation
+        record = self._load(cur, "Phone_No", phone, generation)
+        if record is None:
+            self._put(self._by_phone, phone, _MISSING, generation)
+        return record
+
+    def invalidate(self, pid=None, phone=None):
+        """Forget one patient (by ID and/or phone, including negative entries)."""
+        with self._lock:
+            if pid is not None:
+                try:
+                    pid = int(pid)
+                except (TypeError, ValueError):
+                    pid = None
+            if pid is not None:
+                self._by_id.pop(pid, None)
+                old_phone = self._phone_of.pop(pid, None)
+                if old_phone is not None:
+                    self._by_phone.pop(old_phone, None)
+            if phone:
+                entry = self._by_phone.pop(phone.strip(), None)
+                if entry is not None and entry[0] is not _MISSING:
+                    self._phone_of.pop(entry[0]["P_ID"], None)
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._by_phone.clear()
+            self._by_id.clear()
+            self._phone_of.clear()
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            snap = dict(self._stats)
+            snap["cached_ids"] = len(self._by_id)
+            snap["cached_phones"] = len(self._by_phone)
+        lookups = snap["hits"] + snap["negative_hits"] + snap["misses"]
+        snap["hit_ratio"] = (snap["hits"] + snap["negative_hits"]) / lookups if lookups else 0.0
+        return snap
+
+
+resolver = PatientResolver()
+
+
+def resolve_patient(pid=None, phone=None, cur=None):
+    """Look a patient up by ID if given, else by phone. Returns the record or None."""
+    if pid:
+        return resolver.by_id(pid, cur)
+    return resolver.by_phone(phone, cur)
+
+
+def invalidate_patient(pid=None, phone=None):
+    resolver.invalidate(pid, phone)
+
+
+def patient_cache_stats():
+    return resolver.stats()
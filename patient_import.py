@@ -0,0 +1,269 @@
+# patient_import.py
+"""
+Bulk patient import from a legacy CSV.
+
+The file is streamed and each row normalized: phones keep their digits
+(local numbers lose a +91 / 0 prefix), emails are trimmed and lower-cased,
+and gender accepts M/F/O. Duplicates are caught in memory: the Phone_No /
+Email values already in the database are loaded into hash sets in one
+pass before the import, and every accepted row's values are remembered
+too, so there is no per-row SELECT. Accepted
+rows are inserted CHUNK_SIZE at a time with executemany(), which MySQL's
+connector sends as one multi-row INSERT; their name trigrams go in with
+one more executemany(). Rows that cannot be imported are written to a
+rejects CSV together with the reason.
+
+CSV header (case-insensitive; only Name is required):
+    Name,Age,Gender,Phone_No,Email,Address
+
+    python patient_import.py legacy.csv [--rejects legacy.rejects.csv] [--chunk 1000]
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+from db_setup import db_cursor, ensure_database, insert_many_ids
+from patient_cache import invalidate_patient
+from patient_search import name_trigrams
+from services import PATIENT_INSERT_SQL
+
+CHUNK_SIZE = 1000
+PRELOAD_BATCH = 10000
+# numbers with this country code are stored as the bare 10-digit local number
+LOCAL_COUNTRY_CODE = "91"
+
+CSV_FIELDS = ["Name", "Age", "Gender", "Phone_No", "Email", "Address"]
+GENDERS = {"m": "Male", "male": "Male", "f": "Female", "female": "Female", "o": "Other", "other": "Other"}
+_PHONE_JUNK = re.compile(r"[\s\-().]")
+_PHONE = re.compile(r"\+?\d{7,12}")
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def normalize_phone(phone):
+    """'+91 98450-12345' -> '9845012345'; None if blank. Raises ValueError if not a phone number."""
+    phone = _PHONE_JUNK.sub("", phone or "")
+    if not phone:
+        return None
+    if phone.startswith("00"):
+        phone = "+" + phone[2:]
+    local = "+" + LOCAL_COUNTRY_CODE
+    if phone.startswith(local) and len(phone) == len(local) + 10:
+        phone = phone[len(local):]
+    elif phone.startswith("0") and len(phone) == 11:
+        phone = phone[1:]
+    if not _PHONE.fullmatch(phone):
+        raise ValueError(f"invalid phone number '{phone}'")
+    return phone
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    if not email:
+        return None
+    if len(email) > 50 or not _EMAIL.fullmatch(email):
+        raise ValueError(f"invalid email '{email}'")
+    return email
+
+
+def _normalize_header(row):
+    keys = {k.replace(" ", "_").lower(): k for k in CSV_FIELDS}
+    return {keys.get((k or "").strip().replace(" ", "_").lower(), k): (v or "").strip()
+            for k, v in row.items()}
+
+
+def validate_row(row):
+    """(Name, Age, Gender, Phone_No, Email, Address) for one CSV row, or raises ValueError."""
+    row = _normalize_header(row)
+    name = " ".join(row.get("Name", "").split())
+    if not name:
+        raise ValueError("Name is required")
+    if len(name) > 50:
+        raise ValueError("Name longer than 50 characters")
+    age = row.get("Age") or None
+    if age is not None:
+        if not age.isdigit() or not 0 < int(age) < 150:
+            raise ValueError(f"invalid age '{age}'")
+        age = int(age)
+    gender = row.get("Gender") or None
+    if gender is not None:
+        gender = GENDERS.get(gender.lower())
+        if not gender:
+            raise ValueError(f"Gender must be Male, Female or Other (got '{row['Gender']}')")
+    address = row.get("Address", "")
+    if len(address) > 100:
+        raise ValueError("Address longer than 100 characters")
+    return name, age, gender, normalize_phone(row.get("Phone_No")), normalize_email(row.get("Email")), address
+
+
+def load_existing_keys(cur):
+    """(phones, emails): normalized Phone_No / Email values already registered, read in one pass."""
+    phones, emails = set(), set()
+    cur.execute("SELECT Phone_No, Email FROM patients")
+    while True:
+        rows = cur.fetchmany(PRELOAD_BATCH)
+        if not rows:
+            break
+        for phone, email in rows:
+            if phone:
+                try:
+                    phones.add(normalize_phone(phone))
+                except ValueError:
+                    phones.add(phone)
+            if email:
+                emails.add(email.strip().lower())
+    return phones, emails
+
+
+def _insert_trigrams(cur, patients):
+    cur.executemany("INSERT INTO patient_name_trigrams (Trigram, P_ID) VALUES (%s, %s)",
+                    [(g, pid) for pid, name in patients for g in sorted(name_trigrams(name))])
+
+
+def _insert_chunk(conn, cur, chunk):
+    """
+    Insert [(line, patient)] in one transaction; on failure fall back to one
+    row per transaction. Returns ([(line, P_ID, patient)] inserted, [(line, error)]).
+    """
+    try:
+        ids = insert_many_ids(cur, PATIENT_INSERT_SQL, [p for _, p in chunk])
+        _insert_trigrams(cur, [(pid, p[0]) for (_, p), pid in zip(chunk, ids)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+    else:
+        return [(line, pid, p) for (line, p), pid in zip(chunk, ids)], []
+    inserted, failed = [], []
+    for line, p in chunk:
+        try:
+            cur.execute(PATIENT_INSERT_SQL, p)
+            pid = cur.lastrowid
+            _insert_trigrams(cur, [(pid, p[0])])
+            conn.commit()
+            inserted.append((line, pid, p))
+        except Exception as e:
+            conn.rollback()
+            failed.append((line, str(e)))
+    return inserted, failed
+
+
+def import_patients(path, rejects_path=None, chunk_size=CHUNK_SIZE):
+    """
+    Register every new patient in the CSV at `path`.
+    Writes rejected rows (default: <path>.rejects.csv) and returns
+    {"rows", "imported", "rejected", "seconds", "rows_per_min", "rejects"}.
+    """
+    rejects_path = rejects_path or os.path.splitext(path)[0] + ".rejects.csv"
+    counts = {"rows": 0, "imported": 0, "rejected": 0}
+    start = time.perf_counter()
+
+    with open(path, newline="", encoding="utf-8-sig") as f, \
+            open(rejects_path, "w", newline="", encoding="utf-8") as out, \
+            db_cursor() as (conn, cur):
+        reader = csv.DictReader(f)
+        header = {(h or "").strip().replace(" ", "_").lower() for h in reader.fieldnames or []}
+        if "name" not in header:
+            raise ValueError("CSV needs at least a Name column")
+        rejects = csv.writer(out)
+        rejects.writerow(["Line", "Reason"] + reader.fieldnames)
+        raw = {}   # line -> original row, kept until its chunk is committed
+
+        def reject(line, reason):
+            counts["rejected"] += 1
+            row = raw.pop(line)
+            rejects.writerow([line, reason] + [row.get(h, "") for h in reader.fieldnames])
+
+        phones, emails = load_existing_keys(cur)
+        seen_phone, seen_email = {}, {}   # value -> first CSV line that used it
+
+        def flush(chunk):
+            inserted, failed = _insert_chunk(conn, cur, chunk)
+            for line, error in failed:
+                reject(line, error)
+            for line, pid, p in inserted:
+                raw.pop(line)
+                # drop any cached "no such phone" answer
+                invalidate_patient(pid, p[3])
+            counts["imported"] += len(inserted)
+
+        chunk = []
+        for line, row in enumerate(reader, start=2):
+            counts["rows"] += 1
+            raw[line] = row
+            try:
+                patient = validate_row(row)
+            except ValueError as e:
+                reject(line, str(e))
+                continue
+            phone, email = patient[3], patient[4]
+            if phone in phones:
+                reject(line, f"phone {phone} already registered")
+            elif phone in seen_phone:
+                reject(line, f"phone {phone} duplicates line {seen_phone[phone]}")
+            elif email in emails:
+                reject(line, f"email {email} already registered")
+            elif email in seen_email:
+                reject(line, f"email {email} duplicates line {seen_email[email]}")
+            else:
+                if phone:
+                    seen_phone[phone] = line
+                if email:
+                    seen_email[email] = line
+                chunk.append((line, patient))
+                if len(chunk) >= chunk_size:
+                    flush(chunk)
+                    chunk = []
+        if chunk:
+            flush(chunk)
+
+    elapsed = time.perf_counter() - start
+    return {
+        **counts,
+        "seconds": elapsed,
+        "rows_per_min": counts["rows"] / elapsed * 60 if elapsed else 0.0,
+        "rejects": rejects_path,
+    }
+
+
+def print_import_summary(result):
+    print(f"✅ Imported {result['imported']} of {result['rows']} patients "
+          f"in {result['seconds']:.2f}s ({result['rows_per_min']:,.0f} rows/min)")
+    if result["rejected"]:
+        print(f"⚠️ {result['rejected']} rows were rejected — see {result['rejects']}")
+
+
+def import_patients_menu():
+    """Interactive wrapper used by the admin panel."""
+    path = input("Path to CSV file: ").strip().strip('"')
+    if not os.path.isfile(path):
+        print("⚠️ File not found.")
+        return
+    try:
+        print_import_summary(import_patients(path))
+    except (ValueError, csv.Error) as e:
+        print("❌ Invalid CSV:", e)
+    except Exception as e:
+        print("❌ Error importing patients:", e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import legacy patients in bulk from a CSV file")
+    parser.add_argument("csv_path")
+    parser.add_argument("--rejects", help="rejected rows path (default: <csv>.rejects.csv)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="rows per insert transaction")
+    args = parser.parse_args(argv)
+
+    ensure_database()
+    try:
+        result = import_patients(args.csv_path, args.rejects, args.chunk)
+    except (OSError, ValueError, csv.Error) as e:
+        print("❌ Import failed:", e)
+        return 1
+    print_import_summary(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
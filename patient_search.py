@@ -0,0 +1,94 @@
+# patient_search.py
+"""
+Indexed patient name search.
+
+`Name LIKE '%x%'` scans the whole patients table. Instead every patient
+name is broken into trigrams stored in patient_name_trigrams
+(PRIMARY KEY (Trigram, P_ID)), so a search is an index lookup on the
+query's trigrams. Words are padded ('^^' in front, '$' behind), which
+makes short prefixes like "jo" match too. Candidates are ranked by prefix
+match first, then trigram similarity, which also tolerates typos.
+
+The same table works on MySQL and SQLite. register_patient keeps it in
+sync in the same transaction; rows vanish with the patient
+(ON DELETE CASCADE).
+"""
+import math
+import re
+
+SEARCH_LIMIT = 20
+# Candidates pulled from the index per result shown, before re-ranking
+CANDIDATE_FACTOR = 5
+# Fraction of the query's trigrams a name must share to count as a match
+MIN_SIMILARITY = 0.4
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_name(name):
+    return " ".join(_WORD.findall((name or "").lower()))
+
+
+def name_trigrams(name):
+    """Set of padded trigrams for every word in `name`."""
+    grams = set()
+    for word in normalize_name(name).split():
+        padded = "^^" + word + "$"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def index_patient(cur, pid, name):
+    """(Re)write the trigram rows for one patient inside the caller's transaction."""
+    cur.execute("DELETE FROM patient_name_trigrams WHERE P_ID = %s", (pid,))
+    grams = name_trigrams(name)
+    if grams:
+        cur.executemany("INSERT INTO patient_name_trigrams (Trigram, P_ID) VALUES (%s, %s)",
+                        [(g, pid) for g in sorted(grams)])
+
+
+def _score(query, q_grams, name):
+    norm = normalize_name(name)
+    grams = name_trigrams(name)
+    shared = len(q_grams & grams)
+    coverage = shared / len(q_grams)
+    jaccard = shared / len(q_grams | grams)
+    if norm.startswith(query):
+        tier = 2
+    elif any(w.startswith(query) for w in norm.split()) or query in norm:
+        tier = 1
+    else:
+        tier = 0
+    return tier, coverage, jaccard
+
+
+def search_patients(cur, query, limit=SEARCH_LIMIT):
+    """
+    Ranked patient rows (SELECT * column order) whose name matches `query`.
+    Prefix and substring matches come first, then fuzzy matches by similarity.
+    """
+    query = normalize_name(query)
+    q_grams = name_trigrams(query)
+    if not q_grams:
+        return []
+    need = max(1, math.ceil(len(q_grams) * MIN_SIMILARITY))
+    marks = ", ".join(["%s"] * len(q_grams))
+    cur.execute(f"""
+        SELECT P_ID, COUNT(*) AS Shared FROM patient_name_trigrams
+        WHERE Trigram IN ({marks})
+        GROUP BY P_ID HAVING COUNT(*) >= %s
+        ORDER BY Shared DESC, P_ID
+        LIMIT %s
+    """, (*sorted(q_grams), need, limit * CANDIDATE_FACTOR))
+    candidates = [row[0] for row in cur.fetchall()]
+    if not candidates:
+        return []
+    marks = ", ".join(["%s"] * len(candidates))
+    cur.execute(f"SELECT * FROM patients WHERE P_ID IN ({marks})", tuple(candidates))
+    scored = []
+    for row in cur.fetchall():
+        tier, coverage, jaccard = _score(query, q_grams, row[1])
+        if tier or coverage >= MIN_SIMILARITY:
+            scored.append(((-tier, -coverage, -jaccard, row[0]), row))
+    scored.sort(key=lambda s: s[0])
+    return [row for _, row in scored[:limit]]
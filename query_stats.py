@@ -0,0 +1,356 @@
+# query_stats.py
+"""
+Statement-level instrumentation for the database layer.
+
+Connections handed out by db_setup.get_connection() return
+InstrumentedCursor objects. A statement is timed from execute() until its
+result set is consumed — fetchall(), an empty fetchone()/fetchmany(), the
+next execute() or close() — so SQLite queries, which do most of their work
+while rows are fetched, are charged their real cost. Only time spent
+inside the driver counts, not the caller's work between fetches.
+
+Statements are grouped by fingerprint: the SQL with comments, literals and
+placeholders replaced by `?` and IN / VALUES lists collapsed. Each
+fingerprint keeps calls, rows, errors, total / max latency, a latency
+histogram and the functions that issued it.
+
+Statements slower than QUERY_STATS_CONFIG["slow_ms"] are appended to the
+slow-query log as JSON lines, optionally with the backend's EXPLAIN plan.
+EXPLAIN runs on a short-lived connection of its own: the statement's
+connection may be mid-transaction or still hold unread rows (a cursor
+closed before its result set was drained), and MySQL would answer an
+EXPLAIN there with "Unread result found". Parameters are used for EXPLAIN
+but never written to the log (they hold phone numbers, emails and password
+hashes).
+
+    HMS_QUERY_STATS=0            disable instrumentation
+    HMS_SLOW_QUERY_MS=100        slow-query threshold in milliseconds
+    HMS_SLOW_QUERY_LOG=path      slow-query log (default slow_queries.log)
+    HMS_EXPLAIN_SLOW=1           capture EXPLAIN for slow statements
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+QUERY_STATS_CONFIG = {
+    "enabled": os.environ.get("HMS_QUERY_STATS", "1") != "0",
+    "slow_ms": float(os.environ.get("HMS_SLOW_QUERY_MS", "100")),
+    "log_path": os.environ.get("HMS_SLOW_QUERY_LOG", "slow_queries.log"),
+    "explain": os.environ.get("HMS_EXPLAIN_SLOW", "0") == "1",
+}
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket holds everything slower
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "mysql": "EXPLAIN "}
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+# Modules skipped when looking for the function that issued a statement
+_DB_LAYER = {"db_setup", "db_pool", "db_sqlite", "query_stats", "contextlib"}
+
+SORT_KEYS = {
+    "total": "total_ms",
+    "mean": "mean_ms",
+    "max": "max_ms",
+    "calls": "calls",
+    "rows": "rows",
+    "slow": "slow",
+}
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+_LISTS = re.compile(r"\(\?(?:, ?\?)+\)")
+_REPEATED_LISTS = re.compile(r"\(\?\+\)(?:, ?\(\?\+\))+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """Normalized statement text: `WHERE id IN (%s, %s) AND x = 'a'` -> `WHERE id IN (?+) AND x = ?`."""
+    fp = _COMMENTS.sub(" ", sql)
+    fp = _STRINGS.sub("?", fp)
+    fp = _NUMBERS.sub("?", fp.replace("%s", "?"))
+    fp = _SPACES.sub(" ", fp).strip().rstrip(";")
+    fp = _LISTS.sub("(?+)", fp)
+    return _REPEATED_LISTS.sub("(?+), ...", fp)
+
+
+def _caller():
+    """'module.function' of the innermost frame outside the database layer."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in _DB_LAYER:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _percentile(entry, q):
+    """Upper bound of the histogram bucket holding the q-th latency (capped at the max seen)."""
+    target = q * entry["calls"]
+    seen = 0
+    for i, n in enumerate(entry["histogram"]):
+        seen += n
+        if seen >= target and n:
+            bound = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else entry["max_ms"]
+            return min(bound, entry["max_ms"])
+    return entry["max_ms"]
+
+
+def bucket_labels():
+    """Histogram bucket names: '≤0.1 ms', ..., '>1000 ms'."""
+    return [f"≤{b:g} ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]:g} ms"]
+
+
+class QueryStats:
+    """Thread-safe per-fingerprint counters shared by every instrumented cursor."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._by_fingerprint = {}
+        self.since = datetime.now()
+
+    def record(self, fp, elapsed, rows, caller, failed=False):
+        ms = elapsed * 1000
+        slow = ms >= QUERY_STATS_CONFIG["slow_ms"]
+        with self._lock:
+            entry = self._by_fingerprint.get(fp)
+            if entry is None:
+                entry = self._by_fingerprint[fp] = {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "errors": 0, "slow": 0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1), "callers": Counter(),
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += rows
+            entry["errors"] += failed
+            entry["slow"] += slow
+            entry["histogram"][bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            entry["callers"][caller] += 1
+        return slow
+
+    def log_slow(self, record):
+        line = json.dumps(record, default=str)
+        with self._log_lock:
+            with open(QUERY_STATS_CONFIG["log_path"], "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def top(self, n=10, by="total"):
+        """The n worst fingerprints by total / mean / max latency, calls, rows or slow count."""
+        with self._lock:
+            items = [(fp, dict(e, histogram=list(e["histogram"]), callers=Counter(e["callers"])))
+                     for fp, e in self._by_fingerprint.items()]
+        result = []
+        for fp, e in items:
+            e["fingerprint"] = fp
+            e["mean_ms"] = e["total_ms"] / e["calls"]
+            e["p50_ms"] = _percentile(e, 0.50)
+            e["p95_ms"] = _percentile(e, 0.95)
+            e["p99_ms"] = _percentile(e, 0.99)
+            e["rows_per_call"] = e["rows"] / e["calls"]
+            result.append(e)
+        result.sort(key=lambda e: e[SORT_KEYS[by]], reverse=True)
+        return result[:n]
+
+    def summary(self):
+        with self._lock:
+            entries = list(self._by_fingerprint.values())
+            return {
+                "fingerprints": len(entries),
+                "calls": sum(e["calls"] for e in entries),
+                "total_ms": sum(e["total_ms"] for e in entries),
+                "slow": sum(e["slow"] for e in entries),
+                "errors": sum(e["errors"] for e in entries),
+                "since": self.since,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._by_fingerprint.clear()
+            self.since = datetime.now()
+
+
+_stats = QueryStats()
+_MANY = object()   # params marker for executemany() statements, which are never EXPLAINed
+
+
+def _explain(connect, prefix, sql, params):
+    """EXPLAIN rows for a slow statement, run on a fresh raw connection from connect() and closed after."""
+    conn = None
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute(prefix + sql, params or ())
+        cols = [d[0] for d in cur.description]
+        rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+        cur.close()
+        return rows
+    except Exception as e:
+        return [{"error": str(e)}]
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class InstrumentedCursor:
+    """
+    Proxy around a DB-API cursor. execute / executemany / fetch* are timed
+    and reported to the process-wide QueryStats; everything else
+    (lastrowid, rowcount, description...) is delegated.
+    """
+
+    def __init__(self, raw, connect, explain_prefix):
+        self._raw = raw
+        self._connect = connect
+        self._explain_prefix = explain_prefix
+        self._open = None   # [sql, params, caller, elapsed, rows] of the statement being fetched
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def _run(self, method, sql, args, kwargs, many):
+        self._finish()
+        caller = _caller()
+        start = time.perf_counter()
+        try:
+            result = method(sql, *args, **kwargs)
+        except Exception:
+            _stats.record(fingerprint(sql), time.perf_counter() - start, 0, caller, failed=True)
+            raise
+        elapsed = time.perf_counter() - start
+        params = _MANY if many else (args[0] if args else kwargs.get("params"))
+        self._open = [sql, params, caller, elapsed, 0]
+        if many or self._raw.description is None:
+            # no result set: report now, with the affected row count
+            self._open[4] = max(self._raw.rowcount or 0, 0)
+            self._finish()
+        return result
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._raw.execute, sql, args, kwargs, many=False)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._raw.executemany, sql, args, kwargs, many=True)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._raw.fetchone()
+        if self._open is not None:
+            self._open[3] += time.perf_counter() - start
+            if row is None:
+                self._finish()
+            else:
+                self._open[4] += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._raw.fetchmany(*args, **kwargs)
+        if self._open is not None:
+            self._open[3] += time.perf_counter() - start
+            self._open[4] += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._raw.fetchall()
+        if self._open is not None:
+            self._open[3] += time.perf_counter() - start
+            self._open[4] += len(rows)
+            self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._raw.close()
+
+    def __del__(self):
+        # abandoned without close(): record it, but never EXPLAIN from the garbage collector
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass
+
+    def _finish(self, explain=True):
+        if self._open is None:
+            return
+        sql, params, caller, elapsed, rows = self._open
+        self._open = None
+        fp = fingerprint(sql)
+        if not _stats.record(fp, elapsed, rows, caller):
+            return
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "ms": round(elapsed * 1000, 3),
+            "rows": rows,
+            "caller": caller,
+            "fingerprint": fp,
+        }
+        if (explain and QUERY_STATS_CONFIG["explain"] and params is not _MANY
+                and fp.split(" ", 1)[0].lower() in _EXPLAINABLE):
+            record["explain"] = _explain(self._connect, self._explain_prefix, sql, params)
+        try:
+            _stats.log_slow(record)
+        except OSError:
+            pass
+
+
+class InstrumentedConnection:
+    """Proxy around a raw connection whose cursor() returns InstrumentedCursor objects."""
+
+    def __init__(self, raw, explain_prefix, connect):
+        self._raw = raw
+        self._explain_prefix = explain_prefix
+        self._connect = connect
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._raw.cursor(*args, **kwargs), self._connect, self._explain_prefix)
+
+
+def instrument(raw, backend, connect):
+    """
+    Wrap a new raw connection of the given backend ("mysql" / "sqlite")
+    unless instrumentation is off. connect() opens the plain connections
+    slow statements are EXPLAINed on.
+    """
+    if not QUERY_STATS_CONFIG["enabled"]:
+        return raw
+    return InstrumentedConnection(raw, EXPLAIN_PREFIX.get(backend, "EXPLAIN "), connect)
+
+
+def top_queries(n=10, by="total"):
+    return _stats.top(n, by)
+
+
+def query_summary():
+    return _stats.summary()
+
+
+def reset_query_stats():
+    _stats.reset()
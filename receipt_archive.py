@@ -0,0 +1,317 @@
+# receipt_archive.py
+"""
+Segmented, append-only receipt archive.
+
+Instead of one small file per receipt in receipts/, rendered receipts are
+appended to size-rotated segment files (seg-000001.dat, ...). Two
+direct-address index files, one per kind, map the key to (segment, offset):
+
+    appointment.idx  A_ID       -> appointment receipt (receipt_A{aid}_P{pid}.txt)
+    payment.idx      Receipt_ID -> payment receipt     (receipt_{rid}.txt)
+
+Slot `key` lives at byte key * SLOT.size of the index file, so a lookup is
+one read from a memory-mapped index plus one read from a segment (O(1)).
+Writing a key again appends a new record and repoints the slot; the old
+record stays in its segment until the archive is compacted / pruned.
+
+Command line:
+    python receipt_archive.py ingest [--src receipts] [--delete]
+    python receipt_archive.py get appointment 42
+    python receipt_archive.py list
+    python receipt_archive.py stats
+    python receipt_archive.py rebuild-index
+"""
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ARCHIVE_DIR = os.path.join("receipts", "archive")
+# Start a new segment once the current one would grow past this
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+KIND_APPOINTMENT = "appointment"
+KIND_PAYMENT = "payment"
+_KIND_CODES = {KIND_APPOINTMENT: b"A", KIND_PAYMENT: b"R"}
+_CODE_KINDS = {v: k for k, v in _KIND_CODES.items()}
+
+# record: magic, kind code, name length, key, text length, then name + text (UTF-8)
+RECORD = struct.Struct("<4scxHQI")
+MAGIC = b"RCPT"
+# index slot: segment number (0 = empty), byte offset of the record
+SLOT = struct.Struct("<IQ")
+
+ArchivedReceipt = namedtuple("ArchivedReceipt", "kind key name text")
+
+_SEGMENT_NAME = re.compile(r"^seg-(\d{6})\.dat$")
+
+
+class ReceiptArchive:
+    def __init__(self, root=ARCHIVE_DIR, segment_size=SEGMENT_SIZE):
+        self.root = root
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._maps = {}   # kind -> mmap of its index file
+
+    # ---------- files ----------
+    def _segment_path(self, number):
+        return os.path.join(self.root, f"seg-{number:06d}.dat")
+
+    def _index_path(self, kind):
+        return os.path.join(self.root, f"{kind}.idx")
+
+    def segments(self):
+        """Segment numbers in write order."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(m.group(1)) for m in map(_SEGMENT_NAME.match, os.listdir(self.root)) if m)
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize appends across threads and processes (one writer at a time)."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, ".lock"), "a+b") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _write_slot(self, kind, key, segment, offset):
+        path = self._index_path(kind)
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.seek(key * SLOT.size)
+            f.write(SLOT.pack(segment, offset))
+
+    def _read_slot(self, kind, key):
+        end = (key + 1) * SLOT.size
+        with self._lock:
+            mm = self._maps.get(kind)
+            if mm is None or len(mm) < end:
+                # (re)map: the index grows as larger keys are written
+                if mm is not None:
+                    mm.close()
+                    self._maps.pop(kind)
+                path = self._index_path(kind)
+                if not os.path.exists(path) or os.path.getsize(path) < end:
+                    return 0, 0
+                with open(path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[kind] = mm
+            return SLOT.unpack_from(mm, key * SLOT.size)
+
+    # ---------- public API ----------
+    def put(self, kind, key, name, text):
+        """Append a receipt and point the index at it. Returns (segment, offset)."""
+        code = _KIND_CODES[kind]
+        key = int(key)
+        name_b, text_b = name.encode("utf-8"), text.encode("utf-8")
+        record = RECORD.pack(MAGIC, code, len(name_b), key, len(text_b)) + name_b + text_b
+        with self._write_lock():
+            numbers = self.segments()
+            segment = numbers[-1] if numbers else 1
+            with open(self._segment_path(segment), "ab") as f:
+                offset = f.tell()
+            if offset and offset + len(record) > self.segment_size:
+                segment, offset = segment + 1, 0
+            with open(self._segment_path(segment), "ab") as f:
+                f.write(record)
+                f.flush()
+            self._write_slot(kind, key, segment, offset)
+        return segment, offset
+
+    def _read_record(self, segment, offset):
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return None
+            magic, code, name_len, key, text_len = RECORD.unpack(header)
+            if magic != MAGIC:
+                return None
+            body = f.read(name_len + text_len)
+        return ArchivedReceipt(_CODE_KINDS.get(code), key,
+                               body[:name_len].decode("utf-8"), body[name_len:].decode("utf-8"))
+
+    def get(self, kind, key):
+        """Latest ArchivedReceipt for (kind, key), or None."""
+        try:
+            key = int(key)
+        except (TypeError, ValueError):
+            return None
+        if key < 0 or kind not in _KIND_CODES:
+            return None
+        segment, offset = self._read_slot(kind, key)
+        if not segment:
+            return None
+        rec = self._read_record(segment, offset)
+        return rec if rec and rec.kind == kind and rec.key == key else None
+
+    def _scan(self):
+        """Yield (segment, offset, ArchivedReceipt) for every record, in write order."""
+        for segment in self.segments():
+            with open(self._segment_path(segment), "rb") as f:
+                offset = 0
+                while True:
+                    header = f.read(RECORD.size)
+                    if len(header) < RECORD.size:
+                        break
+                    magic, code, name_len, key, text_len = RECORD.unpack(header)
+                    if magic != MAGIC:
+                        break   # torn tail from an interrupted write
+                    body = f.read(name_len + text_len)
+                    if len(body) < name_len + text_len:
+                        break
+                    yield segment, offset, ArchivedReceipt(
+                        _CODE_KINDS.get(code), key,
+                        body[:name_len].decode("utf-8"), body[name_len:].decode("utf-8"))
+                    offset += RECORD.size + name_len + text_len
+
+    def __iter__(self):
+        """Every current (not superseded) receipt, in write order."""
+        for segment, offset, rec in self._scan():
+            if self._read_slot(rec.kind, rec.key) == (segment, offset):
+                yield rec
+
+    def rebuild_index(self):
+        """Recreate both index files from the segments. Returns the records indexed."""
+        with self._write_lock():
+            # _write_lock already holds self._lock
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            for kind in _KIND_CODES:
+                if os.path.exists(self._index_path(kind)):
+                    os.remove(self._index_path(kind))
+            count = 0
+            for segment, offset, rec in self._scan():
+                self._write_slot(rec.kind, rec.key, segment, offset)
+                count += 1
+        return count
+
+    def stats(self):
+        numbers = self.segments()
+        return {
+            "segments": len(numbers),
+            "bytes": sum(os.path.getsize(self._segment_path(n)) for n in numbers),
+            "receipts": sum(1 for _ in self),
+        }
+
+    def close(self):
+        with self._lock:
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+
+
+archive = ReceiptArchive()
+
+
+def archive_receipt(kind, key, name, text):
+    """Store a rendered receipt in the shared archive. Returns a printable location."""
+    segment, offset = archive.put(kind, key, name, text)
+    return f"{archive.root}/seg-{segment:06d}.dat @ {offset}"
+
+
+def fetch_archived_receipt(kind, key):
+    return archive.get(kind, key)
+
+
+# ---------- ingest the old one-file-per-receipt layout ----------
+_LOOSE_NAMES = [
+    (re.compile(r"^receipt_A(\d+)_P\d+(\.txt)?$"), KIND_APPOINTMENT),
+    (re.compile(r"^receipt_(\d+)(\.txt)?$"), KIND_PAYMENT),
+]
+
+
+def ingest_directory(src="receipts", delete=False, target=None):
+    """
+    Append every receipt_*.txt in `src` to the archive, oldest first (so the
+    newest copy of a key wins). Returns (ingested, skipped file names).
+    """
+    target = target or archive
+    files = []
+    for entry in os.scandir(src):
+        if not entry.is_file():
+            continue
+        for pattern, kind in _LOOSE_NAMES:
+            m = pattern.match(entry.name)
+            if m:
+                files.append((entry.stat().st_mtime, entry.path, entry.name, kind, int(m.group(1))))
+                break
+    files.sort()
+    ingested, skipped = 0, []
+    for _, path, name, kind, key in files:
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            skipped.append(name)
+            continue
+        target.put(kind, key, name, text)
+        ingested += 1
+        if delete:
+            os.remove(path)
+    return ingested, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Segmented receipt archive")
+    parser.add_argument("--root", default=ARCHIVE_DIR, help=f"archive folder (default: {ARCHIVE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="move loose receipt files into the archive")
+    p.add_argument("--src", default="receipts")
+    p.add_argument("--delete", action="store_true", help="remove each file once archived")
+    p = sub.add_parser("get", help="print one receipt")
+    p.add_argument("kind", choices=sorted(_KIND_CODES))
+    p.add_argument("key", type=int)
+    sub.add_parser("list", help="list current receipts")
+    sub.add_parser("stats", help="segment / receipt counts")
+    sub.add_parser("rebuild-index", help="recreate the index files from the segments")
+    args = parser.parse_args(argv)
+
+    store = ReceiptArchive(args.root)
+    if args.command == "ingest":
+        ingested, skipped = ingest_directory(args.src, args.delete, store)
+        print(f"✅ Archived {ingested} receipt files from {args.src}/")
+        for name in skipped:
+            print(f"⚠️ Skipped unreadable file: {name}")
+    elif args.command == "get":
+        rec = store.get(args.kind, args.key)
+        if not rec:
+            print("⚠️ Receipt not found in archive.")
+            return 1
+        print(rec.text)
+    elif args.command == "list":
+        for rec in store:
+            print(f"{rec.kind:<12} {rec.key:>10}  {rec.name}")
+    elif args.command == "stats":
+        s = store.stats()
+        print(f"Segments: {s['segments']} | Size: {s['bytes'] / 1024:.1f} KiB | Receipts: {s['receipts']}")
+    elif args.command == "rebuild-index":
+        print(f"✅ Indexed {store.rebuild_index()} records")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
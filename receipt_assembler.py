@@ -0,0 +1,69 @@
+# receipt_assembler.py
+"""
+Single-query receipt assembly.
+
+An appointment receipt needs the appointment, its patient, its doctor
+and the latest bill. fetch_receipts() reads all of that for a batch of
+A_IDs in one joined query per chunk. Only the needed columns are read,
+and the latest bill comes from a correlated subquery served by
+idx_billing_aid_paid. Rows come back as dicts ready for
+Utils.utils.build_receipt_text().
+"""
+
+# Appointment IDs per query (keeps the IN (...) list well under driver limits)
+RECEIPT_CHUNK = 500
+
+RECEIPT_FIELDS = [
+    "A_ID", "Appointment_Date", "Time_Slot", "Reason", "Status",
+    "P_ID", "Patient_Name", "Age", "Gender", "Phone_No", "Email", "Address",
+    "D_ID", "Doctor_Name", "Specialization", "Experience", "Fees",
+    "Amount",
+]
+
+RECEIPT_SELECT = """
+    SELECT a.A_ID, a.Appointment_Date, a.Time_Slot, a.Reason, a.Status,
+           p.P_ID, p.Name, p.Age, p.Gender, p.Phone_No, p.Email, p.Address,
+           d.D_ID, d.Name, d.Specialization, d.Experience, d.Fees,
+           b.Amount
+    FROM appointments a
+    JOIN patients p ON p.P_ID = a.P_ID
+    JOIN doctors d ON d.D_ID = a.D_ID
+    LEFT JOIN billing b ON b.Bill_ID = (
+        SELECT b2.Bill_ID FROM billing b2
+        WHERE b2.A_ID = a.A_ID
+        ORDER BY b2.Date_Paid DESC, b2.Bill_ID DESC LIMIT 1
+    )
+"""
+RECEIPT_SQL = RECEIPT_SELECT + " WHERE a.A_ID IN ({marks})"
+
+
+def receipt_from_row(row):
+    return dict(zip(RECEIPT_FIELDS, row))
+
+
+def fetch_receipts(cur, aids, chunk_size=RECEIPT_CHUNK):
+    """
+    {A_ID: receipt dict} for every appointment in `aids` that exists.
+    `cur` must be a plain (tuple) cursor; one query is issued per chunk.
+    """
+    aids = list(dict.fromkeys(int(a) for a in aids))
+    receipts = {}
+    for i in range(0, len(aids), chunk_size):
+        chunk = aids[i:i + chunk_size]
+        cur.execute(RECEIPT_SQL.format(marks=", ".join(["%s"] * len(chunk))), tuple(chunk))
+        for row in cur.fetchall():
+            receipts[row[0]] = receipt_from_row(row)
+    return receipts
+
+
+def fetch_receipt(cur, aid):
+    """Receipt dict for one appointment, or None."""
+    try:
+        aid = int(aid)
+    except (TypeError, ValueError):
+        return None
+    return fetch_receipts(cur, [aid]).get(aid)
+
+
+def receipt_filename(receipt):
+    return f"receipt_A{receipt['A_ID']}_P{receipt['P_ID']}.txt"
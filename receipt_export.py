@@ -0,0 +1,157 @@
+# receipt_export.py
+"""
+Bulk receipt regeneration / export for audits.
+
+Streams the joined receipt rows for a date range and/or doctor with
+fetchmany(), renders them in a thread pool and writes one file per
+receipt (at most `workers * 2` renders / writes in flight), or packs
+everything into a single .tar.gz / .zip archive.
+
+    python receipt_export.py --from 2025-01-01 --to 2025-03-31 --doctor 4 --archive q1_dr4.tar.gz
+"""
+import argparse
+import io
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from db_setup import db_cursor, ensure_database
+from receipt_assembler import RECEIPT_SELECT, receipt_filename, receipt_from_row
+from Utils.utils import build_receipt_text, save_receipt_text
+from Utils.validation import validate_date
+
+FETCH_BATCH = 500
+EXPORT_WORKERS = 4
+
+
+def _stream_receipts(date_from=None, date_to=None, doctor_id=None, batch=FETCH_BATCH):
+    """Yield receipt dicts in A_ID order without loading the whole result."""
+    where, params = [], []
+    if date_from:
+        where.append("a.Appointment_Date >= %s"); params.append(date_from)
+    if date_to:
+        where.append("a.Appointment_Date <= %s"); params.append(date_to)
+    if doctor_id:
+        where.append("a.D_ID = %s"); params.append(doctor_id)
+    q = RECEIPT_SELECT
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += " ORDER BY a.A_ID"
+    with db_cursor() as (conn, cur):
+        cur.execute(q, tuple(params))
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                break
+            for row in rows:
+                yield receipt_from_row(row)
+
+
+class _ArchiveWriter:
+    """Appends rendered receipts to a .tar.gz or .zip (single writer thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        if path.endswith((".tar.gz", ".tgz")):
+            self._tar = tarfile.open(path, "w:gz")
+            self._zip = None
+        elif path.endswith(".zip"):
+            self._tar = None
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            raise ValueError("archive must end in .tar.gz, .tgz or .zip")
+
+    def add(self, name, data):
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        (self._zip or self._tar).close()
+
+
+def export_receipts(date_from=None, date_to=None, doctor_id=None, out_dir="receipts",
+                    archive=None, workers=EXPORT_WORKERS, batch=FETCH_BATCH):
+    """
+    Regenerate every matching receipt. Files go to `out_dir`, or into
+    `archive` (.tar.gz / .zip) when given. Returns
+    {"receipts", "bytes", "seconds", "per_sec", "output"}.
+    """
+    writer = _ArchiveWriter(archive) if archive else None
+
+    def render(receipt):
+        name = receipt_filename(receipt)
+        text = build_receipt_text(receipt)
+        if writer is None:
+            save_receipt_text(name, text, out_dir)
+        return name, text.encode("utf-8")
+
+    count = size = 0
+    start = time.perf_counter()
+    pending = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def drain(limit):
+                nonlocal count, size
+                while len(pending) > limit:
+                    name, data = pending.popleft().result()
+                    if writer is not None:
+                        writer.add(name, data)
+                    count += 1
+                    size += len(data)
+
+            for receipt in _stream_receipts(date_from, date_to, doctor_id, batch):
+                pending.append(pool.submit(render, receipt))
+                drain(workers * 2)
+            drain(0)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "receipts": count,
+        "bytes": size,
+        "seconds": elapsed,
+        "per_sec": count / elapsed if elapsed else 0.0,
+        "output": archive or out_dir,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate appointment receipts in bulk")
+    parser.add_argument("--from", dest="date_from", help="first appointment date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="last appointment date (YYYY-MM-DD)")
+    parser.add_argument("--doctor", type=int, help="only this doctor's appointments (D_ID)")
+    parser.add_argument("--out", default="receipts", help="folder for receipt files (default: receipts)")
+    parser.add_argument("--archive", help="write a single .tar.gz / .zip instead of loose files")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS, help="render/write threads")
+    args = parser.parse_args(argv)
+
+    try:
+        date_from = validate_date(args.date_from) if args.date_from else None
+        date_to = validate_date(args.date_to) if args.date_to else None
+    except ValueError:
+        print("❌ Invalid date format. Use YYYY-MM-DD.")
+        return 1
+
+    ensure_database()
+    try:
+        result = export_receipts(date_from, date_to, args.doctor, args.out, args.archive, args.workers)
+    except Exception as e:
+        print("❌ Export failed:", e)
+        return 1
+    print(f"✅ Exported {result['receipts']} receipts ({result['bytes'] / 1024:.1f} KiB) "
+          f"to {result['output']} in {result['seconds']:.2f}s "
+          f"— {result['per_sec']:.0f} receipts/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,11 @@
 # receipt_ops.py
-from db_setup import get_connection
+from db_setup import db_cursor
 from tabulate import tabulate
 from datetime import datetime
+from receipt_archive import KIND_PAYMENT, archive_receipt
 
 def view_receipts(by_patient=None, by_doctor=None):
     """View all receipts, optionally filtered by patient or doctor."""
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-
     q = """SELECT r.Receipt_ID, r.A_ID, a.P_ID, p.Name AS Patient_Name,
                   d.Name AS Doctor_Name, r.Amount, r.Payment_Mode, r.Date_Paid
            FROM receipts r
@@ -22,8 +20,9 @@ def view_receipts(by_patient=None, by_doctor=None):
         q += " AND d.D_ID=%s"; params.append(by_doctor)
     q += " ORDER BY r.Date_Paid DESC"
 
-    cur.execute(q, tuple(params))
-    rows = cur.fetchall()
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, tuple(params))
+        rows = cur.fetchall()
 
     if not rows:
         print("⚠️ No receipts found.")
@@ -31,41 +30,33 @@ def view_receipts(by_patient=None, by_doctor=None):
         print("\n--- RECEIPT RECORDS ---")
         print(tabulate(rows, headers="keys", tablefmt="grid"))
 
-    cur.close(); conn.close()
-
 
 def delete_receipt():
     """Delete a specific receipt record."""
-    conn = get_connection(); cur = conn.cursor()
-    cur.execute("USE hospital")
-
     rid = input("Enter Receipt ID to delete: ").strip()
-    cur.execute("SELECT * FROM receipts WHERE Receipt_ID=%s", (rid,))
-    if not cur.fetchone():
-        print("⚠️ Receipt not found.")
-    else:
-        cur.execute("DELETE FROM receipts WHERE Receipt_ID=%s", (rid,))
-        conn.commit()
-        print("✅ Receipt deleted successfully.")
-
-    cur.close(); conn.close()
+    with db_cursor() as (conn, cur):
+        cur.execute("SELECT * FROM receipts WHERE Receipt_ID=%s", (rid,))
+        if not cur.fetchone():
+            print("⚠️ Receipt not found.")
+        else:
+            cur.execute("DELETE FROM receipts WHERE Receipt_ID=%s", (rid,))
+            conn.commit()
+            print("✅ Receipt deleted successfully.")
 
 
 def print_receipt():
     """Print or re-generate a saved receipt by Receipt ID."""
-    conn = get_connection(); cur = conn.cursor(dictionary=True)
-    cur.execute("USE hospital")
-
     rid = input("Enter Receipt ID: ").strip()
-    cur.execute("""
-        SELECT r.*, a.P_ID, p.Name AS Patient_Name, d.Name AS Doctor_Name
-        FROM receipts r
-        JOIN appointments a ON r.A_ID = a.A_ID
-        JOIN patients p ON a.P_ID = p.P_ID
-        JOIN doctors d ON a.D_ID = d.D_ID
-        WHERE r.Receipt_ID=%s
-    """, (rid,))
-    row = cur.fetchone()
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute("""
+            SELECT r.*, a.P_ID, p.Name AS Patient_Name, d.Name AS Doctor_Name
+            FROM receipts r
+            JOIN appointments a ON r.A_ID = a.A_ID
+            JOIN patients p ON a.P_ID = p.P_ID
+            JOIN doctors d ON a.D_ID = d.D_ID
+            WHERE r.Receipt_ID=%s
+        """, (rid,))
+        row = cur.fetchone()
 
     if not row:
         print("⚠️ No receipt found.")
@@ -88,11 +79,8 @@ def print_receipt():
         print(text)
 
         fname = f"receipt_{row['Receipt_ID']}.txt"
-        with open(fname, "w") as f:
-            f.write(text)
-        print(f"🧾 Receipt saved as: {fname}")
-
-    cur.close(); conn.close()
+        location = archive_receipt(KIND_PAYMENT, row['Receipt_ID'], fname, text)
+        print(f"🧾 Receipt archived at: {location}")
 
 
 def receipt_menu():
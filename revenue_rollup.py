@@ -0,0 +1,129 @@
+# revenue_rollup.py
+"""
+Daily revenue rollups.
+
+revenue_daily keeps one row per (day, payment mode, doctor) with the number
+of payments and their total. Every payment insert (billing or receipts)
+calls record_revenue() in the same transaction, so revenue reports only
+read a few rows per day through the primary key and never scan billing or
+receipts. D_ID is 0 for payments that are not tied to an appointment.
+Payments insert an explicit Date_Paid from paid_now() and pass the same
+day to record_revenue(), so a rollup row can never land on a different
+day from the payment it counts (midnight, app / database time zones).
+rebuild_revenue() recounts a date range from the payment tables.
+
+All ranges are half-open: start <= day < end.
+"""
+from datetime import datetime, time
+
+from db_setup import db_cursor, insert_ignore_sql
+
+NO_DOCTOR = 0
+
+# group_by name -> (SELECT / GROUP BY expression, ORDER BY)
+GROUPINGS = {
+    "day": ("rv.Rev_Date", "rv.Rev_Date"),
+    "mode": ("rv.Payment_Mode", "rv.Payment_Mode"),
+    "doctor": ("rv.D_ID", "SUM(rv.Amount) DESC, rv.D_ID"),
+}
+
+
+def day_bounds(start, end):
+    """Half-open DATETIME bounds covering the days start <= day < end."""
+    return datetime.combine(start, time.min), datetime.combine(end, time.min)
+
+
+def paid_now():
+    """(Date_Paid value to insert, its day) for a payment made now."""
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d %H:%M:%S"), now.date()
+
+
+def record_revenue(cur, amount, mode, did, day):
+    """Add one payment, paid on `day`, to the rollup (inside the payment's transaction)."""
+    did = did or NO_DOCTOR
+    cur.execute(insert_ignore_sql("revenue_daily", ["Rev_Date", "Payment_Mode", "D_ID", "Payments", "Amount"]),
+                (day, mode, did, 0, 0))
+    cur.execute("""
+        UPDATE revenue_daily SET Payments = Payments + 1, Amount = Amount + %s
+        WHERE Rev_Date = %s AND Payment_Mode = %s AND D_ID = %s
+    """, (amount, day, mode, did))
+
+
+def rebuild_revenue(cur, start=None, end=None):
+    """
+    Recount the rollup from billing and receipts, for start <= day < end
+    (everything when no range is given). Returns the number of rollup rows.
+    """
+    where, params = "", ()
+    if start and end:
+        where, params = "WHERE x.Date_Paid >= %s AND x.Date_Paid < %s", day_bounds(start, end)
+        cur.execute("DELETE FROM revenue_daily WHERE Rev_Date >= %s AND Rev_Date < %s", (start, end))
+    else:
+        cur.execute("DELETE FROM revenue_daily")
+    totals = {}
+    for table in ("billing", "receipts"):
+        cur.execute(f"""
+            SELECT DATE(x.Date_Paid), x.Payment_Mode, COALESCE(a.D_ID, {NO_DOCTOR}), COUNT(*), SUM(x.Amount)
+            FROM {table} x
+            LEFT JOIN appointments a ON x.A_ID = a.A_ID
+            {where}
+            GROUP BY DATE(x.Date_Paid), x.Payment_Mode, COALESCE(a.D_ID, {NO_DOCTOR})
+        """, params)
+        for day, mode, did, n, amount in cur.fetchall():
+            if day is None or mode is None:
+                continue
+            row = totals.setdefault((day, mode, did), [0, 0])
+            row[0] += n
+            row[1] += amount or 0
+    if totals:
+        cur.executemany("""
+            INSERT INTO revenue_daily (Rev_Date, Payment_Mode, D_ID, Payments, Amount)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(day, mode, did, n, amount) for (day, mode, did), (n, amount) in totals.items()])
+    return len(totals)
+
+
+# ---------- reporting ----------
+def _query(sql, params, cur):
+    if cur is not None:
+        cur.execute(sql, params)
+        return cur.fetchall()
+    with db_cursor() as (conn, c):
+        c.execute(sql, params)
+        return c.fetchall()
+
+
+def revenue_totals(start, end, group_by="day", cur=None):
+    """
+    [(key, payments, amount)] for start <= day < end, grouped by "day",
+    "mode" or "doctor" (key is the D_ID; see doctor_names()).
+    """
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUPINGS)}")
+    key, order = GROUPINGS[group_by]
+    return _query(f"""
+        SELECT {key}, SUM(rv.Payments), SUM(rv.Amount)
+        FROM revenue_daily rv
+        WHERE rv.Rev_Date >= %s AND rv.Rev_Date < %s
+        GROUP BY {key}
+        ORDER BY {order}
+    """, (start, end), cur)
+
+
+def revenue_total(start, end, cur=None):
+    """(payments, amount) for start <= day < end."""
+    rows = _query("""
+        SELECT COALESCE(SUM(Payments), 0), COALESCE(SUM(Amount), 0)
+        FROM revenue_daily WHERE Rev_Date >= %s AND Rev_Date < %s
+    """, (start, end), cur)
+    return rows[0]
+
+
+def doctor_names(dids, cur=None):
+    """{D_ID: Name} for the doctors in a 'doctor' report."""
+    dids = sorted({d for d in dids if d != NO_DOCTOR})
+    if not dids:
+        return {}
+    return dict(_query(f"SELECT D_ID, Name FROM doctors WHERE D_ID IN ({', '.join(['%s'] * len(dids))})",
+                       tuple(dids), cur))
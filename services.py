@@ -0,0 +1,461 @@
+# services.py
+"""
+Service layer: the hospital's business operations without any terminal I/O.
+
+Each function takes plain values, does its own validation and database
+work, and returns dicts / lists of dicts (JSON-ready apart from dates and
+Decimals). Problems are raised as ServiceError subclasses that carry an
+HTTP status. The terminal menus and api_server are both thin clients of
+this module.
+"""
+from datetime import date, datetime
+
+from bed_allocator import allocator
+from cert_import import INSERT_SQL as CERT_INSERT_SQL, validate_row
+from cert_ops import save_certificate_text
+from db_setup import db_cursor
+from doctor_cache import all_doctors, get_doctor
+from patient_cache import invalidate_patient, resolve_patient
+from patient_search import index_patient
+from receipt_archive import KIND_APPOINTMENT, archive_receipt
+from receipt_assembler import fetch_receipt, receipt_filename
+from revenue_rollup import paid_now, record_revenue
+from slot_inventory import DEFAULT_SLOT_CAPACITY, SlotUnavailable, insert_booking, retry_transaction, slot_occupancy
+from Utils.utils import build_receipt_text
+from Utils.validation import validate_date
+from ward_census import record_admission, record_discharge
+
+GENDERS = ("Male", "Female", "Other")
+PAYMENT_MODES = {"cash": "Cash", "card": "Card", "upi": "UPI"}
+
+
+class ServiceError(Exception):
+    """A request that cannot be carried out; `status` is the matching HTTP code."""
+    status = 400
+
+
+class NotFound(ServiceError):
+    status = 404
+
+
+class Conflict(ServiceError):
+    status = 409
+
+
+def _is_integrity_error(exc):
+    # mysql.connector and sqlite3 both name it IntegrityError
+    return type(exc).__name__ == "IntegrityError"
+
+
+def _as_int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{field} must be a number")
+
+
+def _as_date(value, field):
+    if isinstance(value, date):
+        return value
+    try:
+        return validate_date(str(value or "").strip())
+    except ValueError:
+        raise ServiceError(f"{field} must be YYYY-MM-DD")
+
+
+def _payment_mode(mode):
+    normalized = PAYMENT_MODES.get(str(mode or "").strip().lower())
+    if not normalized:
+        raise ServiceError("payment mode must be Cash, Card or UPI")
+    return normalized
+
+
+# ---------- PATIENTS ----------
+PATIENT_INSERT_SQL = """
+    INSERT INTO patients (Name, Age, Gender, Phone_No, Email, Address)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+def patient_fields(name, age, gender, phone=None, email=None, address=""):
+    """Validated (Name, Age, Gender, Phone_No, Email, Address) for PATIENT_INSERT_SQL."""
+    name = (name or "").strip()
+    if not name:
+        raise ServiceError("name is required")
+    age = _as_int(age, "age")
+    if age <= 0:
+        raise ServiceError("age must be positive")
+    gender = (gender or "").strip().capitalize()
+    if gender not in GENDERS:
+        raise ServiceError("gender must be Male, Female or Other")
+    phone = (phone or "").strip() or None
+    email = (email or "").strip() or None
+    return name, age, gender, phone, email, (address or "").strip()
+
+
+def register_patient(name, age, gender, phone=None, email=None, address=""):
+    """Register a patient. Returns {"P_ID", "Name"}."""
+    fields = patient_fields(name, age, gender, phone, email, address)
+    name, phone = fields[0], fields[3]
+    try:
+        with db_cursor() as (conn, cur):
+            cur.execute(PATIENT_INSERT_SQL, fields)
+            pid = cur.lastrowid
+            index_patient(cur, pid, name)
+            conn.commit()
+    except Exception as e:
+        if _is_integrity_error(e):
+            raise Conflict("a patient with this phone number or email already exists")
+        raise
+    # drop any cached "no such phone" answer
+    invalidate_patient(pid, phone)
+    return {"P_ID": pid, "Name": name}
+
+
+def find_patient(pid=None, phone=None, cur=None):
+    """{"P_ID", "Name", "Phone_No"} by P_ID or phone (patient resolver cache)."""
+    if not pid and not phone:
+        raise ServiceError("give a patient ID or phone number")
+    if pid:
+        pid = _as_int(pid, "P_ID")
+    p = resolve_patient(pid=pid, phone=phone, cur=cur) if pid else resolve_patient(phone=phone, cur=cur)
+    if not p:
+        raise NotFound("no patient with that ID" if pid else "no patient with that phone number")
+    return p
+
+
+def list_appointments(pid=None, phone=None):
+    """One patient's appointments in date / slot order."""
+    pid = find_patient(pid, phone)["P_ID"]
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute("""
+            SELECT a.A_ID, p.Name AS Patient, d.Name AS Doctor, d.Specialization,
+                   a.Appointment_Date, a.Time_Slot, a.Reason, a.Status
+            FROM appointments a
+            JOIN patients p ON a.P_ID = p.P_ID
+            JOIN doctors d ON a.D_ID = d.D_ID
+            WHERE a.P_ID = %s
+            ORDER BY a.Appointment_Date, a.Slot_Start, a.A_ID
+        """, (pid,))
+        return cur.fetchall()
+
+
+PATIENT_LIST_SQL = "SELECT P_ID, Name, Age, Gender, Phone_No, Email, Address, Date_Registered FROM patients"
+
+
+def patients_page(after=None, before=None, limit=20):
+    """One page of patients in P_ID order, after / before a P_ID (keyset pagination)."""
+    if before is not None:
+        q, key = PATIENT_LIST_SQL + " WHERE P_ID < %s ORDER BY P_ID DESC LIMIT %s", before
+    else:
+        q, key = PATIENT_LIST_SQL + " WHERE P_ID > %s ORDER BY P_ID LIMIT %s", after or 0
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, (_as_int(key, "P_ID"), _as_int(limit, "limit")))
+        rows = cur.fetchall()
+    return rows[::-1] if before is not None else rows
+
+
+APPOINTMENT_LIST_SQL = """
+    SELECT a.A_ID, p.Name AS Patient, d.Name AS Doctor, d.Specialization,
+           a.Appointment_Date, a.Time_Slot, a.Reason, a.Status, a.Slot_Start
+    FROM appointments a
+    JOIN patients p ON a.P_ID = p.P_ID
+    JOIN doctors d ON a.D_ID = d.D_ID
+"""
+
+
+def appointment_key(row):
+    """Keyset key of an appointments_page() row: (Appointment_Date, Slot_Start, A_ID)."""
+    return (row["Appointment_Date"], row["Slot_Start"], row["A_ID"])
+
+
+def appointments_page(filters, after=None, before=None, limit=20):
+    """
+    One page of appointments in (date, slot start, A_ID) order.
+    `filters` may hold doctor_id, status, date_from and date_to (inclusive).
+    `after` / `before` are keys as returned by appointment_key().
+    """
+    where, params = [], []
+    if filters.get("doctor_id"):
+        where.append("a.D_ID = %s"); params.append(_as_int(filters["doctor_id"], "doctor ID"))
+    if filters.get("status"):
+        where.append("a.Status = %s"); params.append(filters["status"])
+    if filters.get("date_from"):
+        where.append("a.Appointment_Date >= %s"); params.append(_as_date(filters["date_from"], "date_from"))
+    if filters.get("date_to"):
+        where.append("a.Appointment_Date <= %s"); params.append(_as_date(filters["date_to"], "date_to"))
+    order = "ASC"
+    if after is not None:
+        where.append("(a.Appointment_Date, a.Slot_Start, a.A_ID) > (%s, %s, %s)"); params.extend(after)
+    elif before is not None:
+        where.append("(a.Appointment_Date, a.Slot_Start, a.A_ID) < (%s, %s, %s)"); params.extend(before)
+        order = "DESC"
+    q = APPOINTMENT_LIST_SQL
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += f" ORDER BY a.Appointment_Date {order}, a.Slot_Start {order}, a.A_ID {order} LIMIT %s"
+    params.append(_as_int(limit, "limit"))
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, tuple(params))
+        rows = cur.fetchall()
+    return rows[::-1] if before is not None else rows
+
+
+# ---------- DOCTORS & BOOKING ----------
+def list_doctors():
+    """Every doctor with Fees and parsed Availability (doctor directory cache)."""
+    return all_doctors()
+
+
+def _doctor(did):
+    doctor = get_doctor(_as_int(did, "D_ID"))
+    if not doctor:
+        raise NotFound("doctor not found")
+    return doctor
+
+
+def _check_day(doctor, day):
+    if day < date.today():
+        raise ServiceError("date cannot be in the past")
+    day_name = day.strftime("%A")
+    availability = doctor["Availability"] or {}
+    if day_name not in availability:
+        raise ServiceError(f"the doctor is not available on {day_name}"
+                           + (f" (available: {', '.join(availability)})" if availability else ""))
+    return availability[day_name]
+
+
+def doctor_slots(did, day):
+    """[{"Time_Slot", "Booked", "Capacity", "Full"}] for one doctor and day."""
+    doctor = _doctor(did)
+    day = _as_date(day, "date")
+    slots = _check_day(doctor, day)
+    with db_cursor() as (conn, cur):
+        occupancy = slot_occupancy(cur, doctor["D_ID"], day)
+    result = []
+    for slot in slots:
+        booked, capacity = occupancy.get(slot, (0, DEFAULT_SLOT_CAPACITY))
+        result.append({"Time_Slot": slot, "Booked": booked, "Capacity": capacity, "Full": booked >= capacity})
+    return result
+
+
+def booking_fields(did, day, time_slot, payment_mode=None):
+    """Validated (doctor, day, time_slot, payment mode or None) for a booking."""
+    doctor = _doctor(did)
+    day = _as_date(day, "date")
+    if time_slot not in _check_day(doctor, day):
+        raise ServiceError(f"{time_slot} is not one of the doctor's slots on that day")
+    mode = _payment_mode(payment_mode) if payment_mode else None
+    return doctor, day, time_slot, mode
+
+
+def _pay_fee(cur, aid, doctor, mode):
+    paid = float(doctor["Fees"]) if doctor["Fees"] is not None else 0.0
+    paid_at, day = paid_now()
+    cur.execute("INSERT INTO billing (A_ID, Amount, Payment_Mode, Date_Paid) VALUES (%s, %s, %s, %s)",
+                (aid, paid, mode, paid_at))
+    record_revenue(cur, paid, mode, doctor["D_ID"], day)
+    return paid
+
+
+def book(cur, pid, doctor, day, time_slot, reason="", mode=None):
+    """
+    Reserve the slot, insert the appointment and pay the fee (if `mode`)
+    in the caller's transaction. Returns (A_ID, amount paid or None).
+    Raises Conflict if the slot is full. The caller commits.
+    """
+    try:
+        aid = insert_booking(cur, pid, doctor["D_ID"], day, time_slot, (reason or "").strip())
+    except SlotUnavailable:
+        raise Conflict(f"{time_slot} on {day} is fully booked")
+    return aid, _pay_fee(cur, aid, doctor, mode) if mode else None
+
+
+def book_appointment(did, day, time_slot, reason="", pid=None, phone=None, payment_mode=None):
+    """
+    Book a slot for the patient (by P_ID or phone) and optionally pay the
+    consultation fee. Returns {"A_ID", "P_ID", "D_ID", "Appointment_Date",
+    "Time_Slot", "Amount_Paid"}.
+    """
+    doctor, day, time_slot, mode = booking_fields(did, day, time_slot, payment_mode)
+    with db_cursor() as (conn, cur):
+        pid = find_patient(pid, phone, cur)["P_ID"]
+        # reserve slot + insert appointment + pay the fee in one transaction
+        aid, paid = retry_transaction(conn, lambda c: book(c, pid, doctor, day, time_slot, reason, mode))
+    return {"A_ID": aid, "P_ID": pid, "D_ID": doctor["D_ID"], "Appointment_Date": day,
+            "Time_Slot": time_slot, "Amount_Paid": paid}
+
+
+def appointment_receipt(aid, archive=True):
+    """Rendered receipt text for an appointment; archived unless archive=False."""
+    aid = _as_int(aid, "A_ID")
+    with db_cursor() as (conn, cur):
+        receipt = fetch_receipt(cur, aid)
+    if not receipt:
+        raise NotFound("no appointment with that ID")
+    text = build_receipt_text(receipt)
+    location = archive_receipt(KIND_APPOINTMENT, receipt["A_ID"], receipt_filename(receipt), text) \
+        if archive else None
+    return {"A_ID": receipt["A_ID"], "text": text, "location": location}
+
+
+# ---------- PAYMENTS ----------
+RECEIPT_INSERT_SQL = """
+    INSERT INTO receipts (A_ID, P_ID, Bill_No, Amount, Payment_Mode, Notes, Date_Paid)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def payment_fields(pid, amount, payment_mode, aid=None, notes=""):
+    """Validated (A_ID, P_ID, Amount, Payment_Mode, Notes) for a receipt."""
+    pid = _as_int(pid, "patient ID")
+    aid = _as_int(aid, "appointment ID") if aid not in (None, "") else None
+    try:
+        amount = round(float(amount), 2)
+    except (TypeError, ValueError):
+        raise ServiceError("amount must be a number")
+    if amount <= 0:
+        raise ServiceError("amount must be positive")
+    return aid, pid, amount, _payment_mode(payment_mode), (notes or "").strip()
+
+
+# ---------- ADMISSIONS ----------
+def admit(cur, pid, dept, notes=""):
+    """
+    Claim a bed and record the admission in the caller's transaction.
+    Returns (Admission_ID, Bed_ID), or None if the department is full.
+    The caller commits; on rollback it must call allocator.cancel(bed_id).
+    """
+    bed_id = allocator.claim(cur, dept, pid)
+    if bed_id is None:
+        return None
+    cur.execute("INSERT INTO admissions (P_ID, Bed_ID, Department, Notes) VALUES (%s,%s,%s,%s)",
+                (pid, bed_id, dept, notes))
+    admission_id = cur.lastrowid
+    record_admission(cur, dept)
+    return admission_id, bed_id
+
+
+def discharge(cur, admission_id, bed_id, dept, notes=""):
+    """
+    Discharge an active admission and free its bed in the caller's transaction.
+    Returns False if it was already discharged. After commit call allocator.mark_free(bed_id).
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cur.execute("""
+        UPDATE admissions
+        SET Status='Discharged', Discharge_Date=%s,
+            Notes=CONCAT(IFNULL(Notes,''),' | Discharge: ',%s)
+        WHERE Admission_ID=%s AND Status='Admitted'
+    """, (now, notes, admission_id))
+    if cur.rowcount != 1:
+        return False
+    allocator.release(cur, bed_id)
+    record_discharge(cur, dept)
+    return True
+
+
+def bed_counts():
+    """{department: {"Free", "Total"}} from the allocator bitmaps."""
+    return {dept: {"Free": free, "Total": total} for dept, (free, total) in sorted(allocator.counts().items())}
+
+
+def admit_patient(pid, department, notes=""):
+    """Admit a patient to a free bed. Returns {"Admission_ID", "Bed_ID", "Department", "P_ID"}."""
+    dept = allocator.department(department)
+    if not dept:
+        raise NotFound(f"unknown department '{department}'")
+    bed_id = None
+    try:
+        with db_cursor() as (conn, cur):
+            pid = find_patient(pid=pid, cur=cur)["P_ID"]
+            result = admit(cur, pid, dept, (notes or "").strip())
+            if result is None:
+                conn.rollback()
+                raise Conflict(f"no free beds available in {dept}")
+            admission_id, bed_id = result
+            conn.commit()
+    except Exception:
+        if bed_id is not None:
+            allocator.cancel(bed_id)
+        raise
+    return {"Admission_ID": admission_id, "Bed_ID": bed_id, "Department": dept, "P_ID": pid}
+
+
+def active_admission(admission_id):
+    admission_id = _as_int(admission_id, "Admission_ID")
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute("SELECT * FROM admissions WHERE Admission_ID=%s AND Status='Admitted'", (admission_id,))
+        adm = cur.fetchone()
+    if not adm:
+        raise NotFound("no active admission with that ID")
+    return adm
+
+
+def discharge_patient(admission_id, notes="", admission=None):
+    """
+    Discharge an active admission and free its bed. `admission` is the
+    active_admission() record if the caller already has it.
+    Returns {"Admission_ID", "Bed_ID", "Department"}.
+    """
+    adm = admission or active_admission(admission_id)
+    with db_cursor() as (conn, cur):
+        if not discharge(cur, adm["Admission_ID"], adm["Bed_ID"], adm["Department"], (notes or "").strip()):
+            conn.rollback()
+            raise Conflict("admission was already discharged")
+        conn.commit()
+    allocator.mark_free(adm["Bed_ID"])
+    return {"Admission_ID": adm["Admission_ID"], "Bed_ID": adm["Bed_ID"], "Department": adm["Department"]}
+
+
+def list_admissions(active_only=True):
+    q = """
+        SELECT a.Admission_ID, a.P_ID, p.Name AS Patient, a.Department,
+               b.Bed_No, a.Admit_Date, a.Discharge_Date, a.Status
+        FROM admissions a
+        JOIN patients p ON a.P_ID = p.P_ID
+        JOIN beds b ON a.Bed_ID = b.Bed_ID
+    """
+    q += " WHERE a.Status='Admitted' ORDER BY a.Admit_Date" if active_only else " ORDER BY a.Admit_Date DESC"
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q)
+        return cur.fetchall()
+
+
+# ---------- CERTIFICATES ----------
+def create_certificate(fields):
+    """
+    Issue a birth / death certificate from a dict with the cert_import CSV
+    fields (Type, Name, P_ID, DOB, DOD, Parent_Guardian, Place_Of_Event,
+    Notes). Returns the certificate record plus "File".
+    """
+    try:
+        cert = validate_row({k: "" if v is None else str(v) for k, v in fields.items()})
+    except ValueError as e:
+        raise ServiceError(str(e))
+    cert["Date_Issued"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with db_cursor() as (conn, cur):
+        if cert["P_ID"] is not None:
+            cur.execute("SELECT 1 FROM patients WHERE P_ID=%s", (cert["P_ID"],))
+            if not cur.fetchone():
+                raise NotFound(f"no patient with P_ID {cert['P_ID']}")
+        cur.execute(CERT_INSERT_SQL, (cert["P_ID"], cert["Type"], cert["Name"], cert["DOB"], cert["DOD"],
+                                      cert["Parent_Guardian"], cert["Place_Of_Event"], cert["Notes"],
+                                      cert["Date_Issued"]))
+        cert["Certificate_ID"] = cur.lastrowid
+        conn.commit()
+    cert["File"] = save_certificate_text(cert)
+    return cert
+
+
+def list_certificates(cert_type=None, pid=None):
+    q = "SELECT * FROM certificates WHERE 1=1"
+    params = []
+    if cert_type:
+        q += " AND Type=%s"; params.append(str(cert_type).capitalize())
+    if pid:
+        q += " AND P_ID=%s"; params.append(_as_int(pid, "P_ID"))
+    q += " ORDER BY Date_Issued DESC"
+    with db_cursor(dictionary=True) as (conn, cur):
+        cur.execute(q, tuple(params))
+        return cur.fetchall()
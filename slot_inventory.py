@@ -0,0 +1,110 @@
+# slot_inventory.py
+"""
+Materialized appointment slot inventory.
+
+One slot_inventory row per (D_ID, Slot_Date, Time_Slot) holds the slot's
+Capacity and how many places are Booked. A reservation is a single
+conditional UPDATE (`Booked < Capacity`) run in the same transaction as
+the appointment INSERT, so two clerks can never both take the last place.
+"""
+import random
+import time
+
+from db_setup import insert_ignore_sql, is_retryable_error
+from Utils.validation import slot_start_minutes
+
+# Patients per doctor per slot unless a row says otherwise
+DEFAULT_SLOT_CAPACITY = 1
+MAX_RETRIES = 5
+
+
+class SlotUnavailable(Exception):
+    """Raised when the requested slot has no free capacity."""
+
+
+def _materialize(cur, did, slot_date, time_slot, capacity):
+    cur.execute(
+        insert_ignore_sql("slot_inventory", ["D_ID", "Slot_Date", "Time_Slot", "Capacity", "Booked"]),
+        (did, slot_date, time_slot, capacity, 0)
+    )
+
+
+def reserve_slot(cur, did, slot_date, time_slot, capacity=DEFAULT_SLOT_CAPACITY):
+    """
+    Take one place in the slot inside the caller's transaction.
+    Returns True if reserved, False if the slot is full.
+    """
+    _materialize(cur, did, slot_date, time_slot, capacity)
+    cur.execute("""
+        UPDATE slot_inventory SET Booked = Booked + 1
+        WHERE D_ID = %s AND Slot_Date = %s AND Time_Slot = %s AND Booked < Capacity
+    """, (did, slot_date, time_slot))
+    return cur.rowcount == 1
+
+
+def release_slot(cur, did, slot_date, time_slot):
+    """Give back one place (cancelled / deleted / moved appointment)."""
+    cur.execute("""
+        UPDATE slot_inventory SET Booked = Booked - 1
+        WHERE D_ID = %s AND Slot_Date = %s AND Time_Slot = %s AND Booked > 0
+    """, (did, slot_date, time_slot))
+
+
+def slot_occupancy(cur, did, slot_date):
+    """{Time_Slot: (Booked, Capacity)} for one doctor and day (primary-key range read)."""
+    cur.execute("""
+        SELECT Time_Slot, Booked, Capacity FROM slot_inventory
+        WHERE D_ID = %s AND Slot_Date = %s
+    """, (did, slot_date))
+    return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+
+def insert_booking(cur, pid, did, slot_date, time_slot, reason, capacity=DEFAULT_SLOT_CAPACITY):
+    """
+    Reserve the slot and insert the appointment inside the caller's
+    transaction. Returns the new A_ID; raises SlotUnavailable when the
+    slot is full. The caller commits or rolls back.
+    """
+    if not reserve_slot(cur, did, slot_date, time_slot, capacity):
+        raise SlotUnavailable(f"{time_slot} on {slot_date} is fully booked")
+    cur.execute("""
+        INSERT INTO appointments (P_ID, D_ID, Appointment_Date, Time_Slot, Slot_Start, Reason)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (pid, did, slot_date, time_slot, slot_start_minutes(time_slot), reason))
+    return cur.lastrowid
+
+
+def retry_transaction(conn, work, stats=None):
+    """
+    Run work(cur) in one transaction and commit, retrying the whole
+    transaction on deadlocks / lock timeouts. Returns work's result; any
+    other error rolls back and propagates.
+    `stats`, if given, counts "retries".
+    """
+    for attempt in range(MAX_RETRIES):
+        cur = conn.cursor()
+        try:
+            result = work(cur)
+            conn.commit()
+            return result
+        except Exception as e:
+            conn.rollback()
+            if not is_retryable_error(e) or attempt == MAX_RETRIES - 1:
+                raise
+            if stats is not None:
+                stats["retries"] = stats.get("retries", 0) + 1
+            time.sleep(random.uniform(0.005, 0.02) * (attempt + 1))
+        finally:
+            cur.close()
+
+
+def book_slot(conn, pid, did, slot_date, time_slot, reason,
+              capacity=DEFAULT_SLOT_CAPACITY, stats=None):
+    """
+    Reserve the slot and insert the appointment atomically, retrying on
+    deadlocks / lock timeouts. Returns the new A_ID.
+    Raises SlotUnavailable when the slot is full.
+    `stats`, if given, counts "retries".
+    """
+    return retry_transaction(
+        conn, lambda cur: insert_booking(cur, pid, did, slot_date, time_slot, reason, capacity), stats)
@@ -0,0 +1,33 @@
+# tests/test_db_sqlite.py
+import sqlite3
+
+import pytest
+
+from db_sqlite import translate
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t WHERE a = %s", "SELECT * FROM t WHERE a = ?"),
+    ("INSERT INTO t (a, b) VALUES (%s, %s)", "INSERT INTO t (a, b) VALUES (?, ?)"),
+    ("SELECT 1", "SELECT 1"),
+])
+def test_translate_placeholders(sql, expected):
+    assert translate(sql) == expected
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t WHERE b = '%s' AND a = %s", "SELECT * FROM t WHERE b = '%s' AND a = ?"),
+    ('SELECT "%s" FROM t WHERE a = %s', 'SELECT "%s" FROM t WHERE a = ?'),
+    ("SELECT * FROM t WHERE d LIKE 'it''s %s' AND e = %s", "SELECT * FROM t WHERE d LIKE 'it''s %s' AND e = ?"),
+])
+def test_translate_leaves_quoted_text_alone(sql, expected):
+    assert translate(sql) == expected
+
+
+def test_translate_runs_on_sqlite():
+    conn = sqlite3.connect(":memory:")
+    try:
+        row = conn.execute(translate("SELECT %s || '%s', %s + 1"), ("a", 41)).fetchone()
+    finally:
+        conn.close()
+    assert row == ("a%s", 42)
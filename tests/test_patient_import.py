@@ -0,0 +1,54 @@
+# tests/test_patient_import.py
+import pytest
+
+from patient_import import normalize_phone, validate_row
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("9845012345", "9845012345"),
+    ("+91 98450-12345", "9845012345"),
+    ("0091 9845012345", "9845012345"),
+    ("09845012345", "9845012345"),
+    ("+44 20 7946 0958", "+442079460958"),
+    ("", None),
+    ("   ", None),
+    (None, None),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["abc", "12345", "98450x12345", "+91 98450 12345 678"])
+def test_normalize_phone_rejects_non_numbers(raw):
+    with pytest.raises(ValueError):
+        normalize_phone(raw)
+
+
+def test_validate_row_normalizes_every_field():
+    row = {"Name": "  Asha   Rao ", "Age": "34", "Gender": "f", "Phone No": "+91 98450 12345",
+           "Email": " Asha@Example.COM ", "Address": "12 MG Road"}
+    assert validate_row(row) == ("Asha Rao", 34, "Female", "9845012345", "asha@example.com", "12 MG Road")
+
+
+def test_validate_row_optional_fields_blank():
+    row = {"name": "Ravi", "age": "", "gender": "", "phone_no": "", "email": ""}
+    assert validate_row(row) == ("Ravi", None, None, None, None, "")
+
+
+@pytest.mark.parametrize("field, value", [
+    ("Name", ""),
+    ("Name", "x" * 51),
+    ("Age", "0"),
+    ("Age", "150"),
+    ("Age", "thirty"),
+    ("Gender", "unknown"),
+    ("Phone_No", "12-34"),
+    ("Email", "not-an-email"),
+    ("Address", "x" * 101),
+])
+def test_validate_row_rejects(field, value):
+    row = {"Name": "Asha Rao", "Age": "34", "Gender": "Female", "Phone_No": "9845012345",
+           "Email": "asha@example.com", "Address": ""}
+    row[field] = value
+    with pytest.raises(ValueError):
+        validate_row(row)
@@ -0,0 +1,26 @@
+# tests/test_patient_search.py
+from patient_search import name_trigrams
+
+
+def test_name_trigrams_pads_each_word():
+    assert name_trigrams("Ana") == {"^^a", "^an", "ana", "na$"}
+
+
+def test_name_trigrams_is_case_and_punctuation_insensitive():
+    assert name_trigrams("O'Brien") == name_trigrams("o brien")
+    assert name_trigrams("ANA") == name_trigrams("ana")
+
+
+def test_name_trigrams_merges_repeated_words():
+    assert name_trigrams("Li li") == {"^^l", "^li", "li$"}
+
+
+def test_name_trigrams_keeps_accents():
+    # accented and plain spellings must stay distinct trigrams (see migration 13)
+    assert "ené" in name_trigrams("Renée")
+    assert "ené" not in name_trigrams("Renee")
+
+
+def test_name_trigrams_empty():
+    assert name_trigrams("") == set()
+    assert name_trigrams(None) == set()
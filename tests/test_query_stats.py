@@ -0,0 +1,29 @@
+# tests/test_query_stats.py
+import pytest
+
+from query_stats import fingerprint
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM patients WHERE P_ID = %s", "SELECT * FROM patients WHERE P_ID = ?"),
+    ("SELECT * FROM t WHERE x = 42 AND y = 3.5", "SELECT * FROM t WHERE x = ? AND y = ?"),
+    ("SELECT * FROM t WHERE name = 'O''Neil' AND b = 'a\\'b'", "SELECT * FROM t WHERE name = ? AND b = ?"),
+    ("SELECT  *\n  FROM t /* hint */ WHERE a = %s -- trailing\n", "SELECT * FROM t WHERE a = ?"),
+    ("DELETE FROM t WHERE id = %s;", "DELETE FROM t WHERE id = ?"),
+    ("SELECT col1 FROM t2", "SELECT col1 FROM t2"),
+])
+def test_fingerprint_replaces_literals_and_placeholders(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_fingerprint_collapses_in_lists():
+    two = fingerprint("SELECT * FROM p WHERE id IN (%s, %s)")
+    five = fingerprint("SELECT * FROM p WHERE id IN (%s,%s,%s,%s,%s)")
+    assert two == five == "SELECT * FROM p WHERE id IN (?+)"
+
+
+def test_fingerprint_collapses_values_rows():
+    one = fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)")
+    three = fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)")
+    assert one == "INSERT INTO t (a, b) VALUES (?+)"
+    assert three == "INSERT INTO t (a, b) VALUES (?+), ..."
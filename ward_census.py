@@ -0,0 +1,96 @@
+# ward_census.py
+"""
+Incrementally maintained ward census.
+
+ward_census holds one row per department: Total beds, Occupied beds and
+today's admission / discharge counts (Census_Date says which day the
+"today" counters belong to). admissions_ops updates the row in the
+same transaction as the admit / discharge, so bed boards read the census
+with one primary-key scan of a handful of rows instead of scanning beds
+and admissions. rebuild_census() recounts everything from scratch.
+"""
+from datetime import date, timedelta
+
+from db_setup import db_cursor, insert_ignore_sql
+
+CENSUS_COLUMNS = ["Department", "Total", "Occupied", "Free", "Admitted_Today", "Discharged_Today"]
+
+
+def _ensure_row(cur, dept, day):
+    """Create the department's row on first use, with Total counted from its beds."""
+    cur.execute("SELECT 1 FROM ward_census WHERE Department = %s", (dept,))
+    if cur.fetchone():
+        return
+    cur.execute("SELECT COUNT(*) FROM beds WHERE Department = %s", (dept,))
+    total = cur.fetchone()[0]
+    cur.execute(insert_ignore_sql("ward_census",
+                                  ["Department", "Total", "Occupied", "Census_Date",
+                                   "Admitted_Today", "Discharged_Today"]),
+                (dept, total, 0, day, 0, 0))
+
+
+def _bump(cur, dept, occupied_delta, admitted, discharged, day=None):
+    day = day or date.today()
+    _ensure_row(cur, dept, day)
+    # a new day starts the "today" counters from zero
+    cur.execute("""
+        UPDATE ward_census SET
+            Occupied = Occupied + %s,
+            Admitted_Today = CASE WHEN Census_Date = %s THEN Admitted_Today ELSE 0 END + %s,
+            Discharged_Today = CASE WHEN Census_Date = %s THEN Discharged_Today ELSE 0 END + %s,
+            Census_Date = %s
+        WHERE Department = %s
+    """, (occupied_delta, day, admitted, day, discharged, day, dept))
+
+
+def record_admission(cur, dept, day=None):
+    """Count one admission into `dept` (inside the admission's transaction)."""
+    _bump(cur, dept, 1, 1, 0, day)
+
+
+def record_discharge(cur, dept, day=None):
+    """Count one discharge from `dept` (inside the discharge's transaction)."""
+    _bump(cur, dept, -1, 0, 1, day)
+
+
+def rebuild_census(cur, day=None):
+    """Recount every department from beds and admissions. Returns the number of departments."""
+    day = day or date.today()
+    nxt = day + timedelta(days=1)
+    cur.execute("SELECT Department, COUNT(*), SUM(Is_Occupied) FROM beds GROUP BY Department")
+    counts = {dept: [total, int(occupied or 0), 0, 0] for dept, total, occupied in cur.fetchall()}
+    cur.execute("""
+        SELECT Department, COUNT(*) FROM admissions
+        WHERE Admit_Date >= %s AND Admit_Date < %s GROUP BY Department
+    """, (day, nxt))
+    for dept, n in cur.fetchall():
+        counts.setdefault(dept, [0, 0, 0, 0])[2] = n
+    cur.execute("""
+        SELECT Department, COUNT(*) FROM admissions
+        WHERE Discharge_Date >= %s AND Discharge_Date < %s GROUP BY Department
+    """, (day, nxt))
+    for dept, n in cur.fetchall():
+        counts.setdefault(dept, [0, 0, 0, 0])[3] = n
+    cur.execute("DELETE FROM ward_census")
+    cur.executemany("""
+        INSERT INTO ward_census (Department, Total, Occupied, Census_Date, Admitted_Today, Discharged_Today)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [(dept, t, o, day, a, d) for dept, (t, o, a, d) in counts.items()])
+    return len(counts)
+
+
+def read_census(cur=None, day=None):
+    """[(Department, Total, Occupied, Free, Admitted_Today, Discharged_Today)] in one query."""
+    day = day or date.today()
+    q = """
+        SELECT Department, Total, Occupied, Total - Occupied,
+               CASE WHEN Census_Date = %s THEN Admitted_Today ELSE 0 END,
+               CASE WHEN Census_Date = %s THEN Discharged_Today ELSE 0 END
+        FROM ward_census ORDER BY Department
+    """
+    if cur is not None:
+        cur.execute(q, (day, day))
+        return cur.fetchall()
+    with db_cursor() as (conn, c):
+        c.execute(q, (day, day))
+        return c.fetchall()